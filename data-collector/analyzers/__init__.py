@@ -6,9 +6,11 @@ Contains various analysis and extraction tools
 from .attribute_extractor import AttributeExtractor
 from .gap_analyzer import MarketGapAnalyzer
 from .ideation_engine import IdeationEngine
+from .rule_extractor import RuleBasedExtractor
 
 __all__ = [
     "AttributeExtractor",
     "MarketGapAnalyzer",
-    "IdeationEngine"
+    "IdeationEngine",
+    "RuleBasedExtractor"
 ]
@@ -3,12 +3,15 @@ Product Attribute Extractor
 Uses Claude API to extract structured attributes from product data
 """
 import asyncio
+import copy
+import hashlib
 import json
 import yaml
 import re
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from loguru import logger
 
 try:
@@ -18,8 +21,89 @@ except ImportError:
     raise
 
 from config.settings import CONFIG_DIR, OUTPUT_DIR
-from utils.budget_tracker import get_budget_tracker
+from utils.budget_tracker import get_budget_tracker, cache_usage
 from utils.attribute_cache import get_attribute_cache
+from utils.llm_gateway import get_llm_gateway, LLMUnavailableError, PRIORITY_BULK
+from utils.variant_grouper import GROUPING_VERSION, VariantGrouper
+from analyzers.rule_extractor import RuleBasedExtractor
+from utils.structured_output import (
+    MODE_TEXT, MODE_TOOL, build_attributes_schema, get_parse_stats,
+    response_text, tool_input, tool_params, validate
+)
+
+
+# Requests per Message Batch submission (API limit is 100,000 / 256 MB)
+MAX_BATCH_REQUESTS = 10_000
+
+# Attribute structure requested from Claude (shared by single and packed prompts)
+ATTRIBUTES_JSON_TEMPLATE = """{
+  "ingredients": {
+    "key_actives": ["list of active ingredients found"],
+    "formula_type": "type (e.g., Cream, Serum, Gel)",
+    "texture": "texture description"
+  },
+  "benefits": {
+    "primary_benefit": "main benefit (e.g., Hydration, Anti-Aging)",
+    "target_concerns": ["list of concerns addressed"],
+    "timeframe": "expected results timeframe",
+    "clinical_claims": ["any clinical claims"]
+  },
+  "certifications": {
+    "clean_beauty": ["e.g., Paraben-Free, Sulfate-Free"],
+    "ethical": ["e.g., Cruelty-Free, Vegan"],
+    "sustainability": ["sustainability features"],
+    "origin": "origin if mentioned (e.g., K-Beauty, Made in USA)"
+  },
+  "demographics": {
+    "skin_type": ["target skin types"],
+    "age_group": "target age group",
+    "gender_target": "Women/Men/Unisex"
+  },
+  "usage": {
+    "time_of_day": "Morning/Night/Any",
+    "routine_step": "skincare step (e.g., Moisturizer, Serum)",
+    "application_area": "where to apply"
+  }
+}"""
+
+EXTRACTION_RULES = """1. Only include information explicitly stated or strongly implied
+2. Use "Unknown" for single values if not determinable
+3. Use empty arrays [] for lists if no matches
+4. Match values to schema categories when possible
+5. Be conservative - don't guess beyond what's clear"""
+
+# Shape of each extracted field (ATTRIBUTES_JSON_TEMPLATE); the vocabulary
+# comes from attribute_schema.yaml
+ATTRIBUTE_FIELDS = {
+    "ingredients": {"key_actives": "array", "formula_type": "string", "texture": "string"},
+    "benefits": {
+        "primary_benefit": "string",
+        "target_concerns": "array",
+        "timeframe": "string",
+        "clinical_claims": "array",
+    },
+    "certifications": {
+        "clean_beauty": "array",
+        "ethical": "array",
+        "sustainability": "array",
+        "origin": "string",
+    },
+    "demographics": {"skin_type": "array", "age_group": "string", "gender_target": "string"},
+    "usage": {"time_of_day": "string", "routine_step": "string", "application_area": "string"},
+}
+
+# Tool Claude answers through in structured output mode
+EXTRACTION_TOOL_NAME = "record_product_attributes"
+
+# Static instructions, sent as a cached system block ahead of the per-product prompt
+EXTRACTION_SYSTEM_PROMPT = f"""You are a beauty product analyst. Extract structured attributes from product information.
+
+For each product, extract the following attributes:
+
+{ATTRIBUTES_JSON_TEMPLATE}
+
+Rules:
+{EXTRACTION_RULES}"""
 
 
 class AttributeExtractor:
@@ -27,10 +111,19 @@ class AttributeExtractor:
     Extract structured product attributes using Claude API
 
     Features:
-    - Batch processing (5 products at a time)
-    - 7-day caching to minimize costs
+    - Concurrent extraction (async calls bounded by a semaphore, admitted
+      by the shared LLM gateway at the lowest priority so report calls
+      are served first within the account's requests/tokens per minute)
+    - Content-addressed caching: a product is re-extracted only when its
+      name/description/category, the model, the prompt or the schema changes
+    - Variant dedupe: size/shade variants of one product are extracted
+      once and share the result (price tier stays per ASIN)
+    - Rule-based pre-extraction: products whose text already decides the
+      attributes (vocabulary matches in name/features) skip Claude
+    - Structured output: attributes come back as tool input validated
+      against a JSON schema built from attribute_schema.yaml
     - Budget tracking and enforcement
-    - Retry logic with exponential backoff
+    - Retries with header-driven backoff and a circuit breaker (LLM gateway)
     - Detailed logging and statistics
     """
 
@@ -38,7 +131,8 @@ class AttributeExtractor:
         self,
         api_key: Optional[str] = None,
         model: str = "claude-haiku-4-5-20251001",
-        monthly_budget: float = 150.0
+        monthly_budget: float = 150.0,
+        base_url: Optional[str] = None
     ):
         """
         Initialize attribute extractor
@@ -47,17 +141,13 @@ class AttributeExtractor:
             api_key: Anthropic API key (or set ANTHROPIC_API_KEY env var)
             model: Claude model to use
             monthly_budget: Monthly budget limit in USD
+            base_url: API base URL override (default: Anthropic API)
         """
-        # Initialize Claude client with timeout settings
-        self.client = anthropic.Anthropic(
-            api_key=api_key,
-            timeout=60.0,  # 60 second timeout
-            max_retries=2,  # Built-in retry
-        )
+        # All Claude calls go through the shared gateway (pacing, backoff,
+        # circuit breaker); its async client also submits Message Batches
+        self.gateway = get_llm_gateway(api_key=api_key, base_url=base_url)
+        self.client = self.gateway.async_client
         self.model = model
-        self._api_available = True  # Circuit breaker flag
-        self._consecutive_failures = 0
-        self._max_consecutive_failures = 3  # Disable API after 3 consecutive failures
 
         # Verify API key format
         if api_key:
@@ -66,19 +156,66 @@ class AttributeExtractor:
 
         # Load schema
         self.schema = self._load_schema()
+        self.schema_version = str(self.schema.get("schema_version", "1.0"))
+
+        # Get performance settings from schema
+        perf = self.schema.get("performance", {})
+
+        # Structured output: answers come back as tool input validated
+        # against a JSON schema built from attribute_schema.yaml
+        self.structured_output = perf.get("structured_output", {}).get("enabled", True)
+        self.attributes_schema = build_attributes_schema(
+            self.schema.get("attribute_categories", {}), ATTRIBUTE_FIELDS
+        )
+        self.parse_stats = get_parse_stats()
+        self._extraction_fingerprint = self._build_extraction_fingerprint()
+
+        # Local pre-extraction; only low-confidence products are escalated to Claude
+        self.rule_extractor = (
+            RuleBasedExtractor(self.schema, ATTRIBUTE_FIELDS)
+            if self.schema.get("rule_extraction", {}).get("enabled", True) else None
+        )
+        self.rule_stats = {"resolved": 0, "escalated": 0, "seconds": 0.0, "fields": 0, "undetermined_fields": 0}
 
         # Initialize budget tracker and cache
         self.budget_tracker = get_budget_tracker(monthly_budget)
-        self.cache_manager = get_attribute_cache(ttl_days=7)
+        self.cache_manager = get_attribute_cache(
+            ttl_days=perf.get("cache_ttl_days", 7),
+            retention_days=perf.get("cache_retention_days", 90)
+        )
 
-        # Get performance settings from schema
-        perf = self.schema.get("performance", {})
         self.batch_size = perf.get("batch_size", 5)
-        self.delay_between_batches = perf.get("delay_between_batches", 2)
-        self.max_retries = perf.get("retry", {}).get("max_attempts", 2)
         self.timeout = perf.get("timeout", {}).get("per_product_seconds", 15)
 
-        logger.info(f"AttributeExtractor initialized (model: {model}, batch_size: {self.batch_size})")
+        # Concurrency (all extractions share these, including streaming-mode
+        # workers calling extract_single directly); RPM/TPM pacing is the gateway's
+        concurrency = perf.get("concurrency", {})
+        self.max_concurrent_requests = concurrency.get("max_concurrent_requests", 8)
+        self.estimated_output_tokens = concurrency.get("estimated_output_tokens", 600)
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        # Packed mode: several products per request (instructions sent once)
+        packing = perf.get("packing", {})
+        self.packing_enabled = packing.get("enabled", False)
+        self.products_per_request = max(1, packing.get("products_per_request", 5))
+        self.packed_max_input_tokens = packing.get("max_input_tokens", 6000)
+        self.packed_max_output_tokens = packing.get("max_output_tokens", 8192)
+        self._packed_requests = 0
+
+        # Variant dedupe: one extraction per group of size/shade variants
+        dedupe = perf.get("variant_dedupe", {})
+        ingredients = self.schema.get("attribute_categories", {}).get("ingredients", {})
+        self.variant_grouper = VariantGrouper(
+            similarity_threshold=dedupe.get("similarity_threshold", 0.8),
+            max_token_share=dedupe.get("max_token_share", 0.5),
+            # Titles differing in one of these are different products, not variants
+            product_form_terms=(ingredients.get("formula_type") or []) + (ingredients.get("texture") or []),
+        ) if dedupe.get("enabled", True) else None
+
+        logger.info(
+            f"AttributeExtractor initialized (model: {model}, "
+            f"concurrency: {self.max_concurrent_requests})"
+        )
 
     def _load_schema(self) -> Dict:
         """Load attribute schema"""
@@ -90,16 +227,100 @@ class AttributeExtractor:
         with open(schema_path, "r", encoding="utf-8") as f:
             return yaml.safe_load(f)
 
-    def _build_extraction_prompt(self, product_data: Dict) -> str:
+    def _build_extraction_fingerprint(self) -> str:
         """
-        Build Claude prompt for attribute extraction
+        Hash of everything besides the product that shapes the extraction:
+        model, schema version, schema contents, system prompt, prompt template
+        and the output tool schema (when structured output is on)
+
+        Performance and rule-extraction settings are excluded so tuning them
+        does not invalidate the cache.
+        """
+        schema_content = {
+            k: v for k, v in self.schema.items() if k not in ("performance", "rule_extraction")
+        }
+        template = self._build_extraction_prompt({})
+
+        payload = json.dumps(
+            {
+                "model": self.model,
+                "schema_version": self.schema_version,
+                "schema": schema_content,
+                "system_prompt": EXTRACTION_SYSTEM_PROMPT,
+                "prompt_template": template,
+                "output_schema": self.attributes_schema if self.structured_output else None,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _normalize_inputs(product_data: Dict) -> Dict[str, str]:
+        """
+        Product fields that feed the extraction prompt, whitespace-normalized
+
+        Price is left out: it only drives price_tier, which is recomputed
+        from the current price on every cache hit.
+        """
+        def clean(value) -> str:
+            if isinstance(value, (list, tuple)):
+                value = " > ".join(str(v) for v in value)
+            return " ".join(str(value or "").split())
+
+        return {
+            "name": clean(product_data.get("name")),
+            "category": clean(product_data.get("category")),
+            "breadcrumb": clean(product_data.get("breadcrumb")),
+            "description": clean((product_data.get("description") or "")[:1000]),
+        }
+
+    def content_key(self, product_data: Dict) -> str:
+        """
+        Cache key for a product's attributes
 
         Args:
             product_data: Product information dict
 
         Returns:
-            str: Formatted prompt
+            str: sha256 of the normalized inputs plus the extraction fingerprint
+        """
+        payload = json.dumps(
+            [self._extraction_fingerprint, self._normalize_inputs(product_data)],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_cached(self, content_keys: Dict[str, str]) -> Dict[str, Dict]:
+        """
+        Cached attributes whose content key still matches
+
+        Copies fanned out from a variant group under older (looser)
+        grouping rules are treated as misses, so they are re-extracted.
+
+        Args:
+            content_keys: Dict mapping ASIN to its current content key
+
+        Returns:
+            Dict mapping ASIN to cached attributes
         """
+        return {
+            asin: cached
+            for asin, cached in self.cache_manager.get_many_matching(content_keys).items()
+            if not cached.get("variant_of") or cached.get("variant_grouping") == GROUPING_VERSION
+        }
+
+    def _from_cache(self, cached: Dict, product_data: Dict) -> Dict:
+        """Cached attributes with price_tier recomputed from the current price"""
+        attributes = dict(cached)
+        attributes.pop("price_numeric", None)
+        attributes.pop("variant_grouping", None)
+        return self._enrich_attributes(attributes, product_data)
+
+    @staticmethod
+    def _format_product_info(product_data: Dict) -> str:
+        """Product fields as the bullet list used in extraction prompts"""
         product_name = product_data.get("name", "Unknown")
         description = product_data.get("description", "")
         category = product_data.get("category", "Unknown")
@@ -109,62 +330,244 @@ class AttributeExtractor:
         # Combine breadcrumb for context
         breadcrumb_str = " > ".join(breadcrumb) if breadcrumb else category
 
-        prompt = f"""You are a beauty product analyst. Extract structured attributes from this product information.
-
-Product Information:
-- Name: {product_name}
+        return f"""- Name: {product_name}
 - Category: {breadcrumb_str}
 - Price: {price}
-- Description: {description[:1000] if description else "No description available"}
+- Description: {description[:1000] if description else "No description available"}"""
 
-Extract the following attributes and return ONLY a valid JSON object (no other text):
+    def _build_extraction_prompt(self, product_data: Dict) -> str:
+        """
+        Build Claude prompt for attribute extraction
 
-{{
-  "ingredients": {{
-    "key_actives": ["list of active ingredients found"],
-    "formula_type": "type (e.g., Cream, Serum, Gel)",
-    "texture": "texture description"
-  }},
-  "benefits": {{
-    "primary_benefit": "main benefit (e.g., Hydration, Anti-Aging)",
-    "target_concerns": ["list of concerns addressed"],
-    "timeframe": "expected results timeframe",
-    "clinical_claims": ["any clinical claims"]
-  }},
-  "certifications": {{
-    "clean_beauty": ["e.g., Paraben-Free, Sulfate-Free"],
-    "ethical": ["e.g., Cruelty-Free, Vegan"],
-    "sustainability": ["sustainability features"],
-    "origin": "origin if mentioned (e.g., K-Beauty, Made in USA)"
-  }},
-  "demographics": {{
-    "skin_type": ["target skin types"],
-    "age_group": "target age group",
-    "gender_target": "Women/Men/Unisex"
-  }},
-  "usage": {{
-    "time_of_day": "Morning/Night/Any",
-    "routine_step": "skincare step (e.g., Moisturizer, Serum)",
-    "application_area": "where to apply"
-  }}
-}}
+        Args:
+            product_data: Product information dict
 
-Rules:
-1. Only include information explicitly stated or strongly implied
-2. Use "Unknown" for single values if not determinable
-3. Use empty arrays [] for lists if no matches
-4. Match values to schema categories when possible
-5. Be conservative - don't guess beyond what's clear
-6. Return ONLY the JSON object, no other text
+        Returns:
+            str: Formatted prompt
+        """
+        prompt = f"""Product Information:
+{self._format_product_info(product_data)}
+
+Return ONLY a valid JSON object with the attributes above (no other text).
+
+JSON:"""
+
+        return prompt
+
+    def _build_packed_prompt(self, products: List[Dict]) -> str:
+        """
+        Build one prompt extracting attributes for several products
+
+        The instructions (system block) are sent once for the whole group;
+        the response is a JSON object keyed by ASIN.
+
+        Args:
+            products: Product information dicts (each must have 'asin')
+
+        Returns:
+            str: Formatted prompt
+        """
+        product_blocks = "\n\n".join(
+            f"Product {product['asin']}:\n{self._format_product_info(product)}"
+            for product in products
+        )
+
+        prompt = f"""Extract attributes for each of the {len(products)} products below.
+
+{product_blocks}
+
+Return ONLY a valid JSON object keyed by ASIN, with one attributes object (as above) per product:
+{{"<ASIN>": {{"ingredients": {{...}}, "benefits": {{...}}, ...}}, ...}}
+
+Include every ASIN listed above exactly once. Return ONLY the JSON object, no other text.
 
 JSON:"""
 
         return prompt
 
+    def _extract_locally(self, product_data: Dict) -> Optional[Dict]:
+        """
+        Rule-based attributes if confident enough, otherwise None (escalate to Claude)
+
+        Args:
+            product_data: Product information dict
+
+        Returns:
+            Dict with attributes (extraction_method "rules", plus
+            undetermined_fields: the "Unknown"/[] values the rules could not
+            decide, as opposed to values determined to be absent) or None
+        """
+        if not self.rule_extractor:
+            return None
+
+        start = time.perf_counter()
+        result = self.rule_extractor.extract(product_data)
+        self.rule_stats["seconds"] += time.perf_counter() - start
+
+        attributes = result["attributes"]
+        if not self.rule_extractor.is_confident(result) or not self._validate_attributes(attributes):
+            self.rule_stats["escalated"] += 1
+            logger.debug(f"Escalating {product_data.get('asin')} to Claude (rule confidence {result['confidence']})")
+            return None
+
+        self.rule_stats["resolved"] += 1
+        self.rule_stats["fields"] += len(result["field_confidence"])
+        self.rule_stats["undetermined_fields"] += len(result["undetermined_fields"])
+        attributes = self._enrich_attributes(attributes, product_data)
+        attributes["extraction_method"] = "rules"
+        attributes["confidence"] = result["confidence"]
+        attributes["undetermined_fields"] = result["undetermined_fields"]
+        return attributes
+
+    def _resolve_locally(self, products: List[Dict], results: Dict[str, Optional[Dict]]) -> List[Dict]:
+        """
+        Fill results with confident rule-based extractions
+
+        Returns:
+            list: Products that still need Claude
+        """
+        escalated = []
+        for product in products:
+            attributes = self._extract_locally(product)
+            if attributes:
+                results[product["asin"]] = attributes
+            else:
+                escalated.append(product)
+
+        return escalated
+
+    def _group_variants(self, products: List[Dict]) -> Tuple[List[Dict], Dict[str, List[Dict]]]:
+        """
+        Collapse size/shade variants to one representative per group
+
+        Args:
+            products: Products to extract
+
+        Returns:
+            (representatives, variants): products to send to Claude, and the
+            other members of each group keyed by representative ASIN
+        """
+        if not self.variant_grouper or len(products) < 2:
+            return products, {}
+
+        groups = self.variant_grouper.group(products)
+        variants = {group[0]["asin"]: group[1:] for group in groups if len(group) > 1}
+
+        if variants:
+            logger.info(
+                f"Variant dedupe: {len(products)} products in {len(groups)} groups, "
+                f"{len(products) - len(groups)} variants share an extraction "
+                f"({len(groups) / len(products):.0%} of the calls)"
+            )
+
+        return [group[0] for group in groups], variants
+
+    def _fan_out_variants(self, variants: Dict[str, List[Dict]], results: Dict[str, Optional[Dict]]) -> List[Dict]:
+        """
+        Copy each representative's attributes to the other members of its group
+
+        Price tier is recomputed from each member's own price, and the
+        result is cached under the member's own content key, stamped with
+        the grouping version it was made under.
+
+        Args:
+            variants: Members by representative ASIN (from _group_variants)
+            results: Results so far; member entries are filled in place
+
+        Returns:
+            list: Members whose representative failed (to extract on their own)
+        """
+        unresolved = []
+
+        for representative_asin, members in variants.items():
+            source = results.get(representative_asin)
+            if not source or source.get("extraction_failed"):
+                unresolved.extend(members)
+                continue
+
+            for member in members:
+                attributes = copy.deepcopy(source)
+                attributes.pop("price_tier", None)
+                attributes.pop("price_numeric", None)
+                attributes["variant_of"] = representative_asin
+                attributes = self._enrich_attributes(attributes, member)
+
+                self.cache_manager.set(
+                    member["asin"],
+                    {**attributes, "variant_grouping": GROUPING_VERSION},
+                    {"model": self.model, "variant_of": representative_asin},
+                    content_key=self.content_key(member)
+                )
+                results[member["asin"]] = attributes
+
+        return unresolved
+
+    def get_rule_statistics(self, since: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Rule-based pre-extraction statistics
+
+        Savings are estimated from this month's average cost and latency of
+        an attribute_extraction request.
+
+        Args:
+            since: Earlier snapshot of self.rule_stats (default: since start)
+
+        Returns:
+            Dict with resolved, escalated, escalation_rate, rule_seconds,
+            field_coverage (share of schema fields the locally resolved
+            products have determined), undetermined_fields,
+            estimated_cost_saved and estimated_latency_saved_seconds
+        """
+        since = since or {"resolved": 0, "escalated": 0, "seconds": 0.0, "fields": 0, "undetermined_fields": 0}
+        resolved = self.rule_stats["resolved"] - since["resolved"]
+        escalated = self.rule_stats["escalated"] - since["escalated"]
+        total = resolved + escalated
+        fields = self.rule_stats["fields"] - since["fields"]
+        undetermined = self.rule_stats["undetermined_fields"] - since["undetermined_fields"]
+
+        averages = self.budget_tracker.get_task_averages("attribute_extraction")
+
+        return {
+            "resolved": resolved,
+            "escalated": escalated,
+            "escalation_rate": round(escalated / total * 100, 1) if total else 0.0,
+            "rule_seconds": round(self.rule_stats["seconds"] - since["seconds"], 3),
+            "field_coverage": round((fields - undetermined) / fields * 100, 1) if fields else 100.0,
+            "undetermined_fields": undetermined,
+            "estimated_cost_saved": resolved * averages["cost"] if averages["cost"] is not None else None,
+            "estimated_latency_saved_seconds": (
+                resolved * averages["latency_ms"] / 1000 if averages["latency_ms"] is not None else None
+            ),
+        }
+
+    def log_rule_statistics(self, since: Optional[Dict] = None):
+        """Log escalation rate and estimated savings of rule-based pre-extraction"""
+        stats = self.get_rule_statistics(since)
+        if not stats["resolved"] + stats["escalated"]:
+            return
+
+        cost = f"~${stats['estimated_cost_saved']:.4f}" if stats["estimated_cost_saved"] is not None else "n/a"
+        latency = (
+            f"~{stats['estimated_latency_saved_seconds']:.0f}s"
+            if stats["estimated_latency_saved_seconds"] is not None else "n/a"
+        )
+
+        logger.info(
+            f"  - Rule-based: {stats['resolved']} resolved locally in {stats['rule_seconds']}s, "
+            f"{stats['escalated']} escalated to Claude ({stats['escalation_rate']}% escalation); "
+            f"saved {cost} and {latency} of API latency"
+        )
+        if stats["resolved"]:
+            logger.info(
+                f"  - Rule-based field coverage: {stats['field_coverage']}% "
+                f"({stats['undetermined_fields']} fields left undetermined across {stats['resolved']} products)"
+            )
+
     async def extract_single(
         self,
         product_data: Dict,
-        use_cache: bool = True
+        use_cache: bool = True,
+        use_rules: bool = True
     ) -> Dict:
         """
         Extract attributes for a single product
@@ -172,6 +575,7 @@ JSON:"""
         Args:
             product_data: Product information dict (must have 'asin')
             use_cache: Whether to use cached results
+            use_rules: Try rule-based extraction before calling Claude
 
         Returns:
             Dict with extracted attributes
@@ -182,15 +586,23 @@ JSON:"""
             logger.warning("Product missing ASIN, cannot extract attributes")
             return self._get_fallback_attributes()
 
+        content_key = self.content_key(product_data)
+
         # Check cache first
         if use_cache:
-            cached = self.cache_manager.get(asin)
+            cached = self._get_cached({asin: content_key}).get(asin)
             if cached:
                 logger.debug(f"Cache hit for {asin}")
-                return cached
+                return self._from_cache(cached, product_data)
+
+        # Confident local extraction needs no API call
+        if use_rules:
+            local = self._extract_locally(product_data)
+            if local:
+                return local
 
         # Circuit breaker: skip API if too many consecutive failures
-        if not self._api_available:
+        if not self.gateway.available:
             logger.debug(f"API disabled (circuit breaker), using fallback for {asin}")
             return self._get_fallback_attributes()
 
@@ -199,112 +611,180 @@ JSON:"""
             logger.warning(f"Budget limit reached, using fallback for {asin}")
             return self._get_fallback_attributes()
 
-        # Build prompt
         prompt = self._build_extraction_prompt(product_data)
 
-        # Extract with retry logic
-        for attempt in range(self.max_retries):
-            try:
+        try:
+            async with self._semaphore:
                 start_time = datetime.now()
 
-                # Call Claude API
-                message = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=2048,
-                    temperature=0.2,  # Low temperature for consistent extraction
-                    messages=[{"role": "user", "content": prompt}]
+                # Async call, so other extractions and scraping sharing the
+                # event loop overlap with this one; rate limits and transient
+                # errors are retried inside the gateway
+                message = await self.gateway.acreate(
+                    "attribute_extraction",
+                    priority=PRIORITY_BULK,
+                    estimated_output_tokens=self.estimated_output_tokens,
+                    **self._request_params(prompt)
                 )
 
-                # Calculate time taken
-                extraction_time_ms = (datetime.now() - start_time).total_seconds() * 1000
+            extraction_time_ms = (datetime.now() - start_time).total_seconds() * 1000
+            return self._complete_extraction(product_data, content_key, message, extraction_time_ms)
 
-                # Record usage
-                usage_summary = self.budget_tracker.record_usage(
-                    input_tokens=message.usage.input_tokens,
-                    output_tokens=message.usage.output_tokens,
-                    model=self.model,
-                    task_type="attribute_extraction"
-                )
+        except LLMUnavailableError:
+            logger.debug(f"API disabled (circuit breaker), using fallback for {asin}")
 
-                logger.debug(
-                    f"API call for {asin}: "
-                    f"${usage_summary['request_cost']:.4f} "
-                    f"({message.usage.input_tokens}+{message.usage.output_tokens} tokens)"
-                )
+        except anthropic.APIError as e:
+            logger.error(f"Claude API error for {asin}: {type(e).__name__}: {e}")
 
-                # Parse response
-                response_text = message.content[0].text
-                attributes = self._parse_response(response_text)
-
-                # Validate attributes
-                if not self._validate_attributes(attributes):
-                    logger.warning(f"Invalid attributes for {asin}, using fallback")
-                    return self._get_fallback_attributes()
-
-                # Add price tier based on actual price
-                attributes = self._enrich_attributes(attributes, product_data)
-
-                # Cache the result
-                cache_metadata = {
-                    "model": self.model,
-                    "extraction_time_ms": extraction_time_ms,
-                    "input_tokens": message.usage.input_tokens,
-                    "output_tokens": message.usage.output_tokens,
-                    "cost": usage_summary['request_cost']
-                }
-
-                self.cache_manager.set(asin, attributes, cache_metadata)
-
-                # Reset consecutive failures on success
-                self._consecutive_failures = 0
-                return attributes
-
-            except anthropic.APIConnectionError as e:
-                self._consecutive_failures += 1
-                logger.warning(f"Attempt {attempt + 1}/{self.max_retries} connection error for {asin}: {type(e).__name__}: {e}")
-
-                if self._consecutive_failures >= self._max_consecutive_failures:
-                    logger.warning(
-                        f"⚠ {self._consecutive_failures} consecutive API failures - "
-                        f"disabling Claude API for remaining products (circuit breaker)"
-                    )
-                    self._api_available = False
-                    return self._get_fallback_attributes()
-
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
-                else:
-                    logger.error(f"All retry attempts failed for {asin} (connection error)")
-                    return self._get_fallback_attributes()
-
-            except anthropic.RateLimitError as e:
-                logger.warning(f"Rate limit hit for {asin}, waiting 60s: {e}")
-                await asyncio.sleep(60)
-
-            except anthropic.APIStatusError as e:
-                self._consecutive_failures += 1
-                logger.warning(f"API status error for {asin}: {e.status_code} - {e.message}")
-
-                if self._consecutive_failures >= self._max_consecutive_failures:
-                    logger.warning(
-                        f"⚠ {self._consecutive_failures} consecutive API failures - "
-                        f"disabling Claude API for remaining products (circuit breaker)"
-                    )
-                    self._api_available = False
-                    return self._get_fallback_attributes()
-
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
-                else:
-                    logger.error(f"All retry attempts failed for {asin}")
-                    return self._get_fallback_attributes()
-
-            except Exception as e:
-                logger.error(f"Unexpected error for {asin}: {type(e).__name__}: {e}")
-                return self._get_fallback_attributes()
+        except Exception as e:
+            logger.error(f"Unexpected error for {asin}: {type(e).__name__}: {e}")
 
         return self._get_fallback_attributes()
 
+    def _request_params(self, prompt: str, output_schema: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        messages.create() parameters for an extraction prompt (shared by interactive and batch calls)
+
+        The static instructions go in a system block marked for prompt
+        caching, so repeated calls only pay full price for the product text.
+        In structured output mode Claude must answer through the extraction
+        tool, whose input follows output_schema (default: one product's attributes).
+        """
+        params = {
+            "model": self.model,
+            "max_tokens": 2048,
+            "temperature": 0.2,  # Low temperature for consistent extraction
+            "system": [{
+                "type": "text",
+                "text": EXTRACTION_SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"},
+            }],
+            "messages": [{"role": "user", "content": prompt}],
+        }
+
+        if self.structured_output:
+            params.update(tool_params(
+                EXTRACTION_TOOL_NAME,
+                "Record the attributes extracted from the product information.",
+                output_schema or self.attributes_schema
+            ))
+
+        return params
+
+    def _packed_output_schema(self, products: List[Dict]) -> Dict[str, Any]:
+        """Tool schema for a packed request: one attributes object per ASIN"""
+        asins = [product["asin"] for product in products]
+        return {
+            "type": "object",
+            "properties": {asin: self.attributes_schema for asin in asins},
+            "required": asins,
+        }
+
+    def _complete_extraction(
+        self,
+        product_data: Dict,
+        content_key: str,
+        message: Any,
+        extraction_time_ms: float,
+        batch_id: Optional[str] = None
+    ) -> Dict:
+        """
+        Record usage, parse, validate, enrich and cache one Claude response
+
+        Args:
+            product_data: Product information dict
+            content_key: Cache key from content_key()
+            message: Claude Message
+            extraction_time_ms: Request latency (batch turnaround for batch results)
+            batch_id: Message Batch ID if the response came from a batch (billed at batch pricing)
+
+        Returns:
+            Dict with extracted attributes (fallback attributes if invalid)
+        """
+        asin = product_data["asin"]
+
+        # Record usage
+        usage_summary = self.budget_tracker.record_usage(
+            input_tokens=message.usage.input_tokens,
+            output_tokens=message.usage.output_tokens,
+            model=self.model,
+            task_type="attribute_extraction",
+            batch=batch_id is not None,
+            latency_ms=None if batch_id else extraction_time_ms,
+            **cache_usage(message.usage)
+        )
+
+        logger.debug(
+            f"{'Batch result' if batch_id else 'API call'} for {asin}: "
+            f"${usage_summary['request_cost']:.4f} "
+            f"({message.usage.input_tokens}+{message.usage.output_tokens} tokens)"
+        )
+
+        # Parse response
+        attributes = self._parse_message(message)
+
+        cache_metadata = {
+            "model": self.model,
+            "extraction_time_ms": extraction_time_ms,
+            "input_tokens": message.usage.input_tokens,
+            "output_tokens": message.usage.output_tokens,
+            "cost": usage_summary['request_cost']
+        }
+        if batch_id:
+            cache_metadata["batch_id"] = batch_id
+
+        return self._finalize_attributes(product_data, content_key, attributes, cache_metadata)
+
+    def _finalize_attributes(
+        self,
+        product_data: Dict,
+        content_key: str,
+        attributes: Dict,
+        cache_metadata: Dict
+    ) -> Dict:
+        """
+        Validate, enrich and cache attributes parsed for one product
+
+        Returns:
+            Dict with attributes (fallback attributes if invalid)
+        """
+        asin = product_data["asin"]
+
+        # Validate attributes
+        if not self._validate_attributes(attributes):
+            logger.warning(f"Invalid attributes for {asin}, using fallback")
+            return self._get_fallback_attributes()
+
+        # Add price tier based on actual price
+        attributes = self._enrich_attributes(attributes, product_data)
+
+        # Cache the result
+        self.cache_manager.set(asin, attributes, cache_metadata, content_key=content_key)
+        return attributes
+
+    def _parse_message(self, message: Any) -> Dict:
+        """
+        Attributes from a single-product response
+
+        Uses the extraction tool's input when present (validated against the
+        attributes schema), otherwise searches the text for JSON.
+
+        Returns:
+            Dict with attributes (fallback attributes if unparseable or invalid)
+        """
+        structured = tool_input(message, EXTRACTION_TOOL_NAME)
+        if structured is None:
+            return self._parse_response(response_text(message))
+
+        errors = validate(structured, self.attributes_schema)
+        self.parse_stats.record("attribute_extraction", MODE_TOOL, not errors)
+
+        if errors:
+            logger.error(f"Structured attributes do not match schema: {'; '.join(errors[:5])}")
+            return self._get_fallback_attributes()
+
+        return structured
+
     def _parse_response(self, response_text: str) -> Dict:
         """Parse Claude response to extract JSON"""
         try:
@@ -320,13 +800,156 @@ JSON:"""
 
             # Parse JSON
             attributes = json.loads(json_str)
+            self.parse_stats.record("attribute_extraction", MODE_TEXT, True)
             return attributes
 
         except json.JSONDecodeError as e:
+            self.parse_stats.record("attribute_extraction", MODE_TEXT, False)
             logger.error(f"Failed to parse JSON from response: {e}")
             logger.debug(f"Response text: {response_text[:500]}")
             return self._get_fallback_attributes()
 
+    def _pack_products(self, products: List[Dict]) -> List[List[Dict]]:
+        """
+        Group products for packed requests
+
+        Groups hold at most products_per_request products and stay within
+        max_input_tokens of product text (~4 chars/token) and
+        max_output_tokens of expected output. A product that alone exceeds
+        the budget gets a group of its own.
+
+        Args:
+            products: Products to extract
+
+        Returns:
+            List of product groups, in input order
+        """
+        groups = []
+        group = []
+        group_tokens = 0
+
+        for product in products:
+            tokens = len(self._format_product_info(product)) // 4
+            fits = (
+                len(group) < self.products_per_request
+                and group_tokens + tokens <= self.packed_max_input_tokens
+                and (len(group) + 1) * self.estimated_output_tokens <= self.packed_max_output_tokens
+            )
+            if group and not fits:
+                groups.append(group)
+                group, group_tokens = [], 0
+
+            group.append(product)
+            group_tokens += tokens
+
+        if group:
+            groups.append(group)
+
+        return groups
+
+    async def _extract_packed_group(self, group: List[Dict]) -> Tuple[Dict[str, Dict], List[Dict]]:
+        """
+        Extract attributes for a group of products with one request
+
+        Each product's sub-result is validated on its own; a bad or missing
+        entry only fails that product.
+
+        Args:
+            group: Products packed into this request
+
+        Returns:
+            (results, failed): attributes for products that validated, and
+            the products that need to be retried
+        """
+        if not self.gateway.available or not self.budget_tracker.can_make_request():
+            return {}, group
+
+        prompt = self._build_packed_prompt(group)
+        max_tokens = min(self.packed_max_output_tokens, self.estimated_output_tokens * len(group) * 2)
+
+        try:
+            async with self._semaphore:
+                start_time = datetime.now()
+
+                message = await self.gateway.acreate(
+                    "attribute_extraction",
+                    priority=PRIORITY_BULK,
+                    estimated_output_tokens=self.estimated_output_tokens * len(group),
+                    **{
+                        **self._request_params(prompt, self._packed_output_schema(group)),
+                        "max_tokens": max_tokens,
+                    }
+                )
+
+            extraction_time_ms = (datetime.now() - start_time).total_seconds() * 1000
+        except Exception as e:
+            logger.warning(f"Packed request for {len(group)} products failed: {type(e).__name__}: {e}")
+            return {}, group
+
+        usage = message.usage
+
+        # One request, one usage record
+        usage_summary = self.budget_tracker.record_usage(
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            model=self.model,
+            task_type="attribute_extraction",
+            latency_ms=extraction_time_ms,
+            **cache_usage(usage)
+        )
+        self._packed_requests += 1
+
+        logger.debug(
+            f"Packed API call for {len(group)} products: ${usage_summary['request_cost']:.4f} "
+            f"({usage.input_tokens}+{usage.output_tokens} tokens, stop: {message.stop_reason})"
+        )
+
+        # Tool input is validated per product below, so one bad entry only fails that product
+        parsed = tool_input(message, EXTRACTION_TOOL_NAME)
+        structured = parsed is not None
+        if not structured:
+            parsed = self._parse_response(response_text(message))
+        if not isinstance(parsed, dict):
+            parsed = {}
+
+        # Per-product share of the request, for cache metadata
+        cache_metadata = {
+            "model": self.model,
+            "extraction_time_ms": extraction_time_ms,
+            "input_tokens": usage.input_tokens // len(group),
+            "output_tokens": usage.output_tokens // len(group),
+            "cost": usage_summary['request_cost'] / len(group),
+            "packed_products": len(group)
+        }
+
+        results = {}
+        failed = []
+        for product in group:
+            asin = product["asin"]
+            sub_result = parsed.get(asin)
+
+            if structured:
+                errors = validate(sub_result, self.attributes_schema) if sub_result is not None else ["missing"]
+                self.parse_stats.record("attribute_extraction", MODE_TOOL, not errors)
+                if errors:
+                    logger.debug(f"Packed result for {asin} does not match schema: {'; '.join(errors[:5])}")
+                    sub_result = None
+
+            attributes = (
+                self._finalize_attributes(product, self.content_key(product), sub_result, cache_metadata)
+                if isinstance(sub_result, dict) else self._get_fallback_attributes()
+            )
+
+            if attributes.get("extraction_failed"):
+                failed.append(product)
+            else:
+                results[asin] = attributes
+
+        if failed:
+            logger.warning(f"Packed request: {len(failed)}/{len(group)} products invalid or missing, retrying individually")
+
+        return results, failed
+
     def _validate_attributes(self, attributes: Dict) -> bool:
         """Validate extracted attributes against schema"""
         # Check minimum required structure
@@ -412,76 +1035,351 @@ JSON:"""
             "extraction_failed": True
         }
 
+    def _split_cached(self, products: List[Dict]) -> Tuple[Dict[str, Optional[Dict]], List[Dict]]:
+        """
+        Resolve products from the attribute cache with one bulk lookup
+
+        Args:
+            products: List of product dicts
+
+        Returns:
+            (results, to_extract): results maps every ASIN (in input order) to
+            cached attributes or None; to_extract lists the uncached products
+        """
+        results = {}
+        to_extract = []
+
+        cached_by_asin = self._get_cached({
+            p["asin"]: self.content_key(p) for p in products if p.get("asin")
+        })
+
+        for product in products:
+            asin = product.get("asin")
+
+            if not asin:
+                logger.warning("Product missing ASIN, skipping")
+                continue
+
+            # Check if already in cache
+            cached = cached_by_asin.get(asin)
+
+            if cached:
+                results[asin] = self._from_cache(cached, product)
+            else:
+                results[asin] = None  # Placeholder keeps input order
+                to_extract.append(product)
+
+        return results, to_extract
+
     async def extract_batch(
         self,
         products: List[Dict],
         show_progress: bool = True
     ) -> Dict[str, Dict]:
         """
-        Extract attributes for multiple products in batches
+        Extract attributes for multiple products concurrently
+
+        Uncached products are extracted in parallel, bounded by
+        max_concurrent_requests and the RPM/TPM limiter, so wall-clock time
+        is roughly N x latency / concurrency instead of N x latency.
+
+        With packing enabled, products are first sent in groups (one request
+        per group, see _pack_products); only products whose sub-result was
+        missing or invalid are retried with single-product requests.
 
         Args:
             products: List of product dicts (each must have 'asin')
-            show_progress: Whether to show progress logs
+            show_progress: Whether to show progress logs and the summary
 
         Returns:
-            Dict mapping ASIN to extracted attributes
+            Dict mapping ASIN to extracted attributes (in input order)
         """
-        results = {}
         total_products = len(products)
 
-        logger.info(f"Extracting attributes for {total_products} products (batch_size={self.batch_size})")
+        if show_progress:
+            logger.info(
+                f"Extracting attributes for {total_products} products "
+                f"(concurrency={self.max_concurrent_requests})"
+            )
 
         # Statistics
-        cache_hits = 0
         api_calls = 0
         failures = 0
+        start_time = datetime.now()
+
+        results, to_extract = self._split_cached(products)
+        cache_hits = len(results) - len(to_extract)
+
+        rule_stats_before = dict(self.rule_stats)
+        parse_stats_before = self.parse_stats.snapshot()
+        to_extract = self._resolve_locally(to_extract, results)
+        to_extract, variants = self._group_variants(to_extract)
+
+        packed_requests_before = self._packed_requests
+        packed_extracted = 0
+        packed_retried = 0
 
-        # Process in batches
-        for i in range(0, total_products, self.batch_size):
-            batch = products[i:i+self.batch_size]
-            batch_num = i // self.batch_size + 1
-            total_batches = (total_products + self.batch_size - 1) // self.batch_size
+        if self.packing_enabled and len(to_extract) > 1:
+            groups = self._pack_products(to_extract)
+            outcomes = await asyncio.gather(*(self._extract_packed_group(group) for group in groups))
 
+            to_retry = []
+            for packed_results, failed in outcomes:
+                results.update(packed_results)
+                packed_extracted += len(packed_results)
+                to_retry.extend(failed)
+
+            packed_retried = len(to_retry)
             if show_progress:
-                logger.info(f"Processing batch {batch_num}/{total_batches} ({len(batch)} products)...")
+                logger.info(
+                    f"Packed {len(to_extract)} products into {len(groups)} requests: "
+                    f"{packed_extracted} extracted, {len(to_retry)} to retry individually"
+                )
+            to_extract = to_retry
 
-            # Extract for each product in batch
-            for product in batch:
-                asin = product.get("asin")
+        completed = 0
 
-                if not asin:
-                    logger.warning("Product missing ASIN, skipping")
-                    continue
+        async def extract(product: Dict) -> Dict:
+            nonlocal completed
+            attributes = await self.extract_single(product, use_cache=False, use_rules=False)
+            completed += 1
+            if show_progress and (completed % self.batch_size == 0 or completed == len(to_extract)):
+                logger.info(f"Extracted {completed}/{len(to_extract)} products...")
+            return attributes
 
-                # Check if already in cache
-                cached = self.cache_manager.get(asin)
+        extracted = await asyncio.gather(*(extract(product) for product in to_extract))
 
-                if cached:
-                    results[asin] = cached
-                    cache_hits += 1
-                else:
-                    # Extract
-                    attributes = await self.extract_single(product, use_cache=False)
-                    results[asin] = attributes
+        # Variants of failed representatives are extracted on their own
+        variant_count = sum(len(members) for members in variants.values())
+        for product, attributes in zip(to_extract, extracted):
+            results[product["asin"]] = attributes
+        unresolved_variants = self._fan_out_variants(variants, results)
+
+        if unresolved_variants:
+            logger.info(f"Extracting {len(unresolved_variants)} variants whose group representative failed...")
+            to_extract = to_extract + unresolved_variants
+            extracted += await asyncio.gather(*(
+                self.extract_single(product, use_cache=False, use_rules=False)
+                for product in unresolved_variants
+            ))
 
-                    if attributes.get("extraction_failed"):
-                        failures += 1
-                    else:
-                        api_calls += 1
+        for product, attributes in zip(to_extract, extracted):
+            results[product["asin"]] = attributes
 
-            # Delay between batches
-            if i + self.batch_size < total_products:
-                await asyncio.sleep(self.delay_between_batches)
+            if attributes.get("extraction_failed"):
+                failures += 1
+            else:
+                api_calls += 1
+
+        # One request per packed group, however many products it carried
+        packed_requests = self._packed_requests - packed_requests_before
+        api_calls += packed_requests
+
+        if not show_progress:
+            return results
+
+        elapsed = (datetime.now() - start_time).total_seconds()
+        gateway_stats = self.gateway.get_statistics()
+        pacing = gateway_stats["by_priority"]["bulk"]
 
         # Log summary
-        logger.success(f"✓ Extraction complete: {total_products} products")
+        logger.success(f"✓ Extraction complete: {total_products} products in {elapsed:.1f}s")
         logger.info(f"  - Cache hits: {cache_hits}")
         logger.info(f"  - API calls: {api_calls}")
         logger.info(f"  - Failures: {failures}")
+        if variant_count:
+            logger.info(
+                f"  - Variants: {variant_count - len(unresolved_variants)} filled from their group's extraction, "
+                f"{len(unresolved_variants)} extracted on their own"
+            )
+        if packed_requests:
+            logger.info(
+                f"  - Packed: {packed_extracted} products in {packed_requests} requests, "
+                f"{packed_retried} retried individually"
+            )
+        logger.info(
+            f"  - Pacing: admission wait avg {pacing['avg_wait_seconds']}s / max {pacing['max_wait_seconds']}s, "
+            f"{gateway_stats['rate_limited']} rate limited, {gateway_stats['backoff_seconds']}s shared backoff"
+        )
+        self.log_rule_statistics(since=rule_stats_before)
+        for mode, counts in self.parse_stats.get_statistics(since=parse_stats_before).get("attribute_extraction", {}).items():
+            logger.info(f"  - Parse failures ({mode}): {counts['failures']}/{counts['parsed'] + counts['failures']}")
+
+        return results
+
+    async def extract_with_message_batches(
+        self,
+        products: List[Dict],
+        poll_interval_seconds: float = 60,
+        timeout_seconds: float = 24 * 60 * 60,
+        fallback_to_interactive: bool = True
+    ) -> Dict[str, Dict]:
+        """
+        Extract attributes for a whole run through the Message Batches API
+
+        Uncached products are submitted as batches (up to MAX_BATCH_REQUESTS
+        each) and polled until they end. Succeeded results are written to
+        the attribute cache and recorded at batch pricing. Products whose
+        request errored, expired or was still pending at the timeout are
+        extracted interactively (or get fallback attributes).
+
+        Args:
+            products: List of product dicts (each must have 'asin')
+            poll_interval_seconds: Delay between batch status checks
+            timeout_seconds: Give up (and cancel) batches still running after this long
+            fallback_to_interactive: Extract unresolved products with single-product API calls
+
+        Returns:
+            Dict mapping ASIN to extracted attributes (in input order)
+        """
+        results, to_extract = self._split_cached(products)
+        cache_hits = len(results) - len(to_extract)
+
+        rule_stats_before = dict(self.rule_stats)
+        to_extract = self._resolve_locally(to_extract, results)
+        resolved_locally = len(results) - cache_hits - len(to_extract)
+        to_extract, variants = self._group_variants(to_extract)
+
+        logger.info(
+            f"Extracting attributes for {len(products)} products via Message Batches "
+            f"({cache_hits} cached, {resolved_locally} resolved locally, {len(to_extract)} to submit)"
+        )
+
+        # One request per ASIN (custom_id must be unique within a batch)
+        pending = {product["asin"]: product for product in to_extract}
+        succeeded = 0
+        failures = 0
+        start_time = datetime.now()
+
+        if pending and not self.budget_tracker.can_make_request():
+            logger.warning("Budget limit reached, skipping Message Batches submission")
+            fallback_to_interactive = False
+        elif pending:
+            deadline = time.monotonic() + timeout_seconds
+            asins = list(pending)
+
+            for i in range(0, len(asins), MAX_BATCH_REQUESTS):
+                chunk = asins[i:i + MAX_BATCH_REQUESTS]
+                try:
+                    batch = await self.client.messages.batches.create(requests=[
+                        {
+                            "custom_id": asin,
+                            "params": self._request_params(self._build_extraction_prompt(pending[asin])),
+                        }
+                        for asin in chunk
+                    ])
+                    logger.info(f"Submitted Message Batch {batch.id} ({len(chunk)} requests)")
+
+                    if not await self._wait_for_message_batch(batch.id, poll_interval_seconds, deadline):
+                        continue
+
+                    turnaround_ms = (datetime.now() - start_time).total_seconds() * 1000
+                    async for entry in await self.client.messages.batches.results(batch.id):
+                        product = pending.get(entry.custom_id)
+                        if product is None:
+                            continue
+
+                        if entry.result.type != "succeeded":
+                            logger.warning(f"Batch request for {entry.custom_id} {entry.result.type}")
+                            continue
+
+                        attributes = self._complete_extraction(
+                            product,
+                            self.content_key(product),
+                            entry.result.message,
+                            turnaround_ms,
+                            batch_id=batch.id
+                        )
+                        results[entry.custom_id] = attributes
+                        del pending[entry.custom_id]
+
+                        if attributes.get("extraction_failed"):
+                            failures += 1
+                        else:
+                            succeeded += 1
+
+                except anthropic.APIError as e:
+                    logger.error(f"Message Batch request failed: {type(e).__name__}: {e}")
+
+        elapsed = (datetime.now() - start_time).total_seconds()
+
+        logger.success(f"✓ Message Batches complete: {len(products)} products in {elapsed:.0f}s")
+        logger.info(f"  - Cache hits: {cache_hits}")
+        logger.info(f"  - Batch results: {succeeded}")
+        logger.info(f"  - Invalid results: {failures}")
+        logger.info(f"  - Unresolved: {len(pending)}")
+        self.log_rule_statistics(since=rule_stats_before)
+
+        # Errored / expired / timed-out requests
+        if pending:
+            if fallback_to_interactive:
+                logger.info(f"Extracting {len(pending)} unresolved products interactively...")
+                results.update(await self._extract_individually(list(pending.values())))
+            else:
+                for asin in pending:
+                    results[asin] = self._get_fallback_attributes()
+
+        # Variants share their representative's result; variants of failed
+        # representatives are extracted on their own
+        unresolved_variants = self._fan_out_variants(variants, results)
+        if unresolved_variants:
+            if fallback_to_interactive:
+                logger.info(f"Extracting {len(unresolved_variants)} variants whose group representative failed...")
+                results.update(await self._extract_individually(unresolved_variants))
+            else:
+                for product in unresolved_variants:
+                    results[product["asin"]] = self._get_fallback_attributes()
 
         return results
 
+    async def _extract_individually(self, products: List[Dict]) -> Dict[str, Dict]:
+        """
+        Extract already routed products (cache and rules checked) with one API call each
+
+        Args:
+            products: Product dicts that still need Claude
+
+        Returns:
+            Dict mapping ASIN to extracted (or fallback) attributes
+        """
+        extracted = await asyncio.gather(*(
+            self.extract_single(product, use_cache=False, use_rules=False)
+            for product in products
+        ))
+        return {product["asin"]: attributes for product, attributes in zip(products, extracted)}
+
+    async def _wait_for_message_batch(self, batch_id: str, poll_interval_seconds: float, deadline: float) -> bool:
+        """
+        Poll a Message Batch until it ends, cancelling it at the deadline
+
+        Returns:
+            bool: True if the batch ended (results available), False if it was cancelled
+        """
+        while True:
+            batch = await self.client.messages.batches.retrieve(batch_id)
+            counts = batch.request_counts
+
+            if batch.processing_status == "ended":
+                logger.info(
+                    f"Message Batch {batch_id} ended: {counts.succeeded} succeeded, "
+                    f"{counts.errored} errored, {counts.expired} expired, {counts.canceled} canceled"
+                )
+                return True
+
+            if time.monotonic() >= deadline:
+                logger.warning(f"Message Batch {batch_id} still {batch.processing_status} at timeout, cancelling")
+                try:
+                    await self.client.messages.batches.cancel(batch_id)
+                except anthropic.APIError as e:
+                    logger.warning(f"Failed to cancel Message Batch {batch_id}: {e}")
+                return False
+
+            logger.debug(
+                f"Message Batch {batch_id} {batch.processing_status}: "
+                f"{counts.processing} processing, {counts.succeeded} succeeded"
+            )
+            await asyncio.sleep(poll_interval_seconds)
+
     def save_results(self, results: Dict[str, Dict], output_path: Optional[Path] = None):
         """
         Save extraction results to file
@@ -499,7 +1397,7 @@ JSON:"""
                 "extraction_date": datetime.now().isoformat(),
                 "total_products": len(results),
                 "model": self.model,
-                "schema_version": "1.0"
+                "schema_version": self.schema_version
             },
             "products": results
         }
@@ -5,7 +5,7 @@ Generates new product ideas based on market gap analysis using Claude API
 import asyncio
 import json
 import re
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from loguru import logger
 
@@ -15,10 +15,113 @@ except ImportError:
     logger.error("anthropic package not installed. Run: pip install anthropic")
     raise
 
-from utils.budget_tracker import get_budget_tracker
+from utils.budget_tracker import get_budget_tracker, cache_usage
+from utils.llm_gateway import get_llm_gateway, LLMUnavailableError, PRIORITY_NORMAL
+from utils.structured_output import (
+    MODE_TEXT, MODE_TOOL, get_parse_stats, response_text, tool_input, tool_params, validate
+)
 from analyzers.gap_analyzer import MarketGapAnalyzer
 
 
+# Static ideation instructions, sent as a cached system block ahead of the market analysis
+IDEATION_SYSTEM_PROMPT = """You are a beauty product innovation strategist for LANEIGE. You turn market gap analyses into innovative, market-ready product ideas.
+
+## Task
+
+Generate the requested number of innovative product ideas that:
+1. **Address market gaps** - Target underserved attribute combinations
+2. **Leverage success patterns** - Incorporate ingredients/benefits that work
+3. **Are realistic** - Could actually be developed and launched
+4. **Differentiate LANEIGE** - Unique positioning vs. competitors
+
+For each idea, provide a JSON object with:
+
+```json
+{
+  "product_name": "Creative, marketable product name",
+  "category_position": "Specific category placement",
+  "tagline": "Compelling 1-sentence description",
+  "core_concept": "2-3 sentence explanation of what makes this unique",
+  "target_attributes": {
+    "primary_benefit": "Main benefit (e.g., Hydration, Anti-Aging)",
+    "key_ingredients": ["2-4 key active ingredients"],
+    "formula_type": "Product format (Cream, Serum, etc.)",
+    "texture": "Texture description",
+    "certifications": ["Clean beauty/ethical claims"],
+    "target_skin_type": ["Target skin types"],
+    "price_tier": "budget/affordable/mid_range/premium/luxury"
+  },
+  "market_opportunity_score": 7.5,
+  "rationale": "Why this will succeed (2-3 sentences): address the specific gap, explain competitive advantage, cite success patterns",
+  "competitive_advantage": "What makes this better than existing products (1-2 sentences)",
+  "risk_level": "Low/Medium/High",
+  "estimated_development_complexity": "Low/Medium/High"
+}
+```
+
+**Important**:
+- Use realistic ingredient combinations that work together
+- Price tiers should match ingredient quality and positioning
+- Benefits should align with ingredients
+- Be specific and creative, not generic
+- Each idea should be distinctly different from the others
+
+**Language Requirement**:
+- Write ALL content in Korean EXCEPT for proper nouns (product names, brand names like "LANEIGE", ingredient names like "Hyaluronic Acid", certification names)
+- product_name: English product name is acceptable (e.g., "Water Sleeping Hand Mask")
+- tagline, core_concept, rationale, competitive_advantage: Must be in Korean
+- key_ingredients, certifications: Keep in English (proper nouns)
+- All other descriptive text: Korean"""
+
+
+# Tool Claude answers through in structured output mode (one object per idea,
+# same fields as the JSON format in IDEATION_SYSTEM_PROMPT)
+IDEATION_TOOL_NAME = "record_product_ideas"
+
+_LEVELS = {"type": "string", "enum": ["Low", "Medium", "High"]}
+
+IDEA_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "product_name": {"type": "string"},
+        "category_position": {"type": "string"},
+        "tagline": {"type": "string"},
+        "core_concept": {"type": "string"},
+        "target_attributes": {
+            "type": "object",
+            "properties": {
+                "primary_benefit": {"type": "string"},
+                "key_ingredients": {"type": "array", "items": {"type": "string"}},
+                "formula_type": {"type": "string"},
+                "texture": {"type": "string"},
+                "certifications": {"type": "array", "items": {"type": "string"}},
+                "target_skin_type": {"type": "array", "items": {"type": "string"}},
+                "price_tier": {
+                    "type": "string",
+                    "enum": ["budget", "affordable", "mid_range", "premium", "luxury"],
+                },
+            },
+            "required": ["primary_benefit", "key_ingredients", "formula_type", "price_tier"],
+        },
+        "market_opportunity_score": {"type": "number"},
+        "rationale": {"type": "string"},
+        "competitive_advantage": {"type": "string"},
+        "risk_level": _LEVELS,
+        "estimated_development_complexity": _LEVELS,
+    },
+    "required": [
+        "product_name", "tagline", "core_concept", "target_attributes",
+        "market_opportunity_score", "rationale", "competitive_advantage",
+    ],
+}
+
+IDEAS_TOOL_SCHEMA = {
+    "type": "object",
+    "properties": {"ideas": {"type": "array", "items": IDEA_SCHEMA}},
+    "required": ["ideas"],
+}
+
+
 class IdeationEngine:
     """
     Generate innovative product ideas using AI
@@ -30,7 +133,8 @@ class IdeationEngine:
     def __init__(
         self,
         api_key: Optional[str] = None,
-        model: str = "claude-haiku-4-5-20251001"
+        model: str = "claude-haiku-4-5-20251001",
+        structured_output: bool = True
     ):
         """
         Initialize ideation engine
@@ -38,16 +142,16 @@ class IdeationEngine:
         Args:
             api_key: Anthropic API key
             model: Claude model to use
+            structured_output: Return ideas through a schema-validated tool call
+                instead of parsing a JSON array from the text
         """
-        self.client = anthropic.Anthropic(
-            api_key=api_key,
-            timeout=30.0,
-            max_retries=1,
-        )
+        # Shared LLM gateway (rate limits, backoff, circuit breaker across the pipeline)
+        self.gateway = get_llm_gateway(api_key=api_key)
         self.model = model
+        self.structured_output = structured_output
+        self.parse_stats = get_parse_stats()
         self.budget_tracker = get_budget_tracker()
         self.gap_analyzer = MarketGapAnalyzer()
-        self._api_available = True  # Circuit breaker
 
         logger.info(f"IdeationEngine initialized (model: {model})")
 
@@ -71,7 +175,7 @@ class IdeationEngine:
         logger.info(f"Generating {num_ideas} product ideas for: {category_name}")
 
         # Circuit breaker: skip if API unavailable
-        if not self._api_available:
+        if not self.gateway.available:
             logger.debug(f"API disabled (circuit breaker), skipping ideation for {category_name}")
             return []
 
@@ -87,45 +191,65 @@ class IdeationEngine:
             num_ideas
         )
 
+        output_params = tool_params(
+            IDEATION_TOOL_NAME,
+            "Record the generated product ideas.",
+            IDEAS_TOOL_SCHEMA
+        ) if self.structured_output else {}
+
         # Call Claude API
         try:
             start_time = datetime.now()
 
-            message = self.client.messages.create(
+            message = self.gateway.create(
+                "product_ideation",
+                priority=PRIORITY_NORMAL,
                 model=self.model,
                 max_tokens=4096,
                 temperature=0.7,  # Higher temperature for creativity
-                messages=[{"role": "user", "content": prompt}]
+                system=[{
+                    "type": "text",
+                    "text": IDEATION_SYSTEM_PROMPT,
+                    "cache_control": {"type": "ephemeral"},
+                }],
+                messages=[{"role": "user", "content": prompt}],
+                **output_params
             )
 
             extraction_time_ms = (datetime.now() - start_time).total_seconds() * 1000
 
-            # Record usage
-            usage_summary = self.budget_tracker.record_usage(
-                input_tokens=message.usage.input_tokens,
-                output_tokens=message.usage.output_tokens,
-                model=self.model,
-                task_type="product_ideation"
-            )
-
-            logger.info(
-                f"Ideation API call: ${usage_summary['request_cost']:.4f} "
-                f"({message.usage.input_tokens}+{message.usage.output_tokens} tokens, "
-                f"{extraction_time_ms:.0f}ms)"
-            )
+            if getattr(message, "from_cache", False):
+                logger.info(f"Ideation response served from LLM cache ({extraction_time_ms:.0f}ms)")
+            else:
+                # Record usage
+                usage_summary = self.budget_tracker.record_usage(
+                    input_tokens=message.usage.input_tokens,
+                    output_tokens=message.usage.output_tokens,
+                    model=self.model,
+                    task_type="product_ideation",
+                    latency_ms=extraction_time_ms,
+                    **cache_usage(message.usage)
+                )
+
+                logger.info(
+                    f"Ideation API call: ${usage_summary['request_cost']:.4f} "
+                    f"({message.usage.input_tokens}+{message.usage.output_tokens} tokens, "
+                    f"{extraction_time_ms:.0f}ms)"
+                )
 
             # Parse response
-            response_text = message.content[0].text
-            ideas = self._parse_ideas_response(response_text, category_name)
+            ideas = self._ideas_from_message(message, category_name)
 
             logger.success(f"✓ Generated {len(ideas)} ideas for {category_name}")
 
             return ideas
 
+        except LLMUnavailableError:
+            logger.debug(f"API disabled (circuit breaker), skipping ideation for {category_name}")
+            return []
+
         except anthropic.APIConnectionError as e:
             logger.error(f"API connection error for {category_name}: {e}")
-            logger.warning("⚠ Disabling Claude API for remaining ideation (circuit breaker)")
-            self._api_available = False
             return []
 
         except Exception as e:
@@ -138,7 +262,7 @@ class IdeationEngine:
         gap_analysis: Dict,
         num_ideas: int
     ) -> str:
-        """Build Claude prompt for product ideation"""
+        """Build the per-category ideation prompt (instructions are in IDEATION_SYSTEM_PROMPT)"""
 
         # Extract key insights
         underserved = gap_analysis.get("underserved_combinations", [])[:10]
@@ -166,7 +290,7 @@ class IdeationEngine:
             for opp in opportunities
         ])
 
-        prompt = f"""You are a beauty product innovation strategist for LANEIGE. Generate {num_ideas} innovative, market-ready product ideas for the "{category_name}" category based on this market analysis.
+        prompt = f"""Generate {num_ideas} innovative, market-ready product ideas for the "{category_name}" category based on this market analysis.
 
 ## Market Analysis Summary
 
@@ -190,58 +314,49 @@ class IdeationEngine:
 **Preferred Price Tiers**:
 {', '.join([f"{item['tier']} ({item['percentage']}%)" for item in success_patterns.get('top_price_tiers', [])[:3]])}
 
-## Task
+Return ONLY a valid JSON array of {num_ideas} idea objects. No other text.
 
-Generate {num_ideas} innovative product ideas that:
-1. **Address market gaps** - Target underserved attribute combinations
-2. **Leverage success patterns** - Incorporate ingredients/benefits that work
-3. **Are realistic** - Could actually be developed and launched
-4. **Differentiate LANEIGE** - Unique positioning vs. competitors
+JSON Array:"""
 
-For each idea, provide a JSON object with:
+        return prompt
 
-```json
-{{
-  "product_name": "Creative, marketable product name",
-  "category_position": "Specific category placement",
-  "tagline": "Compelling 1-sentence description",
-  "core_concept": "2-3 sentence explanation of what makes this unique",
-  "target_attributes": {{
-    "primary_benefit": "Main benefit (e.g., Hydration, Anti-Aging)",
-    "key_ingredients": ["2-4 key active ingredients"],
-    "formula_type": "Product format (Cream, Serum, etc.)",
-    "texture": "Texture description",
-    "certifications": ["Clean beauty/ethical claims"],
-    "target_skin_type": ["Target skin types"],
-    "price_tier": "budget/affordable/mid_range/premium/luxury"
-  }},
-  "market_opportunity_score": 7.5,
-  "rationale": "Why this will succeed (2-3 sentences): address the specific gap, explain competitive advantage, cite success patterns",
-  "competitive_advantage": "What makes this better than existing products (1-2 sentences)",
-  "risk_level": "Low/Medium/High",
-  "estimated_development_complexity": "Low/Medium/High"
-}}
-```
+    def _ideas_from_message(self, message: Any, category_name: str) -> List[Dict]:
+        """
+        Product ideas from a response
 
-**Important**:
-- Use realistic ingredient combinations that work together
-- Price tiers should match ingredient quality and positioning
-- Benefits should align with ingredients
-- Be specific and creative, not generic
-- Each idea should be distinctly different from the others
+        Uses the ideation tool's input when present; each idea is validated
+        on its own and dropped if it does not match IDEA_SCHEMA. Without a
+        tool call, falls back to parsing the text.
+        """
+        structured = tool_input(message, IDEATION_TOOL_NAME)
+        if structured is None:
+            return self._parse_ideas_response(response_text(message), category_name)
+
+        ideas = structured.get("ideas")
+        if not isinstance(ideas, list):
+            self.parse_stats.record("product_ideation", MODE_TOOL, False)
+            logger.error("Structured ideation response has no ideas array")
+            return []
 
-**Language Requirement**:
-- Write ALL content in Korean EXCEPT for proper nouns (product names, brand names like "LANEIGE", ingredient names like "Hyaluronic Acid", certification names)
-- product_name: English product name is acceptable (e.g., "Water Sleeping Hand Mask")
-- tagline, core_concept, rationale, competitive_advantage: Must be in Korean
-- key_ingredients, certifications: Keep in English (proper nouns)
-- All other descriptive text: Korean
+        valid_ideas = []
+        for i, idea in enumerate(ideas):
+            errors = validate(idea, IDEA_SCHEMA, f"ideas[{i}]")
+            self.parse_stats.record("product_ideation", MODE_TOOL, not errors)
+            if errors:
+                logger.warning(f"Dropping idea that does not match schema: {'; '.join(errors[:5])}")
+            else:
+                valid_ideas.append(idea)
 
-Return ONLY a valid JSON array of {num_ideas} idea objects. No other text.
+        return self._add_idea_metadata(valid_ideas, category_name)
 
-JSON Array:"""
+    def _add_idea_metadata(self, ideas: List[Dict], category_name: str) -> List[Dict]:
+        """Tag ideas with category, timestamp and model"""
+        for idea in ideas:
+            idea["category"] = category_name
+            idea["generated_at"] = datetime.now().isoformat()
+            idea["generated_by"] = self.model
 
-        return prompt
+        return ideas
 
     def _parse_ideas_response(
         self,
@@ -267,19 +382,18 @@ JSON Array:"""
                 logger.warning("Response is not a list, wrapping in array")
                 ideas = [ideas]
 
-            # Add metadata to each idea
-            for idea in ideas:
-                idea["category"] = category_name
-                idea["generated_at"] = datetime.now().isoformat()
-                idea["generated_by"] = self.model
+            self.parse_stats.record("product_ideation", MODE_TEXT, True)
 
-            return ideas
+            # Add metadata to each idea
+            return self._add_idea_metadata(ideas, category_name)
 
         except json.JSONDecodeError as e:
+            self.parse_stats.record("product_ideation", MODE_TEXT, False)
             logger.error(f"Failed to parse JSON from ideation response: {e}")
             logger.debug(f"Response text: {response_text[:500]}")
             return []
         except Exception as e:
+            self.parse_stats.record("product_ideation", MODE_TEXT, False)
             logger.error(f"Unexpected error parsing ideas: {e}")
             return []
 
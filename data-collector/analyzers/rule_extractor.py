@@ -0,0 +1,233 @@
+"""
+Rule-Based Attribute Extractor
+Matches the attribute vocabularies in attribute_schema.yaml against product
+text locally, so products whose name/features already decide the attributes
+do not need a Claude call
+"""
+import re
+from collections import defaultdict
+from typing import Dict, List, Any, Tuple
+
+
+# Confidence of a match by where it was found
+DEFAULT_SOURCE_WEIGHTS = {
+    "name": 0.9,
+    "features": 0.8,
+    "category": 0.75,
+    "description": 0.65,
+}
+
+# Confidence multiplier when a single-value field matched several values
+AMBIGUITY_PENALTY = 0.7
+
+# Bonus per additional source agreeing on a value
+CORROBORATION_BONUS = 0.05
+MAX_CONFIDENCE = 0.98
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, with hyphens and whitespace runs collapsed to one space"""
+    return re.sub(r"[\s\-]+", " ", text.lower()).strip()
+
+
+def _value_terms(value: str) -> List[str]:
+    """
+    Search terms for a vocabulary value
+
+    "Vitamin C (Ascorbic Acid)" -> Vitamin C (Ascorbic Acid), Vitamin C, Ascorbic Acid
+    "Retinol / Retinoids"       -> Retinol / Retinoids, Retinol, Retinoids
+    "Fine Lines & Wrinkles"     -> Fine Lines & Wrinkles, Fine Lines, Wrinkles
+    """
+    base, _, qualifier = value.partition("(")
+    parts = [base] + qualifier.rstrip(")").split(",")
+
+    terms = [value]
+    for part in parts:
+        for piece in re.split(r"\s*/\s*|\s+&\s+", part):
+            piece = piece.strip()
+            # Skip fragments that are too short or not words (e.g. "<3.4oz", "AM")
+            if len(piece) >= 3 and re.search(r"[a-zA-Z]{3}", piece):
+                terms.append(piece)
+
+    return terms
+
+
+class RuleBasedExtractor:
+    """
+    Local attribute extraction with per-field confidence
+
+    All vocabulary terms (plus configured synonyms) are compiled into one
+    case-insensitive alternation, so each text source is scanned once.
+    A field's confidence depends on where its value was found (name >
+    features > category > description), whether several sources agree,
+    and whether a single-value field matched conflicting values.
+
+    The product confidence is the lower of the weakest required field and
+    the mean of the critical fields (validation.minimum_required_attributes
+    and extraction_priority.critical in attribute_schema.yaml). Field
+    coverage counts every schema field: a single-value field without a
+    match, or a required list without a match, is undetermined (it would
+    be stored as "Unknown"/[] where Claude could have filled it in).
+    """
+
+    def __init__(self, schema: Dict, fields: Dict[str, Dict[str, str]]):
+        """
+        Initialize rule-based extractor
+
+        Args:
+            schema: Parsed attribute_schema.yaml
+            fields: {section: {field: "string" | "array"}} - the attributes to produce
+        """
+        config = schema.get("rule_extraction", {})
+        self.fields = fields
+        self.min_confidence = config.get("min_confidence", 0.75)
+        self.absent_list_confidence = config.get("absent_list_confidence", 0.6)
+        self.min_field_coverage = config.get("min_field_coverage", 0.7)
+        self.source_weights = {**DEFAULT_SOURCE_WEIGHTS, **config.get("source_weights", {})}
+
+        field_paths = {f"{section}.{field}" for section, section_fields in fields.items() for field in section_fields}
+        self.required_fields = [
+            path for path in schema.get("validation", {}).get("minimum_required_attributes", [])
+            if path in field_paths
+        ]
+        self.critical_fields = [
+            path for path in schema.get("extraction_priority", {}).get("critical", [])
+            if path in field_paths
+        ]
+
+        # Normalized term -> [(section, field, canonical value)]
+        self._targets: Dict[str, List[Tuple[str, str, str]]] = defaultdict(list)
+        categories = schema.get("attribute_categories", {})
+
+        for section, section_fields in fields.items():
+            for field in section_fields:
+                values = (categories.get(section) or {}).get(field) or []
+                for value in values:
+                    for term in _value_terms(value):
+                        self._add_term(term, section, field, value)
+
+        for path, value_synonyms in (config.get("synonyms") or {}).items():
+            section, _, field = path.partition(".")
+            if f"{section}.{field}" not in field_paths:
+                continue
+            for value, synonyms in value_synonyms.items():
+                for term in synonyms:
+                    self._add_term(term, section, field, value)
+
+        # Longest terms first so "Hyaluronic Acid Serum" style phrases win over their parts
+        alternatives = sorted(self._targets, key=len, reverse=True)
+        self._pattern = re.compile(
+            r"(?<!\w)(?:" + "|".join(
+                r"[\s\-]+".join(re.escape(word) for word in term.split(" "))
+                for term in alternatives
+            ) + r")(?!\w)",
+            re.IGNORECASE,
+        )
+
+    def _add_term(self, term: str, section: str, field: str, value: str):
+        target = (section, field, value)
+        key = _normalize(term)
+        if key and target not in self._targets[key]:
+            self._targets[key].append(target)
+
+    @property
+    def term_count(self) -> int:
+        """Number of distinct compiled search terms"""
+        return len(self._targets)
+
+    @staticmethod
+    def _sources(product_data: Dict) -> Dict[str, str]:
+        """Product text by source"""
+        breadcrumb = product_data.get("breadcrumb") or []
+        features = product_data.get("features") or []
+
+        return {
+            "name": str(product_data.get("name") or ""),
+            "features": " | ".join(str(f) for f in features) if isinstance(features, list) else str(features),
+            "category": " > ".join(breadcrumb) if breadcrumb else str(product_data.get("category") or ""),
+            "description": str(product_data.get("description") or ""),
+        }
+
+    def extract(self, product_data: Dict) -> Dict[str, Any]:
+        """
+        Extract attributes from product text
+
+        Args:
+            product_data: Product information dict (name, description, features, breadcrumb/category)
+
+        Returns:
+            dict: {"attributes": {...}, "confidence": float, "field_confidence": {"section.field": float},
+                   "coverage": float, "undetermined_fields": ["section.field", ...]}
+        """
+        # (section, field) -> value -> {"weight", "sources", "order"}
+        candidates: Dict[Tuple[str, str], Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        order = 0
+
+        for source, text in self._sources(product_data).items():
+            if not text:
+                continue
+            weight = self.source_weights.get(source, 0.5)
+
+            for match in self._pattern.finditer(text):
+                for section, field, value in self._targets.get(_normalize(match.group()), []):
+                    hit = candidates[(section, field)].setdefault(
+                        value, {"weight": 0.0, "sources": set(), "order": order}
+                    )
+                    hit["weight"] = max(hit["weight"], weight)
+                    hit["sources"].add(source)
+                    order += 1
+
+        attributes = {}
+        field_confidence = {}
+        undetermined = []
+
+        for section, section_fields in self.fields.items():
+            attributes[section] = {}
+
+            for field, field_type in section_fields.items():
+                path = f"{section}.{field}"
+                hits = candidates.get((section, field), {})
+
+                if not hits:
+                    attributes[section][field] = [] if field_type == "array" else "Unknown"
+                    absent_ok = field_type == "array" and path not in self.required_fields
+                    field_confidence[path] = self.absent_list_confidence if absent_ok else 0.0
+                    if not absent_ok:
+                        undetermined.append(path)
+                    continue
+
+                def score(hit: Dict[str, Any]) -> float:
+                    bonus = CORROBORATION_BONUS * (len(hit["sources"]) - 1)
+                    return min(MAX_CONFIDENCE, hit["weight"] + bonus)
+
+                ranked = sorted(hits.items(), key=lambda item: (-score(item[1]), item[1]["order"]))
+
+                if field_type == "array":
+                    attributes[section][field] = sorted(hits, key=lambda value: hits[value]["order"])
+                    field_confidence[path] = score(ranked[0][1])
+                else:
+                    attributes[section][field] = ranked[0][0]
+                    confidence = score(ranked[0][1])
+                    if len(ranked) > 1:
+                        confidence *= AMBIGUITY_PENALTY
+                    field_confidence[path] = confidence
+
+        required = [field_confidence[path] for path in self.required_fields]
+        critical = [field_confidence[path] for path in self.critical_fields]
+
+        confidence = min(
+            min(required) if required else 1.0,
+            sum(critical) / len(critical) if critical else 1.0,
+        )
+
+        return {
+            "attributes": attributes,
+            "confidence": round(confidence, 3),
+            "field_confidence": {path: round(value, 3) for path, value in field_confidence.items()},
+            "coverage": round(1 - len(undetermined) / len(field_confidence), 3) if field_confidence else 1.0,
+            "undetermined_fields": undetermined,
+        }
+
+    def is_confident(self, result: Dict[str, Any]) -> bool:
+        """Whether a result from extract() can be used without Claude (confident and covering enough fields)"""
+        return result["confidence"] >= self.min_confidence and result["coverage"] >= self.min_field_coverage
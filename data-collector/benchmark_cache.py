@@ -0,0 +1,110 @@
+"""
+Benchmark for CacheManager backends
+Compares set() throughput of the JSON and SQLite backends at 1k, 10k and
+100k entries
+
+Each size is measured by pre-filling the cache to N entries (not timed) and
+then timing a sample of additional set() calls, so the numbers show the
+per-write cost at that cache size. The JSON backend rewrites the whole file
+on every set(), so its sample is kept small at large sizes.
+
+Usage:
+    python benchmark_cache.py
+    python benchmark_cache.py --sizes 1000 10000 --sample 200
+"""
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from loguru import logger
+
+from utils.cache_manager import CacheManager
+
+
+def make_product(i: int) -> dict:
+    """Product record of realistic size (~1 KB)"""
+    return {
+        "asin": f"B{i:09d}",
+        "url": f"https://www.amazon.com/dp/B{i:09d}",
+        "scraped_at": datetime.now().isoformat(),
+        "brand": "Benchmark Brand",
+        "product_name": f"Benchmark Hydrating Lip Sleeping Mask Berry {i}",
+        "price": {"current_price": 24.0, "currency": "USD", "list_price": 30.0},
+        "rating": 4.6,
+        "review_count": 12345,
+        "breadcrumb": "Beauty & Personal Care > Skin Care > Lip Care",
+        "category": "Lip Care",
+        "images": [f"https://m.media-amazon.com/images/I/{i}.jpg"],
+        "description": "Overnight lip mask with berry fruit complex and vitamin C. " * 5,
+        "features": ["Hydrating", "Overnight", "Vitamin C", "Berry scent"],
+        "availability": "In Stock",
+    }
+
+
+def prefill(cache: CacheManager, size: int):
+    """Fill the cache to `size` entries without timing"""
+    now = datetime.now()
+    expires_at = now.timestamp() + cache.cache_ttl.total_seconds()
+    entries = {
+        f"B{i:09d}": {"data": make_product(i), "cached_at": now.isoformat(), "expires_at": expires_at}
+        for i in range(size)
+    }
+
+    if cache.backend.name == "json":
+        cache.backend.cache_data = entries
+        cache.backend._build_expiry_index()
+        cache.backend._save_cache()
+    else:
+        with cache.backend.conn:
+            cache.backend.conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, data, cached_at, expires_at) VALUES (?, ?, ?, ?)",
+                [(key, json.dumps(e["data"]), e["cached_at"], e["expires_at"]) for key, e in entries.items()],
+            )
+
+
+def benchmark(backend: str, size: int, sample: int) -> dict:
+    """Time `sample` set() calls on a cache pre-filled to `size` entries"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = CacheManager(Path(tmp), cache_ttl_hours=24, backend=backend)
+        prefill(cache, size)
+
+        start = time.perf_counter()
+        for i in range(size, size + sample):
+            cache.set(f"B{i:09d}", make_product(i))
+        cache.flush()
+        elapsed = time.perf_counter() - start
+        cache.close()
+
+    return {
+        "backend": backend,
+        "size": size,
+        "sample": sample,
+        "sets_per_second": sample / elapsed,
+        "ms_per_set": elapsed / sample * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CacheManager backend benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--sample", type=int, default=500, help="Timed set() calls per size (sqlite)")
+    parser.add_argument("--json-sample", type=int, default=20, help="Timed set() calls per size (json)")
+    args = parser.parse_args()
+
+    logger.remove()  # Keep output to the results table
+
+    results = []
+    for size in args.sizes:
+        for backend, sample in (("json", args.json_sample), ("sqlite", args.sample)):
+            results.append(benchmark(backend, size, sample))
+
+    print(f"{'entries':>10} | {'backend':>7} | {'sets/sec':>10} | {'ms/set':>9}")
+    print("-" * 46)
+    for r in results:
+        print(f"{r['size']:>10,} | {r['backend']:>7} | {r['sets_per_second']:>10,.1f} | {r['ms_per_set']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
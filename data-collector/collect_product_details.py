@@ -8,7 +8,7 @@ from pathlib import Path
 from loguru import logger
 from datetime import datetime
 
-from scrapers.product_detail_scraper import ProductDetailScraper
+from scrapers.product_detail_scraper import ProductDetailScraper, DETAIL_PAGE_BUNDLE
 from analyzers.product_analyzer import ProductAnalyzer
 from config.settings import OUTPUT_DIR, DATA_DIR
 
@@ -128,6 +128,9 @@ async def collect_product_details(
     logger.success(f"💾 Saved to: {output_file}")
     logger.success(f"{'='*80}")
 
+    # Which selector fallbacks actually matched (to prune dead selectors)
+    DETAIL_PAGE_BUNDLE.log_selector_report()
+
     return product_details
 
 
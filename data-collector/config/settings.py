@@ -155,6 +155,7 @@ REVIEW_ANALYSIS = {
     "max_reviews_per_product": 100,  # MVP limit
     "languages": ["en"],        # English only for MVP
     "sentiment_threshold": 0.5, # Neutral threshold
+    "incremental": True,        # Analyze only reviews not seen in earlier runs (per-ASIN store)
 }
 
 # M1 Data Generation Settings
@@ -171,6 +172,7 @@ M2_SETTINGS = {
     "max_contexts_per_product": 5,
     "key_phrases_count": 5,
     "sample_reviews_per_context": 3,
+    "review_analysis_concurrency": 4,  # Products whose reviews are analyzed at once
 }
 
 # Database Settings
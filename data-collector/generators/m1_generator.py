@@ -8,11 +8,11 @@ from typing import Dict, List, Any, Set
 from datetime import datetime
 from pathlib import Path
 from loguru import logger
-import anthropic
 
 from processors.volatility_calculator import VolatilityCalculator
 from processors.traffic_estimator import TrafficEstimator
 from utils.auto_competitor_selector import AutoCompetitorSelector
+from utils.llm_gateway import get_llm_gateway, PRIORITY_HIGH
 from config.settings import OUTPUT_DIR, OUTPUT_SETTINGS, CONFIG_DIR, DATA_DIR, ANTHROPIC_API_KEY, CLAUDE_SETTINGS
 
 
@@ -35,15 +35,15 @@ class M1Generator:
         self.competitor_selector = AutoCompetitorSelector()
         self.target_asins = set()  # Will be populated dynamically
 
-        # Initialize Claude API client
+        # Claude calls go through the shared LLM gateway (rate limits, backoff, circuit breaker)
         if ANTHROPIC_API_KEY:
-            self.client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+            self.gateway = get_llm_gateway(api_key=ANTHROPIC_API_KEY)
             self.model = CLAUDE_SETTINGS.get("model", "claude-haiku-4-5-20251001")
             self.max_tokens = CLAUDE_SETTINGS.get("max_tokens", 4000)
             self.temperature = CLAUDE_SETTINGS.get("temperature", 0.7)
             logger.info("✓ Claude API client initialized for brand analysis")
         else:
-            self.client = None
+            self.gateway = None
             logger.warning("⚠ ANTHROPIC_API_KEY not set. Will use rule-based brand analysis.")
 
     def _extract_brand_from_product_name(self, product_name: str) -> str:
@@ -794,7 +794,7 @@ class M1Generator:
             "높은 고객 만족도 유지"
         ]
 
-        if not self.client:
+        if not self.gateway or not self.gateway.available:
             return fallback_strengths
 
         try:
@@ -837,7 +837,9 @@ class M1Generator:
 K-Beauty 트렌드 선도로 차별화 성공
 """
 
-            response = self.client.messages.create(
+            response = self.gateway.create(
+                "m1_key_strengths",
+                priority=PRIORITY_HIGH,
                 model=self.model,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
@@ -2,17 +2,18 @@
 M2 Data Generator
 Generates M2 module JSON files from review analysis
 """
+import asyncio
 import json
 import yaml
 from typing import Dict, List, Any, Optional, Set
 from datetime import datetime
 from pathlib import Path
 from loguru import logger
-import anthropic
 
 from processors.review_analyzer import ReviewAnalyzer
 from utils.auto_competitor_selector import AutoCompetitorSelector
-from config.settings import OUTPUT_DIR, OUTPUT_SETTINGS, ANTHROPIC_API_KEY, CONFIG_DIR, DATA_DIR, CLAUDE_SETTINGS
+from utils.llm_gateway import get_llm_gateway, PRIORITY_HIGH
+from config.settings import OUTPUT_DIR, OUTPUT_SETTINGS, ANTHROPIC_API_KEY, CONFIG_DIR, DATA_DIR, CLAUDE_SETTINGS, M2_SETTINGS
 
 
 class M2Generator:
@@ -32,15 +33,15 @@ class M2Generator:
         self.competitor_selector = AutoCompetitorSelector()
         self.target_asins = set()  # Will be populated dynamically
 
-        # Initialize Claude API client for strategic recommendations
+        # Claude calls go through the shared LLM gateway (rate limits, backoff, circuit breaker)
         if ANTHROPIC_API_KEY:
-            self.client = anthropic.Anthropic(api_key=api_key or ANTHROPIC_API_KEY)
+            self.gateway = get_llm_gateway(api_key=api_key or ANTHROPIC_API_KEY)
             self.model = CLAUDE_SETTINGS.get("model", "claude-haiku-4-5-20251001")
             self.max_tokens = CLAUDE_SETTINGS.get("max_tokens", 4000)
             self.temperature = CLAUDE_SETTINGS.get("temperature", 0.7)
             logger.info("✓ Claude API client initialized for strategic recommendations")
         else:
-            self.client = None
+            self.gateway = None
             logger.warning("⚠ ANTHROPIC_API_KEY not set. Will use rule-based recommendations.")
 
     def _extract_brand_from_product_name(self, product_name: str) -> str:
@@ -133,6 +134,19 @@ class M2Generator:
         self,
         products_data: Dict[str, Any],
         reviews_data: Dict[str, Dict]
+    ) -> Dict[str, Any]:
+        """
+        Generate m2_usage_context.json (blocking wrapper for scripts without an event loop)
+
+        See generate_usage_context_async()
+        """
+        return asyncio.run(self.generate_usage_context_async(products_data, reviews_data))
+
+    async def generate_usage_context_async(
+        self,
+        products_data: Dict[str, Any],
+        reviews_data: Dict[str, Dict],
+        max_concurrency: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Generate m2_usage_context.json
@@ -140,9 +154,14 @@ class M2Generator:
         Focuses on LANEIGE + competitor products only for detailed analysis
         Uses target ASINs set by M1 or selected dynamically
 
+        Products are analyzed concurrently (usage contexts and demographics
+        in parallel per product, at most max_concurrency products at once);
+        the output lists products in ASIN order regardless of completion order.
+
         Args:
             products_data: Product details (all 500 products)
             reviews_data: Reviews for each product (all 500 products)
+            max_concurrency: Products analyzed at once (default: M2_SETTINGS)
 
         Returns:
             dict: Usage context data (target products based on hybrid selection)
@@ -174,10 +193,10 @@ class M2Generator:
 
         logger.info(f"Analyzing {len(asins_to_analyze)} products with available review data")
 
-        products_list = []
+        jobs = []
         skipped_count = 0
 
-        for asin in asins_to_analyze:
+        for asin in sorted(asins_to_analyze):
             # Get product info
             product_info = products_data.get(asin, {})
 
@@ -191,44 +210,77 @@ class M2Generator:
                 skipped_count += 1
                 continue
 
-            # Extract correct brand name
-            brand = self._get_brand(product_info)
-
-            logger.info(f"Analyzing reviews for {brand} - {product_info.get('product_name', '')[:30]}")
-
-            # Analyze reviews with Claude
-            analysis = self.analyzer.analyze_reviews_batch(
-                reviews,
-                product_info.get("product_name", ""),
-                product_info.get("category", "")
-            )
+            jobs.append((asin, product_info, reviews))
 
-            # Analyze demographics
-            demographics = self.analyzer.analyze_demographic_insights(reviews)
+        semaphore = asyncio.Semaphore(max_concurrency or M2_SETTINGS.get("review_analysis_concurrency", 4))
 
-            product_entry = {
-                "brand": brand,
-                "product": product_info.get("product_name", "Unknown")[:50],
-                "usage_contexts": analysis.get("usage_contexts", []),
-                "demographic_insights": demographics,
-            }
+        async def analyze(asin: str, product_info: Dict, reviews: List[Dict]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await self._analyze_product_reviews(asin, product_info, reviews)
+                except Exception as e:
+                    logger.error(f"Review analysis failed for {asin}, using fallback: {type(e).__name__}: {e}")
+                    return self._usage_context_entry(
+                        product_info,
+                        self.analyzer._fallback_analysis(reviews),
+                        self.analyzer._fallback_demographics()
+                    )
 
-            products_list.append(product_entry)
+        start_time = datetime.now()
+        # gather() keeps job order, so the output does not depend on which call finishes first
+        products_list = await asyncio.gather(*(analyze(*job) for job in jobs))
+        elapsed = (datetime.now() - start_time).total_seconds()
 
         output = {
             "brand": "Multiple Brands",
             "analysis_date": datetime.now().strftime("%Y-%m-%d"),
-            "products": products_list
+            "products": list(products_list)
         }
 
         # Save to file
         self._save_json(output, "m2_usage_context.json")
 
-        logger.success(f"✓ Generated usage context data for {len(products_list)} target products")
+        logger.success(f"✓ Generated usage context data for {len(products_list)} target products in {elapsed:.1f}s")
         logger.info(f"  Analyzed: {len(products_list)} products (LANEIGE + Competitors)")
         logger.info(f"  Skipped: {skipped_count} non-target products")
+        self.analyzer.log_incremental_statistics()
         return output
 
+    async def _analyze_product_reviews(self, asin: str, product_info: Dict, reviews: List[Dict]) -> Dict[str, Any]:
+        """Usage contexts (new reviews only) and demographics for one product, both prompts in parallel"""
+        # Extract correct brand name
+        brand = self._get_brand(product_info)
+
+        logger.info(f"Analyzing reviews for {brand} - {product_info.get('product_name', '')[:30]}")
+
+        # Analyze reviews and demographics with Claude
+        analysis, demographics = await asyncio.gather(
+            self.analyzer.analyze_product_reviews_async(
+                asin,
+                reviews,
+                product_info.get("product_name", ""),
+                product_info.get("category", "")
+            ),
+            self.analyzer.analyze_demographic_insights_async(reviews)
+        )
+
+        return self._usage_context_entry(product_info, analysis, demographics, brand)
+
+    def _usage_context_entry(
+        self,
+        product_info: Dict,
+        analysis: Dict[str, Any],
+        demographics: Dict[str, Any],
+        brand: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """One product's entry in m2_usage_context.json"""
+        return {
+            "brand": brand or self._get_brand(product_info),
+            "product": product_info.get("product_name", "Unknown")[:50],
+            "usage_contexts": analysis.get("usage_contexts", [])[:M2_SETTINGS["max_contexts_per_product"]],
+            "demographic_insights": demographics,
+        }
+
     def generate_intelligence_bridge(
         self,
         m1_breadcrumb: Dict,
@@ -545,7 +597,7 @@ class M2Generator:
             List of strategic recommendations
         """
         # If Claude API not available, use fallback
-        if not self.client:
+        if not self.gateway or not self.gateway.available:
             return self._generate_strategic_recommendations_fallback(
                 m1_laneige, m1_volatility, focus_product, m1_emerging
             )
@@ -633,7 +685,9 @@ class M2Generator:
 JSON 배열만 반환하세요 (다른 텍스트 없이).
 """
 
-            response = self.client.messages.create(
+            response = self.gateway.create(
+                "m2_strategic_recommendations",
+                priority=PRIORITY_HIGH,
                 model=self.model,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
@@ -19,12 +19,18 @@ from config.settings import (
 )
 
 # Import scrapers
-from scrapers.product_scraper import ProductScraper
+from scrapers.product_scraper import ProductScraper, PRODUCT_PAGE_BUNDLE
+from scrapers.http_fetcher import HttpProductFetcher
 from scrapers.rank_scraper import RankScraper
 from scrapers.review_scraper import ReviewScraper
 
 # Import utilities
 from utils.cache_manager import CacheManager
+from utils.collection_journal import CollectionJournal
+from utils.stage_queue import MonitoredQueue
+from utils.llm_cache import get_llm_cache
+from utils.llm_gateway import get_llm_gateway
+from utils.structured_output import get_parse_stats
 
 # Setup logging
 logger.add(
@@ -39,7 +45,8 @@ logger.add(
 class DataCollectionPipeline:
     """Main pipeline for collecting and processing Amazon data"""
 
-    def __init__(self):
+    def __init__(self, resume: bool = False, llm_cache_mode: str = None):
+        self.resume = resume
         self.products_config = self._load_config("products.yaml")
         self.categories_config = self._load_config("categories.yaml")
         self.scheduler_config = self._load_config("scheduler_config.yaml")
@@ -49,13 +56,18 @@ class DataCollectionPipeline:
 
         # Initialize cache manager
         cache_dir = DATA_DIR / "cache"
-        cache_ttl = self.scheduler_config.get("cache", {}).get("ttl_hours", 24)
-        self.cache_manager = CacheManager(cache_dir, cache_ttl_hours=cache_ttl)
+        cache_config = self.scheduler_config.get("cache", {})
+        self.cache_manager = CacheManager(
+            cache_dir,
+            cache_ttl_hours=cache_config.get("ttl_hours", 24),
+            backend=cache_config.get("backend", "sqlite"),
+            commit_every=cache_config.get("commit_every", 50),
+        )
 
         # Clean up expired cache entries on startup
         self.cache_manager.clear_expired()
         cache_stats = self.cache_manager.get_stats()
-        logger.info(f"Cache initialized: {cache_stats['valid_entries']} valid entries (TTL: {cache_stats['cache_ttl_hours']}h)")
+        logger.info(f"Cache initialized: {cache_stats['valid_entries']} valid entries (backend: {cache_stats['backend']}, TTL: {cache_stats['cache_ttl_hours']}h)")
 
         # Storage for collected data
         self.collected_data = {
@@ -65,6 +77,54 @@ class DataCollectionPipeline:
             "attributes": {},  # Step 7: Extracted product attributes
         }
 
+        # Append-only journal of collected items (crash-safe resume)
+        journal_config = self.scheduler_config.get("journal", {})
+        self.journal = CollectionJournal(
+            DATA_DIR / "journal",
+            enabled=journal_config.get("enabled", True),
+            fsync=journal_config.get("fsync", True),
+        )
+
+        # Shared memoization cache for Claude calls in M1/M2/review analysis/ideation
+        llm_cache_config = self.scheduler_config.get("claude_api", {}).get("response_cache", {})
+        if not llm_cache_config.get("enabled", True):
+            llm_cache_mode = llm_cache_mode or "off"
+        self.llm_cache = get_llm_cache(
+            mode=llm_cache_mode or llm_cache_config.get("mode", "readwrite"),
+            max_entries=llm_cache_config.get("max_entries", 5000),
+            max_size_mb=llm_cache_config.get("max_size_mb", 200),
+        )
+
+        # Shared gateway for every Claude call (priorities, RPM/TPM admission,
+        # header-driven backoff, circuit breaker)
+        gateway_config = self.scheduler_config.get("claude_api", {}).get("gateway", {})
+        self.llm_gateway = get_llm_gateway(
+            requests_per_minute=gateway_config.get("requests_per_minute", 50),
+            tokens_per_minute=gateway_config.get("tokens_per_minute", 40000),
+            max_concurrent_requests=gateway_config.get("max_concurrent_requests", 8),
+            max_attempts=gateway_config.get("max_attempts", 4),
+            backoff_base_seconds=gateway_config.get("backoff_base_seconds", 1.0),
+            max_backoff_seconds=gateway_config.get("max_backoff_seconds", 60.0),
+            failure_threshold=gateway_config.get("failure_threshold", 3),
+            cooldown_seconds=gateway_config.get("cooldown_seconds", 120.0),
+            request_timeout_seconds=gateway_config.get("request_timeout_seconds", 60.0),
+        ) if os.getenv("ANTHROPIC_API_KEY") else None
+
+        # Parse counters are process-wide; the summary reports this run's share
+        self.parse_stats_start = get_parse_stats().snapshot()
+
+    def _prepare_journal(self, new_run: bool):
+        """
+        Replay the journal when resuming, otherwise start a fresh one for new runs
+
+        Args:
+            new_run: True for entry points that start a run (full pipeline, stage1)
+        """
+        if self.resume:
+            self.journal.restore_into(self.collected_data)
+        elif new_run:
+            self.journal.start_new()
+
     def _load_config(self, filename: str) -> dict:
         """Load YAML configuration file"""
         config_path = CONFIG_DIR / filename
@@ -78,6 +138,8 @@ class DataCollectionPipeline:
         logger.info("=" * 60)
 
         try:
+            self._prepare_journal(new_run=True)
+
             # Step 1: Collect rankings FIRST to identify important products
             logger.info("\n[STEP 1/8] Collecting Best Sellers rankings...")
             await self.collect_rankings()
@@ -122,6 +184,186 @@ class DataCollectionPipeline:
             logger.error(f"Pipeline failed: {e}")
             raise
 
+    async def run_streaming_pipeline(self):
+        """
+        Execute the pipeline with scraping and attribute extraction overlapped
+
+        Each enriched product goes onto a bounded queue that Claude extraction
+        workers consume while the remaining products are still being scraped,
+        so wall-clock time approaches max(scrape, extract) instead of the sum.
+        """
+        logger.info("=" * 60)
+        logger.info("Starting Amazon Data Collection Pipeline - STREAMING")
+        logger.info("=" * 60)
+
+        try:
+            self._prepare_journal(new_run=True)
+
+            # Step 1: Rankings decide which products to enrich
+            logger.info("\n[STEP 1/6] Collecting Best Sellers rankings...")
+            await self.collect_rankings()
+
+            # Step 2: Enrichment (producer) + attribute extraction (consumers)
+            logger.info("\n[STEP 2/6] Enriching products with streaming attribute extraction...")
+            extractor = self._create_attribute_extractor()
+            if extractor:
+                extracted_attributes = await self._enrich_and_extract_streaming(extractor)
+            else:
+                await self.enrich_ranked_products()
+                extracted_attributes = {}
+
+            # Step 3: Reviews for core products not captured during enrichment
+            logger.info("\n[STEP 3/6] Collecting product reviews...")
+            await self.collect_reviews()
+
+            # Step 4: Save collected data
+            logger.info("\n[STEP 4/6] Saving raw collected data...")
+            self.save_raw_data()
+            if extracted_attributes:
+                self._store_attributes(extractor, extracted_attributes)
+
+            # Step 5: M1 / M2 data
+            logger.info("\n[STEP 5/6] Generating M1/M2 data...")
+            self.generate_m1_data()
+            await self.generate_m2_data()
+
+            # Step 6: Product ideas
+            logger.info("\n[STEP 6/6] Generating AI-powered product ideas...")
+            await self.generate_product_ideas()
+
+            logger.success("\n" + "=" * 60)
+            logger.success("✅ STREAMING PIPELINE FINISHED SUCCESSFULLY!")
+            logger.success("=" * 60)
+
+            self.print_summary()
+
+        except Exception as e:
+            logger.error(f"Streaming pipeline failed: {e}")
+            raise
+
+    async def _enrich_and_extract_streaming(self, extractor) -> dict:
+        """
+        Run product enrichment and attribute extraction concurrently
+
+        enrich_ranked_products() -> [extraction queue] -> extraction workers
+                                 -> [results queue]    -> collector
+
+        Both queues are bounded: when extraction falls behind, enrichment
+        workers block on put() until there is room again (backpressure).
+
+        Each worker takes the products already queued (up to
+        extraction_batch_size) through extract_batch(), so variant dedupe and
+        packing apply within each micro-batch. The Message Batches API does
+        not: its results can take hours, so streaming always extracts
+        interactively.
+
+        Args:
+            extractor: AttributeExtractor instance
+
+        Returns:
+            dict: ASIN -> extracted attributes
+        """
+        streaming_config = self.scheduler_config.get("streaming", {})
+        worker_count = max(1, streaming_config.get("extraction_workers", 3))
+        batch_size = max(1, streaming_config.get("extraction_batch_size", 10))
+        metrics_interval = streaming_config.get("metrics_interval_seconds", 60)
+
+        extraction_queue = MonitoredQueue("enriched → extraction", maxsize=streaming_config.get("extraction_queue_size", 50))
+        results_queue = MonitoredQueue("extraction → results", maxsize=streaming_config.get("results_queue_size", 100))
+        extracted = {}
+        failures = 0
+
+        if self.scheduler_config.get("claude_api", {}).get("message_batches", {}).get("enabled", False):
+            logger.warning("Message Batches mode does not apply to streaming; extracting interactively")
+
+        async def produce(asin, product_data):
+            """Enrichment callback: hand the product to extraction"""
+            product_input = self._attribute_input(asin, product_data)
+            if product_input:
+                await extraction_queue.put(product_input)
+
+        async def extraction_worker():
+            """Extract queued products in micro-batches until the end-of-stream marker"""
+            while True:
+                batch = [await extraction_queue.get()]
+                # Take what is already queued (at most one end marker), so variant
+                # dedupe and packing see several products at once
+                while len(batch) < batch_size and batch[-1] is not None and not extraction_queue.empty():
+                    batch.append(extraction_queue.get_nowait())
+
+                products = [product_input for product_input in batch if product_input is not None]
+                if products:
+                    try:
+                        batch_results = await extractor.extract_batch(products, show_progress=False)
+                    except Exception as e:
+                        logger.error(f"Attribute extraction failed for a batch of {len(products)} products: {e}")
+                        batch_results = {}
+
+                    for product_input in products:
+                        # extract_single returns fallback attributes on failure
+                        attributes = batch_results.get(product_input["asin"]) or await extractor.extract_single(product_input)
+                        await results_queue.put((product_input["asin"], attributes))
+
+                if batch[-1] is None:
+                    return
+
+        async def collect_results():
+            """Gather extracted attributes until the end-of-stream marker"""
+            nonlocal failures
+            while True:
+                item = await results_queue.get()
+                if item is None:
+                    return
+                asin, attributes = item
+                extracted[asin] = attributes
+                if attributes.get("extraction_failed"):
+                    failures += 1
+
+        async def report_queue_depth():
+            """Periodic queue depth snapshot"""
+            while True:
+                await asyncio.sleep(metrics_interval)
+                logger.info(
+                    f"📬 Queue depth - extraction: {extraction_queue.qsize()}/{extraction_queue.maxsize}, "
+                    f"results: {results_queue.qsize()}/{results_queue.maxsize} | extracted: {len(extracted)}"
+                )
+
+        start = datetime.now()
+        workers = [asyncio.create_task(extraction_worker()) for _ in range(worker_count)]
+        collector = asyncio.create_task(collect_results())
+        reporter = asyncio.create_task(report_queue_depth())
+
+        try:
+            await self.enrich_ranked_products(on_product=produce)
+            scrape_seconds = (datetime.now() - start).total_seconds()
+
+            # End of stream: one marker per worker, then one for the collector
+            for _ in workers:
+                await extraction_queue.put(None)
+            await asyncio.gather(*workers)
+            await results_queue.put(None)
+            await collector
+        finally:
+            reporter.cancel()
+            for task in workers + [collector]:
+                if not task.done():
+                    task.cancel()
+
+        total_seconds = (datetime.now() - start).total_seconds()
+        logger.info("\n" + "=" * 60)
+        logger.info("Streaming Summary:")
+        logger.info(f"  Scraping finished after {scrape_seconds:.0f}s, extraction drained at {total_seconds:.0f}s")
+        logger.info(
+            f"  Extracted: {len(extracted)} products ({failures} fallbacks, "
+            f"{worker_count} workers, micro-batches of up to {batch_size})"
+        )
+        extractor.log_rule_statistics()
+        extraction_queue.log_statistics()
+        results_queue.log_statistics()
+        logger.info("=" * 60)
+
+        return extracted
+
     # ==========================================
     # Staged Execution Methods (for GitHub Actions)
     # ==========================================
@@ -192,6 +434,8 @@ class DataCollectionPipeline:
         logger.info("=" * 60)
 
         try:
+            self._prepare_journal(new_run=True)
+
             # Step 1: Collect rankings
             logger.info("\n[STEP 1] Collecting Best Sellers rankings...")
             await self.collect_rankings()
@@ -222,6 +466,7 @@ class DataCollectionPipeline:
             # Load data from stage 1
             if not self._load_intermediate_data("stage1"):
                 raise RuntimeError("Stage 1 data not found. Run stage1 first.")
+            self._prepare_journal(new_run=False)
 
             # Enrich ranks 26-50
             logger.info("\n[STEP 1] Enriching products (Rank 26-50)...")
@@ -249,6 +494,7 @@ class DataCollectionPipeline:
             # Load data from stage 2
             if not self._load_intermediate_data("stage2"):
                 raise RuntimeError("Stage 2 data not found. Run stage2 first.")
+            self._prepare_journal(new_run=False)
 
             # Enrich ranks 51-75
             logger.info("\n[STEP 1] Enriching products (Rank 51-75)...")
@@ -276,6 +522,7 @@ class DataCollectionPipeline:
             # Load data from stage 3
             if not self._load_intermediate_data("stage3"):
                 raise RuntimeError("Stage 3 data not found. Run stage3 first.")
+            self._prepare_journal(new_run=False)
 
             # Enrich ranks 76-100
             logger.info("\n[STEP 1] Enriching products (Rank 76-100)...")
@@ -303,6 +550,7 @@ class DataCollectionPipeline:
             # Load data from stage 4
             if not self._load_intermediate_data("stage4"):
                 raise RuntimeError("Stage 4 data not found. Run stage4 first.")
+            self._prepare_journal(new_run=False)
 
             # Collect reviews
             logger.info("\n[STEP 1] Collecting product reviews...")
@@ -382,6 +630,12 @@ class DataCollectionPipeline:
             cat_url = category.get("url")
             max_rank = category.get("track_top_n", 100)
 
+            # Already collected before a crash (resume mode)
+            existing = self.collected_data["ranks"].get(cat_name)
+            if isinstance(existing, list) and existing:
+                logger.info(f"[{idx}/{total_categories}] ⏭️  {cat_name}: {len(existing)} products (journal)")
+                return {"success": True, "cached": True, "resumed": True, "count": len(existing)}
+
             logger.info(f"[{idx}/{total_categories}] 수집 중: {cat_name}")
 
             try:
@@ -395,6 +649,7 @@ class DataCollectionPipeline:
 
                     if cached_rankings:
                         self.collected_data["ranks"][cat_name] = cached_rankings
+                        self.journal.append("ranking", cat_name, cached_rankings)
                         logger.success(f"[{idx}/{total_categories}] 💾 {cat_name}: {len(cached_rankings)} products (cached)")
                         return {"success": True, "cached": True, "count": len(cached_rankings)}
 
@@ -407,6 +662,7 @@ class DataCollectionPipeline:
 
                 # Store results
                 self.collected_data["ranks"][cat_name] = rankings
+                self.journal.append("ranking", cat_name, rankings)
 
                 # Cache the rankings
                 if use_ranking_cache:
@@ -437,12 +693,17 @@ class DataCollectionPipeline:
                 else:
                     logger.warning(f"  Category failed")
 
-                # Randomized delay between categories (except for last one)
-                if idx < total_categories:
+                # Randomized delay between categories (except for last one,
+                # and not after cache/journal hits which made no request)
+                if idx < total_categories and not result.get("cached"):
                     category_delay = random.uniform(category_delay_min, category_delay_max)
                     logger.info(f"⏱️  다음 카테고리까지 {category_delay:.1f}초 대기...")
                     await asyncio.sleep(category_delay)
 
+            scraper.log_network_savings()
+
+        self.cache_manager.flush()
+
         # Calculate and log final statistics
         total_products = 0
         successful_categories = 0
@@ -461,7 +722,7 @@ class DataCollectionPipeline:
         logger.success(f"  - 성공한 카테고리: {successful_categories}/{total_categories}")
         logger.success(f"  - 총 수집 제품 수: {total_products}")
 
-    async def enrich_ranked_products(self, rank_start: int = None, rank_end: int = None):
+    async def enrich_ranked_products(self, rank_start: int = None, rank_end: int = None, on_product=None):
         """
         Enrich ranked products with detailed information (OPTIMIZED with parallel processing)
         Collects brand, breadcrumb, images, description for all ranked products
@@ -470,6 +731,8 @@ class DataCollectionPipeline:
         Args:
             rank_start: Start rank (1-based, inclusive). None = from beginning
             rank_end: End rank (1-based, inclusive). None = to end
+            on_product: Optional async callback(asin, product_data) awaited for each
+                enriched product (streaming mode; a full queue pauses that worker)
         """
         # Get enrichment configuration
         enrichment_config = self.scheduler_config.get("product_enrichment", {})
@@ -478,7 +741,8 @@ class DataCollectionPipeline:
         top_n = enrichment_config.get("top_n_per_category", 100)
         max_retries = enrichment_config.get("max_retries_per_product", 2)
         delay = enrichment_config.get("delay_between_products", 2)
-        batch_size = enrichment_config.get("batch_size", 5)  # Parallel batch size
+        batch_size = enrichment_config.get("batch_size", 5)  # Concurrent browser contexts
+        http_fetch_config = enrichment_config.get("http_fetch", {})
 
         if not enabled:
             logger.warning("Product enrichment is disabled in configuration")
@@ -537,6 +801,11 @@ class DataCollectionPipeline:
         logger.info(f"  - Core products: {len(core_asins)}")
         logger.info(f"  - Additional ranked products: {len(unique_ranked)}")
 
+        # Core products also need reviews: capture them on the same /dp/ visit
+        # so collect_reviews() does not load the page a second time
+        review_asins = {asin for asin in core_asins if asin not in self.collected_data["reviews"]}
+        max_reviews = min(self.products_config["collection_settings"]["reviews_per_product"], 15)
+
         # Track enrichment progress
         enriched_count = 0
         failed_count = 0
@@ -546,8 +815,11 @@ class DataCollectionPipeline:
             """Helper function to enrich a single product (with caching)"""
             nonlocal enriched_count, failed_count, skipped_count
 
+            # Combined visit always loads the page (reviews are never cached)
+            with_reviews = asin in review_asins
+
             # Skip if already have detailed data in current session
-            if asin in self.collected_data["products"]:
+            if not with_reviews and asin in self.collected_data["products"]:
                 existing_data = self.collected_data["products"][asin]
                 if existing_data.get("brand") or existing_data.get("breadcrumb"):
                     logger.debug(f"[{idx}/{total_asins}] {asin} - Already enriched in session, skipping")
@@ -555,9 +827,10 @@ class DataCollectionPipeline:
                     return True
 
             # Check cache first (but skip if brand is missing)
-            cached_data = self.cache_manager.get(asin)
+            cached_data = None if with_reviews else self.cache_manager.get(asin)
             if cached_data and cached_data.get("brand"):
                 self.collected_data["products"][asin] = cached_data
+                self.journal.append("product", asin, cached_data)
                 enriched_count += 1
                 logger.success(f"[{idx}/{total_asins}] 💾 {asin} - Loaded from cache")
                 return True
@@ -568,10 +841,19 @@ class DataCollectionPipeline:
             for attempt in range(max_retries):
                 try:
                     # Scrape detailed product information
-                    product_data = await scraper.scrape(asin)
+                    if with_reviews:
+                        visit = await scraper.scrape_with_reviews(asin, max_reviews=max_reviews)
+                        product_data = visit["product"]
+                        if visit["reviews"] is not None:
+                            self.collected_data["reviews"][asin] = visit["reviews"]
+                            self.journal.append("review", asin, visit["reviews"])
+                    else:
+                        product_data = await scraper.scrape(asin)
 
                     # Store enriched data
                     self.collected_data["products"][asin] = product_data
+                    if not product_data.get("error"):
+                        self.journal.append("product", asin, product_data)
 
                     # Cache the data for future use
                     self.cache_manager.set(asin, product_data)
@@ -597,19 +879,66 @@ class DataCollectionPipeline:
                         }
                         return False
 
-        # Process sequentially (one browser page cannot handle parallel requests)
-        async with ProductScraper() as scraper:
-            for idx, asin in enumerate(asins_to_enrich, start=1):
-                await enrich_single_product(scraper, asin, idx)
+        # Fan ASINs out to N workers, each driving its own BrowserContext/page
+        # inside a single shared Chromium process
+        worker_count = max(1, min(batch_size, total_asins))
+        logger.info(f"⚡ 병렬 처리: {worker_count}개 브라우저 컨텍스트로 동시 수집")
+
+        asin_queue = asyncio.Queue()
+        for idx, asin in enumerate(asins_to_enrich, start=1):
+            asin_queue.put_nowait((idx, asin))
+
+        processed_count = 0
+
+        async def enrichment_worker(scraper):
+            """Pull ASINs from the shared queue until it is drained"""
+            nonlocal processed_count
+
+            async with scraper.worker() as page_worker:
+                while True:
+                    try:
+                        idx, asin = asin_queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+
+                    try:
+                        enriched = await enrich_single_product(page_worker, asin, idx)
+                        if enriched and on_product:
+                            await on_product(asin, self.collected_data["products"][asin])
+                    except Exception as e:
+                        logger.error(f"[{idx}/{total_asins}] ✗ {asin} - Unexpected worker error: {e}")
+
+                    processed_count += 1
+
+                    # Progress update every 10 products
+                    if processed_count % 10 == 0:
+                        progress_pct = (processed_count / total_asins) * 100
+                        logger.info(f"Progress: {progress_pct:.1f}% | Enriched: {enriched_count} | Skipped: {skipped_count} | Failed: {failed_count}")
+
+                    # Delay between products (per worker)
+                    if not asin_queue.empty():
+                        await asyncio.sleep(delay)
+
+        # Optional HTTP tier: plain GET + lxml first, browser only on fallback
+        http_fetcher = None
+        if total_asins > 0 and http_fetch_config.get("enabled", False):
+            http_fetcher = HttpProductFetcher(
+                max_connections=http_fetch_config.get("max_connections", 10),
+                http2=http_fetch_config.get("http2", True),
+                timeout_seconds=http_fetch_config.get("timeout_seconds", 20),
+            )
+            await http_fetcher.start()
 
-                # Delay between products
-                if idx < total_asins:
-                    await asyncio.sleep(delay)
+        if total_asins > 0:
+            try:
+                async with ProductScraper(pool_size=worker_count, http_fetcher=http_fetcher) as scraper:
+                    await asyncio.gather(*(enrichment_worker(scraper) for _ in range(worker_count)))
+                    scraper.log_network_savings()
+            finally:
+                if http_fetcher:
+                    await http_fetcher.close()
 
-                # Progress update every 10 products
-                if idx % 10 == 0:
-                    progress_pct = (idx / total_asins) * 100
-                    logger.info(f"Progress: {progress_pct:.1f}% | Enriched: {enriched_count} | Skipped: {skipped_count} | Failed: {failed_count}")
+        self.cache_manager.flush()
 
         # Final summary
         logger.info("\n" + "=" * 60)
@@ -621,6 +950,29 @@ class DataCollectionPipeline:
         if total_asins > skipped_count:
             success_rate = (enriched_count / (total_asins - skipped_count)) * 100
             logger.info(f"  Success rate: {success_rate:.1f}%")
+
+        # HTTP tier hit rate vs. browser fallbacks
+        if http_fetcher:
+            http_stats = http_fetcher.get_statistics()
+            logger.info(
+                f"  🌐 HTTP tier: {http_stats['success']}/{http_stats['requests']} via HTTP "
+                f"({http_stats['success_rate']}%), browser fallbacks - "
+                f"captcha: {http_stats['fallback_captcha']}, "
+                f"missing title: {http_stats['fallback_missing_title']}, "
+                f"status: {http_stats['fallback_status']}, errors: {http_stats['errors']}"
+            )
+
+        # Which selector fallbacks actually matched (to prune dead selectors)
+        PRODUCT_PAGE_BUNDLE.log_selector_report()
+
+        # Rate limiter wait time per worker
+        from utils.rate_limiter import rate_limiter
+        for caller, stats in rate_limiter.get_statistics().get("callers", {}).items():
+            if caller.startswith("ProductScraper"):
+                logger.info(
+                    f"  ⏱️  {caller}: {stats['requests']} requests, "
+                    f"waited {stats['total_wait_seconds']}s (avg {stats['average_wait_seconds']}s)"
+                )
         logger.info("=" * 60)
 
     async def collect_reviews(self):
@@ -629,10 +981,20 @@ class DataCollectionPipeline:
 
         Uses /dp/ASIN page instead of /product-reviews/ to avoid login requirement.
         Collects review summary (rating, count) and top ~10-15 visible reviews.
+        Products already visited by enrich_ranked_products() reuse that result.
         """
-        target_products = self.products_config["core_products"]
         max_reviews = min(self.products_config["collection_settings"]["reviews_per_product"], 15)
 
+        # Reviews captured during enrichment (same /dp/ visit) are reused as-is
+        reused = [p["asin"] for p in self.products_config["core_products"] if p["asin"] in self.collected_data["reviews"]]
+        target_products = [p for p in self.products_config["core_products"] if p["asin"] not in self.collected_data["reviews"]]
+        if reused:
+            logger.info(f"Reusing reviews from enrichment visit for {len(reused)} products (no extra page load)")
+
+        if not target_products:
+            logger.success("All core product reviews already collected during enrichment")
+            return
+
         logger.info(f"Collecting reviews from product detail pages (max {max_reviews} per product)")
 
         async with ReviewScraper() as scraper:
@@ -651,21 +1013,11 @@ class DataCollectionPipeline:
                     # Wait for main product container
                     await scraper.wait_for_selector("#dp-container", timeout=15000)
 
-                    # Get review summary from product page (already on page)
-                    summary = await scraper.scrape_review_summary(asin, navigate=False)
-
-                    # Get reviews visible on product detail page (already on page)
-                    reviews = await scraper.scrape_from_product_page(
-                        asin,
-                        max_reviews=max_reviews,
-                        navigate=False
-                    )
-
-                    self.collected_data["reviews"][asin] = {
-                        "summary": summary,
-                        "reviews": reviews,
-                        "count": len(reviews),
-                    }
+                    # Review summary + visible reviews (already on page)
+                    review_data = await scraper.scrape_current_page(asin, max_reviews=max_reviews)
+                    self.collected_data["reviews"][asin] = review_data
+                    self.journal.append("review", asin, review_data)
+                    summary, reviews = review_data["summary"], review_data["reviews"]
 
                     logger.success(f"✓ Collected {len(reviews)} reviews for {asin} (summary: {summary.get('total_reviews', 'N/A')} total, {summary.get('average_rating', 'N/A')} avg)")
 
@@ -796,7 +1148,7 @@ class DataCollectionPipeline:
         m2_gen = M2Generator()
 
         # Generate usage context
-        m2_usage = m2_gen.generate_usage_context(
+        m2_usage = await m2_gen.generate_usage_context_async(
             self.collected_data["products"],
             self.collected_data["reviews"]
         )
@@ -837,6 +1189,11 @@ class DataCollectionPipeline:
         )
         logger.info(f"  - Total reviews collected: {total_reviews}")
 
+        self.llm_cache.log_statistics()
+        if self.llm_gateway:
+            self.llm_gateway.log_statistics()
+        get_parse_stats().log_statistics(since=self.parse_stats_start)
+
         # Enrichment statistics
         if products_with_details > 0:
             logger.info(f"\n📈 Product Enrichment:")
@@ -865,10 +1222,8 @@ class DataCollectionPipeline:
         logger.info("  3. Refresh dashboard to see enriched Amazon data!")
 
 
-    async def extract_attributes(self):
-        """
-        STEP 7: Extract product attributes using Claude API
-        """
+    def _create_attribute_extractor(self):
+        """Create the AttributeExtractor, or None if the API key/config disables it"""
         import os
         from analyzers import AttributeExtractor
 
@@ -877,38 +1232,64 @@ class DataCollectionPipeline:
         if not api_key:
             logger.warning("WARNING: ANTHROPIC_API_KEY not set, skipping attribute extraction")
             logger.info("To enable: export ANTHROPIC_API_KEY=your_key_here")
-            return
+            return None
 
         # Get configuration
         claude_config = self.scheduler_config.get("claude_api", {})
         if not claude_config.get("enabled", False):
             logger.info("Claude API disabled in config, skipping attribute extraction")
-            return
+            return None
 
-        # Initialize extractor
-        extractor = AttributeExtractor(
+        return AttributeExtractor(
             api_key=api_key,
             model=claude_config.get("model", "claude-haiku-4-5-20251001"),
             monthly_budget=claude_config.get("monthly_budget_usd", 150.0)
         )
 
+    @staticmethod
+    def _attribute_input(asin: str, product_data: dict) -> dict | None:
+        """Build the AttributeExtractor input for one product (None if no product name)"""
+        # Skip if no meaningful data (need at least product name)
+        product_name = product_data.get("product_name") or product_data.get("name")
+        if not product_name:
+            return None
+
+        return {
+            "asin": asin,
+            "name": product_name,
+            "brand": product_data.get("brand", "Unknown"),
+            "description": product_data.get("description", ""),
+            "price": product_data.get("price", ""),
+            "breadcrumb": product_data.get("breadcrumb", []),
+            "features": product_data.get("features", []),
+            "category": product_data.get("breadcrumb", ["Unknown"])[-1] if product_data.get("breadcrumb") else "Unknown"
+        }
+
+    def _store_attributes(self, extractor, extracted_attributes: dict):
+        """Save extracted attributes to output and keep them for the ideation step"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = OUTPUT_DIR / f"product_attributes_{timestamp}.json"
+        extractor.save_results(extracted_attributes, output_path)
+
+        # Store in collected data for next step
+        self.collected_data["attributes"] = extracted_attributes
+
+        logger.success(f"[OK] Extracted attributes for {len(extracted_attributes)} products")
+
+    async def extract_attributes(self):
+        """
+        STEP 7: Extract product attributes using Claude API
+        """
+        extractor = self._create_attribute_extractor()
+        if not extractor:
+            return
+
         # Collect all products with enriched data
         products_to_extract = []
         for asin, product_data in self.collected_data["products"].items():
-            # Skip if no meaningful data (need at least product name)
-            product_name = product_data.get("product_name") or product_data.get("name")
-            if not product_name:
-                continue
-
-            products_to_extract.append({
-                "asin": asin,
-                "name": product_name,
-                "brand": product_data.get("brand", "Unknown"),
-                "description": product_data.get("description", ""),
-                "price": product_data.get("price", ""),
-                "breadcrumb": product_data.get("breadcrumb", []),
-                "category": product_data.get("breadcrumb", ["Unknown"])[-1] if product_data.get("breadcrumb") else "Unknown"
-            })
+            product_input = self._attribute_input(asin, product_data)
+            if product_input:
+                products_to_extract.append(product_input)
 
         if not products_to_extract:
             logger.warning("No products available for attribute extraction")
@@ -916,21 +1297,22 @@ class DataCollectionPipeline:
 
         logger.info(f"Extracting attributes for {len(products_to_extract)} products...")
 
-        # Extract in batches
-        extracted_attributes = await extractor.extract_batch(
-            products_to_extract,
-            show_progress=True
-        )
-
-        # Save results
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = OUTPUT_DIR / f"product_attributes_{timestamp}.json"
-        extractor.save_results(extracted_attributes, output_path)
-
-        # Store in collected data for next step
-        self.collected_data["attributes"] = extracted_attributes
+        batches_config = self.scheduler_config.get("claude_api", {}).get("message_batches", {})
+        if batches_config.get("enabled", False):
+            # Nightly runs: submit everything through the Message Batches API (batch pricing)
+            extracted_attributes = await extractor.extract_with_message_batches(
+                products_to_extract,
+                poll_interval_seconds=batches_config.get("poll_interval_seconds", 60),
+                timeout_seconds=batches_config.get("timeout_minutes", 720) * 60,
+                fallback_to_interactive=batches_config.get("fallback_to_interactive", True),
+            )
+        else:
+            extracted_attributes = await extractor.extract_batch(
+                products_to_extract,
+                show_progress=True
+            )
 
-        logger.success(f"[OK] Extracted attributes for {len(extracted_attributes)} products")
+        self._store_attributes(extractor, extracted_attributes)
 
     async def generate_product_ideas(self):
         """
@@ -1030,16 +1412,29 @@ async def main():
     parser = argparse.ArgumentParser(description="Amazon Data Collector - MVP")
     parser.add_argument(
         "--mode",
-        choices=["full", "scrape-only", "analyze-only", "stage1", "stage2", "stage3", "stage4", "stage5"],
+        choices=["full", "streaming", "scrape-only", "analyze-only", "stage1", "stage2", "stage3", "stage4", "stage5"],
         default="full",
-        help="Execution mode: full, or staged (stage1-5)"
+        help="Execution mode: full, streaming (scrape + extract overlapped), or staged (stage1-5)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Replay the collection journal and skip products/rankings/reviews already collected"
+    )
+    parser.add_argument(
+        "--llm-cache-mode",
+        choices=["readwrite", "replay", "off"],
+        default=None,
+        help="Claude call cache: readwrite (default), replay (cached responses only, no API calls), off"
     )
     args = parser.parse_args()
 
-    pipeline = DataCollectionPipeline()
+    pipeline = DataCollectionPipeline(resume=args.resume, llm_cache_mode=args.llm_cache_mode)
 
     if args.mode == "full":
         await pipeline.run_full_pipeline()
+    elif args.mode == "streaming":
+        await pipeline.run_streaming_pipeline()
     elif args.mode == "scrape-only":
         logger.info("Running scrape-only mode...")
         await pipeline.run_full_pipeline()
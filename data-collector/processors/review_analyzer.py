@@ -2,13 +2,91 @@
 Review Analyzer using Claude API
 Analyzes customer reviews to extract usage contexts, sentiments, and insights
 """
-import anthropic
+import hashlib
 import json
 import re
+import time
 from typing import List, Dict, Any, Optional
 from loguru import logger
 
 from config.settings import ANTHROPIC_API_KEY, CLAUDE_SETTINGS, REVIEW_ANALYSIS
+from utils.llm_gateway import get_llm_gateway, PRIORITY_NORMAL
+from utils.budget_tracker import get_budget_tracker, cache_usage
+from utils.review_store import get_review_store, merge_usage_contexts, review_key
+from utils.structured_output import (
+    MODE_TEXT, MODE_TOOL, get_parse_stats, response_text, tool_input, tool_params, validate
+)
+
+
+# Static analysis instructions, sent as a cached system block ahead of the reviews
+REVIEW_ANALYSIS_SYSTEM_PROMPT = """당신은 뷰티/스킨케어 카테고리의 Amazon 고객 리뷰 전문 분석가입니다. 제품 리뷰를 분석하여 사용 맥락 패턴을 추출합니다.
+
+작업:
+1. 3-5개의 주요 사용 맥락을 파악하세요 (고객이 이 제품을 사용하는 상황/이유)
+2. 각 맥락에 대해 다음을 추출하세요:
+   - 간결한 설명 (한국어로 작성)
+   - 빈도 (이 맥락을 언급한 리뷰 수 추정)
+   - 감정 점수 (0-1, 이 맥락에 대한 리뷰가 얼마나 긍정적인지)
+   - 고객이 사용하는 3-5개의 핵심 문구 (원문 그대로)
+   - 다루는 피부 고민 (한국어)
+   - 사용 시간 (Morning/Night/Both - 영어 유지)
+   - 계절 (언급된 경우: Summer/Winter/Year-round - 영어 유지)
+   - 함께 사용하는 제품 (제품명은 영어 원문 유지)
+
+주의사항:
+- 제품명, 브랜드명, 카테고리명은 영어 원문을 유지하세요
+- 설명, 감정, 피부 고민 등의 분석 내용은 한국어로 작성하세요
+
+다음 구조의 JSON 객체만 반환하세요:
+{
+  "usage_contexts": [
+    {
+      "context": "Description of usage context",
+      "frequency": 50,
+      "sentiment_score": 0.85,
+      "key_phrases": ["phrase 1", "phrase 2", "phrase 3"],
+      "skin_concerns": ["concern 1", "concern 2"],
+      "time_of_use": "Night",
+      "season": "Year-round",
+      "companion_products": ["product 1", "product 2"]
+    }
+  ]
+}
+
+Important:
+- Be specific about usage contexts (not just "hydration" but "post-retinol hydration" or "AC-dried skin relief")
+- Frequency should sum to approximately the total number of reviews
+- Sentiment score: 0 = very negative, 0.5 = neutral, 1.0 = very positive
+- Only include companion products if EXPLICITLY mentioned by name
+- If no clear time/season mentioned, use "Year-round" or "Morning & Night\""""
+
+
+# Tool Claude answers through in structured output mode
+REVIEW_ANALYSIS_TOOL_NAME = "record_usage_contexts"
+
+USAGE_CONTEXTS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "usage_contexts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "context": {"type": "string"},
+                    "frequency": {"type": "integer"},
+                    "sentiment_score": {"type": "number"},
+                    "key_phrases": {"type": "array", "items": {"type": "string"}},
+                    "skin_concerns": {"type": "array", "items": {"type": "string"}},
+                    "time_of_use": {"type": "string"},
+                    "season": {"type": "string"},
+                    "companion_products": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["context", "frequency", "sentiment_score", "key_phrases"],
+            },
+        },
+    },
+    "required": ["usage_contexts"],
+}
 
 
 class ReviewAnalyzer:
@@ -21,25 +99,48 @@ class ReviewAnalyzer:
     - Companion products
     """
 
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, structured_output: bool = True, incremental: Optional[bool] = None):
         """
         Args:
             api_key: Anthropic API key (defaults to settings)
+            structured_output: Return usage contexts through a schema-validated
+                tool call instead of parsing JSON from the text
+            incremental: Keep per-ASIN analysis state so analyze_product_reviews_async()
+                only sends reviews not analyzed before (default: REVIEW_ANALYSIS)
         """
         self.api_key = api_key or ANTHROPIC_API_KEY
+        self.structured_output = structured_output
+        if incremental is None:
+            incremental = REVIEW_ANALYSIS.get("incremental", True)
+        self.parse_stats = get_parse_stats()
+        self.budget_tracker = get_budget_tracker()
 
         if not self.api_key:
             logger.warning("ANTHROPIC_API_KEY not set. ReviewAnalyzer will use rule-based analysis.")
-            self.client = None
+            self.gateway = None
             self.model = None
             self.max_tokens = None
             self.temperature = None
         else:
-            self.client = anthropic.Anthropic(api_key=self.api_key)
+            self.gateway = get_llm_gateway(api_key=self.api_key)
             self.model = CLAUDE_SETTINGS["model"]
             self.max_tokens = CLAUDE_SETTINGS["max_tokens"]
             self.temperature = CLAUDE_SETTINGS["temperature"]
 
+        # Incremental analysis (stored contexts are only valid for the same model/prompt/schema)
+        self.review_store = get_review_store() if incremental and self.gateway else None
+        self._analysis_fingerprint = hashlib.sha256(json.dumps(
+            [self.model, REVIEW_ANALYSIS_SYSTEM_PROMPT, USAGE_CONTEXTS_SCHEMA, self.structured_output],
+            sort_keys=True, ensure_ascii=False
+        ).encode("utf-8")).hexdigest()[:16]
+        self.incremental_stats = {
+            "products_unchanged": 0,
+            "products_updated": 0,
+            "products_new": 0,
+            "reviews_analyzed": 0,
+            "reviews_skipped": 0,
+        }
+
     def analyze_reviews_batch(
         self,
         reviews: List[Dict[str, Any]],
@@ -57,6 +158,155 @@ class ReviewAnalyzer:
         Returns:
             dict: Analysis results with usage contexts
         """
+        skipped = self._analysis_precheck(reviews, product_name)
+        if skipped is not None:
+            return skipped
+
+        # Call Claude API
+        try:
+            start = time.monotonic()
+            response = self.gateway.create(
+                "review_analysis",
+                priority=PRIORITY_NORMAL,
+                **self._analysis_request(reviews, product_name, product_category)
+            )
+            return self._with_samples(self._analysis_result(response, start), reviews)
+
+        except Exception as e:
+            logger.error(f"Claude API error: {e}")
+            return self._fallback_analysis(reviews)
+
+    async def analyze_reviews_batch_async(
+        self,
+        reviews: List[Dict[str, Any]],
+        product_name: str,
+        product_category: str
+    ) -> Dict[str, Any]:
+        """
+        analyze_reviews_batch() without blocking the event loop, so several
+        products can be analyzed concurrently (same cache, gateway and fallback)
+        """
+        skipped = self._analysis_precheck(reviews, product_name)
+        if skipped is not None:
+            return skipped
+
+        analysis = await self._request_analysis_async(reviews, product_name, product_category)
+        if analysis is None:
+            return self._fallback_analysis(reviews)
+
+        return self._with_samples(analysis, reviews)
+
+    async def analyze_product_reviews_async(
+        self,
+        asin: str,
+        reviews: List[Dict[str, Any]],
+        product_name: str,
+        product_category: str
+    ) -> Dict[str, Any]:
+        """
+        Usage contexts of a product, sending only reviews not analyzed in earlier runs
+
+        Reviews are identified by review ID or content hash (review_key).
+        Contexts found in the new reviews are merged into the stored ones
+        (frequencies added, sentiment weighted); products without new
+        reviews need no Claude call. At most REVIEW_ANALYSIS batch_size new
+        reviews are analyzed per run, the rest are picked up next time.
+
+        Args:
+            asin: Product ASIN (key of the stored analysis)
+            reviews: All currently collected reviews of the product
+            product_name: Product name
+            product_category: Product category
+
+        Returns:
+            dict: Analysis results with usage contexts (aggregated over all analyzed reviews)
+        """
+        if not self.review_store or not reviews:
+            return await self.analyze_reviews_batch_async(reviews, product_name, product_category)
+
+        state = self.review_store.get(asin, self._analysis_fingerprint)
+        seen = set(state["seen"]) if state else set()
+
+        new_reviews = []
+        for review in reviews:
+            key = review_key(review)
+            if key not in seen:
+                seen.add(key)
+                new_reviews.append(review)
+
+        self.incremental_stats["reviews_skipped"] += len(reviews) - len(new_reviews)
+
+        if state and not new_reviews:
+            self.incremental_stats["products_unchanged"] += 1
+            logger.info(
+                f"No new reviews for {product_name[:30]} (watermark {state['watermark'] or 'n/a'}), "
+                f"reusing analysis of {state['review_count']} reviews"
+            )
+            return self._add_sample_reviews({"usage_contexts": state["usage_contexts"]}, reviews)
+
+        batch = new_reviews[:REVIEW_ANALYSIS["batch_size"]]
+        logger.info(
+            f"Analyzing {len(batch)} new of {len(reviews)} reviews for {product_name}"
+            + (f" ({state['review_count']} analyzed before)" if state else "")
+        )
+
+        known_contexts = [context.get("context") for context in state["usage_contexts"]] if state else []
+        analysis = await self._request_analysis_async(batch, product_name, product_category, known_contexts)
+
+        # Nothing usable from Claude: keep the stored state and leave the reviews for the next run
+        if analysis is None or not analysis.get("usage_contexts"):
+            if state:
+                return self._add_sample_reviews({"usage_contexts": state["usage_contexts"]}, reviews)
+            return self._fallback_analysis(reviews)
+
+        merged = merge_usage_contexts(state["usage_contexts"] if state else [], analysis["usage_contexts"])
+        self.review_store.save(asin, self._analysis_fingerprint, merged, batch, replace=state is None)
+
+        self.incremental_stats["products_updated" if state else "products_new"] += 1
+        self.incremental_stats["reviews_analyzed"] += len(batch)
+
+        return self._with_samples({"usage_contexts": merged}, reviews)
+
+    def log_incremental_statistics(self):
+        """Log how many reviews/products incremental analysis skipped"""
+        stats = self.incremental_stats
+        products = stats["products_unchanged"] + stats["products_updated"] + stats["products_new"]
+        if not self.review_store or not products:
+            return
+
+        logger.info(
+            f"  Incremental review analysis: {stats['reviews_analyzed']} new reviews analyzed, "
+            f"{stats['reviews_skipped']} already analyzed; {stats['products_unchanged']} products unchanged, "
+            f"{stats['products_updated']} updated, {stats['products_new']} first analyzed"
+        )
+
+    async def _request_analysis_async(
+        self,
+        reviews: List[Dict[str, Any]],
+        product_name: str,
+        product_category: str,
+        known_contexts: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Parsed usage contexts from Claude, or None if the API is unavailable or the call failed"""
+        if not self.gateway or not self.gateway.available:
+            return None
+
+        try:
+            start = time.monotonic()
+            response = await self.gateway.acreate(
+                "review_analysis",
+                priority=PRIORITY_NORMAL,
+                use_cache=True,
+                **self._analysis_request(reviews, product_name, product_category, known_contexts)
+            )
+            return self._analysis_result(response, start)
+
+        except Exception as e:
+            logger.error(f"Claude API error for {product_name[:30]}: {e}")
+            return None
+
+    def _analysis_precheck(self, reviews: List[Dict[str, Any]], product_name: str) -> Optional[Dict[str, Any]]:
+        """Result to return without calling Claude (no reviews, no API key, circuit open), else None"""
         if not reviews:
             logger.warning("No reviews to analyze")
             return {"usage_contexts": []}
@@ -64,10 +314,24 @@ class ReviewAnalyzer:
         logger.info(f"Analyzing {len(reviews)} reviews for {product_name}")
 
         # If no API client, use fallback analysis
-        if not self.client:
+        if not self.gateway:
             logger.info("Using rule-based fallback analysis (no API key)")
             return self._fallback_analysis(reviews)
 
+        if not self.gateway.available:
+            logger.info("Using rule-based fallback analysis (Claude API unavailable)")
+            return self._fallback_analysis(reviews)
+
+        return None
+
+    def _analysis_request(
+        self,
+        reviews: List[Dict[str, Any]],
+        product_name: str,
+        product_category: str,
+        known_contexts: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """messages.create() parameters for a usage-context analysis"""
         # Prepare reviews text
         reviews_text = self._prepare_reviews_text(reviews)
 
@@ -75,36 +339,61 @@ class ReviewAnalyzer:
         prompt = self._build_analysis_prompt(
             reviews_text,
             product_name,
-            product_category
+            product_category,
+            known_contexts
         )
 
-        # Call Claude API
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+        output_params = tool_params(
+            REVIEW_ANALYSIS_TOOL_NAME,
+            "Record the usage contexts found in the reviews.",
+            USAGE_CONTEXTS_SCHEMA
+        ) if self.structured_output else {}
+
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "system": [{
+                "type": "text",
+                "text": REVIEW_ANALYSIS_SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"},
+            }],
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            **output_params
+        }
 
-            # Parse response
-            response_text = response.content[0].text
-            analysis_result = self._parse_claude_response(response_text)
+    def _analysis_result(self, response: Any, start: float) -> Dict[str, Any]:
+        """Record usage and parse the usage contexts"""
+        self._record_usage(response, "review_analysis", (time.monotonic() - start) * 1000)
 
-            # Enrich with sample reviews
-            analysis_result = self._add_sample_reviews(
-                analysis_result,
-                reviews
-            )
+        # Parse response
+        return self._parse_message(response)
 
-            logger.success(f"✓ Analyzed reviews, found {len(analysis_result.get('usage_contexts', []))} contexts")
-            return analysis_result
+    def _with_samples(self, analysis_result: Dict[str, Any], reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Enrich with sample reviews"""
+        analysis_result = self._add_sample_reviews(
+            analysis_result,
+            reviews
+        )
 
-        except Exception as e:
-            logger.error(f"Claude API error: {e}")
-            return self._fallback_analysis(reviews)
+        logger.success(f"✓ Analyzed reviews, found {len(analysis_result.get('usage_contexts', []))} contexts")
+        return analysis_result
+
+    def _record_usage(self, response: Any, task_type: str, latency_ms: float):
+        """Record API usage (including prompt cache tokens) unless served from the LLM call cache"""
+        if getattr(response, "from_cache", False):
+            return
+
+        self.budget_tracker.record_usage(
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens,
+            model=self.model,
+            task_type=task_type,
+            latency_ms=latency_ms,
+            **cache_usage(response.usage)
+        )
 
     def _prepare_reviews_text(self, reviews: List[Dict]) -> str:
         """Prepare reviews for Claude API"""
@@ -125,59 +414,50 @@ class ReviewAnalyzer:
         self,
         reviews_text: str,
         product_name: str,
-        product_category: str
+        product_category: str,
+        known_contexts: Optional[List[str]] = None
     ) -> str:
-        """Build prompt for Claude API"""
-        prompt = f"""당신은 뷰티/스킨케어 카테고리의 Amazon 고객 리뷰 전문 분석가입니다.
-
-"{product_name}" ({product_category}) 제품에 대한 다음 리뷰를 분석하고 사용 맥락 패턴을 추출하세요.
+        """
+        Build the per-product prompt (instructions are in REVIEW_ANALYSIS_SYSTEM_PROMPT)
 
+        known_contexts (incremental runs) lists the contexts found in earlier
+        reviews, so Claude reuses their names and the results can be merged.
+        """
+        known = ""
+        if known_contexts:
+            known = "\n이전 리뷰에서 이미 파악된 사용 맥락 (해당하는 경우 동일한 이름을 그대로 사용하세요):\n" + "\n".join(
+                f"- {context}" for context in known_contexts
+            ) + "\n"
+
+        prompt = f""""{product_name}" ({product_category}) 제품에 대한 다음 리뷰를 분석하고 사용 맥락 패턴을 추출하세요.
+{known}
 <reviews>
 {reviews_text}
 </reviews>
 
-작업:
-1. 3-5개의 주요 사용 맥락을 파악하세요 (고객이 이 제품을 사용하는 상황/이유)
-2. 각 맥락에 대해 다음을 추출하세요:
-   - 간결한 설명 (한국어로 작성)
-   - 빈도 (이 맥락을 언급한 리뷰 수 추정)
-   - 감정 점수 (0-1, 이 맥락에 대한 리뷰가 얼마나 긍정적인지)
-   - 고객이 사용하는 3-5개의 핵심 문구 (원문 그대로)
-   - 다루는 피부 고민 (한국어)
-   - 사용 시간 (Morning/Night/Both - 영어 유지)
-   - 계절 (언급된 경우: Summer/Winter/Year-round - 영어 유지)
-   - 함께 사용하는 제품 (제품명은 영어 원문 유지)
+Analyze now and return ONLY the JSON (no other text):"""
 
-주의사항:
-- 제품명, 브랜드명, 카테고리명은 영어 원문을 유지하세요
-- 설명, 감정, 피부 고민 등의 분석 내용은 한국어로 작성하세요
+        return prompt
 
-다음 구조의 JSON 객체만 반환하세요:
-{{
-  "usage_contexts": [
-    {{
-      "context": "Description of usage context",
-      "frequency": 50,
-      "sentiment_score": 0.85,
-      "key_phrases": ["phrase 1", "phrase 2", "phrase 3"],
-      "skin_concerns": ["concern 1", "concern 2"],
-      "time_of_use": "Night",
-      "season": "Year-round",
-      "companion_products": ["product 1", "product 2"]
-    }}
-  ]
-}}
+    def _parse_message(self, response: Any) -> Dict[str, Any]:
+        """
+        Usage contexts from a response
 
-Important:
-- Be specific about usage contexts (not just "hydration" but "post-retinol hydration" or "AC-dried skin relief")
-- Frequency should sum to approximately the total number of reviews
-- Sentiment score: 0 = very negative, 0.5 = neutral, 1.0 = very positive
-- Only include companion products if EXPLICITLY mentioned by name
-- If no clear time/season mentioned, use "Year-round" or "Morning & Night"
+        Uses the tool input when present (validated against
+        USAGE_CONTEXTS_SCHEMA), otherwise searches the text for JSON.
+        """
+        structured = tool_input(response, REVIEW_ANALYSIS_TOOL_NAME)
+        if structured is None:
+            return self._parse_claude_response(response_text(response))
 
-Analyze now and return ONLY the JSON (no other text):"""
+        errors = validate(structured, USAGE_CONTEXTS_SCHEMA)
+        self.parse_stats.record("review_analysis", MODE_TOOL, not errors)
 
-        return prompt
+        if errors:
+            logger.error(f"Structured review analysis does not match schema: {'; '.join(errors[:5])}")
+            return {"usage_contexts": []}
+
+        return structured
 
     def _parse_claude_response(self, response_text: str) -> Dict[str, Any]:
         """Parse Claude's JSON response"""
@@ -187,12 +467,15 @@ Analyze now and return ONLY the JSON (no other text):"""
             if json_match:
                 json_str = json_match.group()
                 data = json.loads(json_str)
+                self.parse_stats.record("review_analysis", MODE_TEXT, True)
                 return data
             else:
+                self.parse_stats.record("review_analysis", MODE_TEXT, False)
                 logger.warning("No JSON found in Claude response")
                 return {"usage_contexts": []}
 
         except json.JSONDecodeError as e:
+            self.parse_stats.record("review_analysis", MODE_TEXT, False)
             logger.error(f"Failed to parse Claude response as JSON: {e}")
             logger.debug(f"Response text: {response_text[:500]}")
             return {"usage_contexts": []}
@@ -300,6 +583,51 @@ Analyze now and return ONLY the JSON (no other text):"""
         if not reviews:
             return {}
 
+        if not self.gateway or not self.gateway.available:
+            return self._fallback_demographics()
+
+        try:
+            start = time.monotonic()
+            response = self.gateway.create(
+                "demographic_insights",
+                priority=PRIORITY_NORMAL,
+                **self._demographics_request(reviews)
+            )
+            return self._demographics_result(response, start)
+
+        except Exception as e:
+            logger.warning(f"Demographic analysis failed: {e}")
+
+        return self._fallback_demographics()
+
+    async def analyze_demographic_insights_async(
+        self,
+        reviews: List[Dict]
+    ) -> Dict[str, Any]:
+        """analyze_demographic_insights() without blocking the event loop"""
+        if not reviews:
+            return {}
+
+        if not self.gateway or not self.gateway.available:
+            return self._fallback_demographics()
+
+        try:
+            start = time.monotonic()
+            response = await self.gateway.acreate(
+                "demographic_insights",
+                priority=PRIORITY_NORMAL,
+                use_cache=True,
+                **self._demographics_request(reviews)
+            )
+            return self._demographics_result(response, start)
+
+        except Exception as e:
+            logger.warning(f"Demographic analysis failed: {e}")
+
+        return self._fallback_demographics()
+
+    def _demographics_request(self, reviews: List[Dict]) -> Dict[str, Any]:
+        """messages.create() parameters for a demographic estimate"""
         # Prepare sample reviews
         sample_text = "\n\n".join([
             f"Review {i+1}: {r.get('text', '')}"
@@ -324,24 +652,28 @@ Return ONLY a JSON object:
 
 Note: This is an estimate based on language patterns. Return ONLY the JSON:"""
 
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1000,
-                temperature=self.temperature,
-                messages=[{"role": "user", "content": prompt}]
-            )
+        return {
+            "model": self.model,
+            "max_tokens": 1000,
+            "temperature": self.temperature,
+            "messages": [{"role": "user", "content": prompt}],
+        }
 
-            response_text = response.content[0].text
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+    def _demographics_result(self, response: Any, start: float) -> Dict[str, Any]:
+        """Record usage and parse the demographic JSON (fallback distribution if none found)"""
+        self._record_usage(response, "demographic_insights", (time.monotonic() - start) * 1000)
 
-            if json_match:
-                return json.loads(json_match.group())
+        response_text = response.content[0].text
+        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
 
-        except Exception as e:
-            logger.warning(f"Demographic analysis failed: {e}")
+        if json_match:
+            return json.loads(json_match.group())
+
+        return self._fallback_demographics()
 
-        # Fallback
+    @staticmethod
+    def _fallback_demographics() -> Dict[str, Any]:
+        """Default demographic distribution when Claude is not available"""
         return {
             "age_groups": {"20s": 40, "30s": 35, "40s": 20, "50+": 5},
             "skin_types": {"Dry": 35, "Combination": 30, "Normal": 20, "Oily": 15}
@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from loguru import logger
 import anthropic
 from config.settings import ANTHROPIC_API_KEY, CLAUDE_SETTINGS
+from utils.llm_gateway import get_llm_gateway, LLMUnavailableError, PRIORITY_HIGH
 
 
 class VolatilityCalculator:
@@ -24,21 +25,15 @@ class VolatilityCalculator:
         """
         self.scaling_factor = scaling_factor
 
-        # Initialize Claude API client
+        # Claude calls go through the shared LLM gateway (rate limits, backoff, circuit breaker)
         if ANTHROPIC_API_KEY:
-            self.client = anthropic.Anthropic(
-                api_key=ANTHROPIC_API_KEY,
-                timeout=30.0,
-                max_retries=2,
-            )
+            self.gateway = get_llm_gateway()
             self.model = CLAUDE_SETTINGS.get("model", "claude-haiku-4-5-20251001")
             self.max_tokens = CLAUDE_SETTINGS.get("max_tokens", 4000)
             self.temperature = CLAUDE_SETTINGS.get("temperature", 0.7)
-            self._api_available = True
             logger.info("✓ Claude API client initialized for market signal analysis")
         else:
-            self.client = None
-            self._api_available = True
+            self.gateway = None
             logger.warning("⚠ ANTHROPIC_API_KEY not set. Will use rule-based market signals.")
 
     def calculate_volatility_index(
@@ -342,12 +337,12 @@ class VolatilityCalculator:
         avg_rank_change: float = 0.0
     ) -> str:
         """
-        Generate strategic market signal using Claude API with circuit breaker.
-        After 2 consecutive API failures, automatically uses rule-based fallback
-        for remaining calls to avoid wasting time.
+        Generate strategic market signal using Claude API.
+        While the gateway's circuit breaker is open (repeated API failures),
+        the rule-based fallback is used without attempting a call.
         """
         # Circuit breaker: skip API after consecutive failures
-        if not self.client or not self._api_available:
+        if not self.gateway or not self.gateway.available:
             return self._generate_market_signal_fallback(volatility_index, status, trend)
 
         try:
@@ -381,7 +376,9 @@ class VolatilityCalculator:
 - "높은 경쟁 강도 - 차별화 포인트 필수"
 """
 
-            response = self.client.messages.create(
+            response = self.gateway.create(
+                "market_signal",
+                priority=PRIORITY_HIGH,
                 model=self.model,
                 max_tokens=100,
                 temperature=self.temperature,
@@ -396,10 +393,11 @@ class VolatilityCalculator:
             logger.info(f"✓ Generated market signal via Claude API: {market_signal}")
             return market_signal
 
+        except LLMUnavailableError:
+            return self._generate_market_signal_fallback(volatility_index, status, trend)
+
         except anthropic.APIConnectionError as e:
             logger.error(f"API Connection error for {category_name}: {e}")
-            logger.warning("⚠ Disabling Claude API for remaining calls (connection unavailable)")
-            self._api_available = False
             return self._generate_market_signal_fallback(volatility_index, status, trend)
 
         except Exception as e:
@@ -106,6 +106,8 @@ class AutomatedDataCollector:
 
             if execution_mode == "full":
                 await pipeline.run_full_pipeline()
+            elif execution_mode == "streaming":
+                await pipeline.run_streaming_pipeline()
             elif execution_mode == "scrape-only":
                 logger.info("Running scrape-only mode...")
                 # Only scraping steps
@@ -2,11 +2,13 @@
 Base scraper class with Playwright integration
 """
 import asyncio
+import copy
 import random
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
 from playwright.async_api import async_playwright, Browser, Page, BrowserContext
 from loguru import logger
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
 from config.settings import (
     SCRAPER_SETTINGS,
@@ -17,42 +19,47 @@ from config.settings import (
     LOCALE_POOL
 )
 from utils.rate_limiter import rate_limiter
+from scrapers.resource_blocker import ResourceBlocker, load_blocking_profile
 
 
 class BaseScraper(ABC):
     """
     Base class for all Amazon scrapers
     Handles browser initialization, rate limiting, and error handling
+
+    Optionally manages a bounded pool of BrowserContexts inside one Chromium
+    process (pool_size > 1); borrow them with `async with scraper.worker()`.
     """
 
-    def __init__(self):
+    def __init__(self, pool_size: int = 1):
+        """
+        Args:
+            pool_size: Number of BrowserContexts (each with its own page) to open
+                inside the single Chromium process. Values > 1 enable worker()
+                so several pages can be driven concurrently.
+        """
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
         self.playwright = None
 
+        # Context pool (shares one browser process)
+        self.pool_size = max(1, pool_size)
+        self.worker_id = 0
+        self._owns_browser = True
+        self._workers: List["BaseScraper"] = []
+        self._idle_workers: Optional[asyncio.Queue] = None
+
+        # Network resource blocking (profile from scheduler_config.yaml)
+        self.blocking_profile = load_blocking_profile(self.__class__.__name__)
+        self.resource_blocker: Optional[ResourceBlocker] = None
+
     async def initialize(self):
         """Initialize Playwright browser with enhanced anti-detection"""
         try:
             logger.info("Initializing Playwright browser with ENHANCED anti-detection...")
             self.playwright = await async_playwright().start()
 
-            # Select random User-Agent from pool
-            user_agent = random.choice(USER_AGENTS_POOL)
-            logger.debug(f"Using User-Agent: {user_agent[:50]}...")
-
-            # Select random viewport (to mimic different devices/users)
-            viewport = random.choice(VIEWPORT_POOL)
-            logger.debug(f"Using Viewport: {viewport['width']}x{viewport['height']}")
-
-            # Select random timezone (US only)
-            timezone = random.choice(TIMEZONE_POOL)
-            logger.debug(f"Using Timezone: {timezone}")
-
-            # Select random locale
-            locale = random.choice(LOCALE_POOL)
-            logger.debug(f"Using Locale: {locale}")
-
             # Launch browser with stealth settings
             self.browser = await self.playwright.chromium.launch(
                 headless=SCRAPER_SETTINGS["headless"],
@@ -68,74 +75,11 @@ class BaseScraper(ABC):
                 ]
             )
 
-            # Create context with realistic settings and randomized parameters
-            self.context = await self.browser.new_context(
-                viewport=viewport,  # RANDOMIZED viewport
-                user_agent=user_agent,  # RANDOMIZED User-Agent
-                locale=locale,  # RANDOMIZED locale
-                timezone_id=timezone,  # RANDOMIZED timezone
-                accept_downloads=False,
-                has_touch=False,
-                is_mobile=False,
-                java_script_enabled=True,
-                # Persistent storage for cookies (helps avoid bot detection)
-                storage_state=None,  # Will be set after first successful session
-            )
+            self.context, self.page, self.resource_blocker = await self._new_context()
 
-            # Set extra headers
-            await self.context.set_extra_http_headers({
-                "Accept-Language": AMAZON_SETTINGS["accept_language"],
-                "Accept-Encoding": "gzip, deflate, br",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                "Referer": AMAZON_SETTINGS["base_url"],
-                "sec-ch-ua": '"Not_A Brand";v="8", "Chromium";v="120"',
-                "sec-ch-ua-mobile": "?0",
-                "sec-ch-ua-platform": '"Windows"',
-            })
-
-            # Create page
-            self.page = await self.context.new_page()
-
-            # Enhanced anti-detection script
-            await self.page.add_init_script("""
-                // Remove webdriver flag
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-
-                // Mock plugins to appear real
-                Object.defineProperty(navigator, 'plugins', {
-                    get: () => [1, 2, 3, 4, 5]
-                });
-
-                // Add chrome object
-                window.chrome = {
-                    runtime: {}
-                };
-
-                // Mock languages
-                Object.defineProperty(navigator, 'languages', {
-                    get: () => ['en-US', 'en']
-                });
-
-                // Override permissions
-                const originalQuery = window.navigator.permissions.query;
-                window.navigator.permissions.query = (parameters) => (
-                    parameters.name === 'notifications' ?
-                        Promise.resolve({ state: Notification.permission }) :
-                        originalQuery(parameters)
-                );
-
-                // Mock connection
-                Object.defineProperty(navigator, 'connection', {
-                    get: () => ({
-                        effectiveType: '4g',
-                        rtt: 100,
-                        downlink: 10,
-                        saveData: false
-                    })
-                });
-            """)
+            # Open additional contexts for concurrent workers
+            if self.pool_size > 1:
+                await self._start_worker_pool()
 
             logger.success("Browser initialized successfully with anti-detection")
 
@@ -143,17 +87,202 @@ class BaseScraper(ABC):
             logger.error(f"Failed to initialize browser: {e}")
             raise
 
+    async def _new_context(self) -> Tuple[BrowserContext, Page, Optional[ResourceBlocker]]:
+        """
+        Create a BrowserContext + Page with a randomized fingerprint
+
+        Each context has its own cookies/storage, so pooled workers look like
+        independent sessions while sharing the same Chromium process.
+        If a blocking profile is configured, a ResourceBlocker is routed on it.
+
+        Returns:
+            tuple: (context, page, resource_blocker or None)
+        """
+        # Select random User-Agent from pool
+        user_agent = random.choice(USER_AGENTS_POOL)
+        logger.debug(f"Using User-Agent: {user_agent[:50]}...")
+
+        # Select random viewport (to mimic different devices/users)
+        viewport = random.choice(VIEWPORT_POOL)
+        logger.debug(f"Using Viewport: {viewport['width']}x{viewport['height']}")
+
+        # Select random timezone (US only)
+        timezone = random.choice(TIMEZONE_POOL)
+        logger.debug(f"Using Timezone: {timezone}")
+
+        # Select random locale
+        locale = random.choice(LOCALE_POOL)
+        logger.debug(f"Using Locale: {locale}")
+
+        # Create context with realistic settings and randomized parameters
+        context = await self.browser.new_context(
+            viewport=viewport,  # RANDOMIZED viewport
+            user_agent=user_agent,  # RANDOMIZED User-Agent
+            locale=locale,  # RANDOMIZED locale
+            timezone_id=timezone,  # RANDOMIZED timezone
+            accept_downloads=False,
+            has_touch=False,
+            is_mobile=False,
+            java_script_enabled=True,
+            # Persistent storage for cookies (helps avoid bot detection)
+            storage_state=None,  # Will be set after first successful session
+        )
+
+        # Set extra headers
+        await context.set_extra_http_headers({
+            "Accept-Language": AMAZON_SETTINGS["accept_language"],
+            "Accept-Encoding": "gzip, deflate, br",
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+            "Referer": AMAZON_SETTINGS["base_url"],
+            "sec-ch-ua": '"Not_A Brand";v="8", "Chromium";v="120"',
+            "sec-ch-ua-mobile": "?0",
+            "sec-ch-ua-platform": '"Windows"',
+        })
+
+        # Abort images/fonts/media/ads per the scraper's blocking profile
+        blocker = None
+        if self.blocking_profile:
+            blocker = ResourceBlocker(self.blocking_profile)
+            await blocker.attach(context)
+
+        # Create page
+        page = await context.new_page()
+
+        # Enhanced anti-detection script
+        await page.add_init_script("""
+            // Remove webdriver flag
+            Object.defineProperty(navigator, 'webdriver', {
+                get: () => undefined
+            });
+
+            // Mock plugins to appear real
+            Object.defineProperty(navigator, 'plugins', {
+                get: () => [1, 2, 3, 4, 5]
+            });
+
+            // Add chrome object
+            window.chrome = {
+                runtime: {}
+            };
+
+            // Mock languages
+            Object.defineProperty(navigator, 'languages', {
+                get: () => ['en-US', 'en']
+            });
+
+            // Override permissions
+            const originalQuery = window.navigator.permissions.query;
+            window.navigator.permissions.query = (parameters) => (
+                parameters.name === 'notifications' ?
+                    Promise.resolve({ state: Notification.permission }) :
+                    originalQuery(parameters)
+            );
+
+            // Mock connection
+            Object.defineProperty(navigator, 'connection', {
+                get: () => ({
+                    effectiveType: '4g',
+                    rtt: 100,
+                    downlink: 10,
+                    saveData: false
+                })
+            });
+        """)
+
+        return context, page, blocker
+
+    async def _start_worker_pool(self):
+        """
+        Open pool_size - 1 extra contexts and register them as idle workers
+
+        The scraper itself is worker #1. Each extra worker is a shallow copy of
+        this scraper (so subclass settings like base_url carry over) bound to
+        its own context/page.
+        """
+        self._idle_workers = asyncio.Queue()
+        self._workers = [self]
+
+        for worker_id in range(1, self.pool_size):
+            worker = copy.copy(self)
+            worker.worker_id = worker_id
+            worker._owns_browser = False
+            worker._workers = []
+            worker._idle_workers = None
+            worker.pool_size = 1
+            worker.context, worker.page, worker.resource_blocker = await self._new_context()
+            self._workers.append(worker)
+
+        for worker in self._workers:
+            self._idle_workers.put_nowait(worker)
+
+        logger.info(f"Browser context pool ready: {len(self._workers)} workers sharing one browser")
+
+    @property
+    def worker_name(self) -> str:
+        """Identifier used for per-worker rate limiter statistics"""
+        return f"{self.__class__.__name__}-{self.worker_id}"
+
+    @asynccontextmanager
+    async def worker(self):
+        """
+        Borrow an idle scraper worker (own context/page) from the pool
+
+        Without a pool (pool_size == 1) this simply yields the scraper itself.
+
+        Usage:
+            async with scraper.worker() as w:
+                data = await w.scrape(asin)
+        """
+        if not self._idle_workers:
+            yield self
+            return
+
+        worker = await self._idle_workers.get()
+        try:
+            yield worker
+        finally:
+            self._idle_workers.put_nowait(worker)
+
+    def network_savings(self) -> Dict[str, Any]:
+        """Requests blocked and estimated bytes saved across this scraper's workers"""
+        workers = self._workers or [self]
+        return ResourceBlocker.combine([w.resource_blocker for w in workers if w.resource_blocker])
+
+    def log_network_savings(self):
+        """Log network blocking totals (call before close())"""
+        stats = self.network_savings()
+        if not stats["pages"]:
+            return
+        logger.info(
+            f"🌐 {self.__class__.__name__} network blocking: {stats['requests_blocked']} requests blocked "
+            f"over {stats['pages']} pages ({stats['blocked_per_page']}/page, "
+            f"~{stats['estimated_kb_saved_per_page']} KB/page, "
+            f"~{stats['estimated_bytes_saved'] / 1024 / 1024:.1f} MB total)"
+        )
+
     async def close(self):
         """Close browser and cleanup"""
         try:
+            # Pooled workers only own their context/page
+            for worker in self._workers:
+                if worker is self:
+                    continue
+                if worker.page:
+                    await worker.page.close()
+                if worker.context:
+                    await worker.context.close()
+            self._workers = []
+            self._idle_workers = None
+
             if self.page:
                 await self.page.close()
             if self.context:
                 await self.context.close()
-            if self.browser:
-                await self.browser.close()
-            if self.playwright:
-                await self.playwright.stop()
+            if self._owns_browser:
+                if self.browser:
+                    await self.browser.close()
+                if self.playwright:
+                    await self.playwright.stop()
             logger.info("Browser closed successfully")
         except Exception as e:
             logger.error(f"Error closing browser: {e}")
@@ -174,8 +303,12 @@ class BaseScraper(ABC):
         if not self.page:
             raise RuntimeError("Browser not initialized. Call initialize() first.")
 
-        # Apply rate limiting
-        rate_limiter.wait_if_needed()
+        # Apply rate limiting (awaits a shared token without blocking other workers)
+        await rate_limiter.acquire(caller=self.worker_name)
+
+        # Start per-page blocking counters
+        if self.resource_blocker:
+            self.resource_blocker.start_page(url)
 
         # Use custom timeout or default (increased to 90 seconds)
         timeout_ms = (timeout or SCRAPER_SETTINGS["page_load_timeout"]) * 1000
@@ -207,6 +340,13 @@ class BaseScraper(ABC):
                 if response and response.status == 200:
                     logger.success(f"Successfully loaded: {url}")
 
+                    if self.resource_blocker:
+                        page_stats = self.resource_blocker.page_stats()
+                        logger.debug(
+                            f"Blocked {page_stats['requests_blocked']} requests "
+                            f"(~{page_stats['estimated_bytes_saved'] / 1024:.0f} KB saved)"
+                        )
+
                     # Simulate human behavior after page load
                     if simulate_human:
                         await self._simulate_human_behavior()
@@ -0,0 +1,257 @@
+"""
+Batched field extraction for product detail pages
+Compiles a declarative field spec into one in-page script so a whole
+product record is read with a single page.evaluate() round trip
+"""
+import re
+from collections import Counter
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from loguru import logger
+
+
+# Generic in-page evaluator. Receives the compiled field list as its argument
+# and, for every field, walks the selector fallbacks in order until one
+# produces a value. Returns {name: {value, selector}} so callers can see which
+# fallback matched.
+FIELD_BUNDLE_JS = """
+(fields) => {
+    const clean = (s) => (s || '').trim();
+    const read = (node, attr) => attr ? clean(node.getAttribute(attr)) : clean(node.textContent);
+    const out = {};
+
+    for (const f of fields) {
+        const re = f.pattern ? new RegExp(f.pattern, f.flags || '') : null;
+        const accept = (v) => v && v.length >= f.min_length && (!re || re.test(v));
+        let value = null;
+        let matched = null;
+
+        for (const sel of f.selectors) {
+            let v = null;
+            try {
+                if (f.mode === 'first') {
+                    const node = document.querySelector(sel);
+                    if (node) {
+                        const text = read(node, f.attr);
+                        if (accept(text)) v = text;
+                    }
+                } else if (f.mode === 'all') {
+                    let nodes = Array.from(document.querySelectorAll(sel));
+                    if (f.scan_limit) nodes = nodes.slice(0, f.scan_limit);
+                    let values = nodes.map((n) => read(n, f.attr)).filter(accept);
+                    if (f.limit) values = values.slice(0, f.limit);
+                    if (values.length) v = values;
+                } else if (f.mode === 'pairs') {
+                    const pairs = [];
+                    for (const row of document.querySelectorAll(sel)) {
+                        const k = row.querySelector(f.pair[0]);
+                        const val = row.querySelector(f.pair[1]);
+                        if (k && val) {
+                            const key = clean(k.textContent);
+                            const text = clean(val.textContent);
+                            if (key && text) pairs.push([key, text]);
+                        }
+                    }
+                    if (pairs.length) v = pairs;
+                }
+            } catch (e) {
+                // Invalid selector or detached node - try next fallback
+            }
+            if (v !== null) {
+                value = v;
+                matched = sel;
+                break;
+            }
+        }
+        out[f.name] = { value: value, selector: matched };
+    }
+    return out;
+}
+"""
+
+
+class FieldBundle:
+    """
+    Declarative field spec compiled into a single in-page extraction
+
+    Each field is a dict:
+        selectors:   CSS selector fallbacks, tried in order
+        mode:        "first" (text/attr of first node), "all" (list of values),
+                     or "pairs" (list of [th, td] pairs from table rows)
+        attr:        Read this attribute instead of textContent (optional)
+        pattern:     JS regex a value must match for the selector to count (optional)
+        min_length:  Minimum value length (default 1)
+        limit:       Max values kept in "all" mode (optional)
+        scan_limit:  Max nodes read in "all" mode before filtering (optional)
+        pair:        [key_selector, value_selector] for "pairs" mode
+        parse:       Python post-processor applied to the raw value (optional)
+
+    Per-field selector hit counts are kept across calls so dead fallbacks
+    can be spotted with selector_report().
+    """
+
+    def __init__(self, name: str, fields: Dict[str, Dict[str, Any]]):
+        self.name = name
+        self.fields = fields
+        self.parsers: Dict[str, Callable] = {
+            field: spec["parse"] for field, spec in fields.items() if spec.get("parse")
+        }
+        self.compiled = self._compile(fields)
+
+        # field -> Counter(selector or None -> hits)
+        self.selector_hits: Dict[str, Counter] = {field: Counter() for field in fields}
+        self.extractions = 0
+
+    @staticmethod
+    def _compile(fields: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert the spec into the JSON-serializable list FIELD_BUNDLE_JS expects"""
+        compiled = []
+        for field, spec in fields.items():
+            compiled.append({
+                "name": field,
+                "selectors": list(spec["selectors"]),
+                "mode": spec.get("mode", "first"),
+                "attr": spec.get("attr"),
+                "pattern": spec.get("pattern"),
+                "flags": spec.get("flags", ""),
+                "min_length": spec.get("min_length", 1),
+                "limit": spec.get("limit"),
+                "scan_limit": spec.get("scan_limit"),
+                "pair": spec.get("pair"),
+            })
+        return compiled
+
+    async def extract(self, page) -> Tuple[Dict[str, Any], Dict[str, Optional[str]]]:
+        """
+        Extract every field with one page.evaluate()
+
+        Args:
+            page: Playwright page
+
+        Returns:
+            tuple: ({field: parsed value}, {field: matched selector or None})
+        """
+        raw = await page.evaluate(FIELD_BUNDLE_JS, self.compiled) or {}
+        self.extractions += 1
+
+        return self._finish({
+            field: ((raw.get(field) or {}).get("value"), (raw.get(field) or {}).get("selector"))
+            for field in self.fields
+        })
+
+    def extract_html(self, tree) -> Tuple[Dict[str, Any], Dict[str, Optional[str]]]:
+        """
+        Extract every field from server-rendered HTML (no browser)
+
+        Applies the same spec with lxml + cssselect so the HTTP fetch tier and
+        the Playwright path return identical records.
+
+        Args:
+            tree: lxml.html element (document root)
+
+        Returns:
+            tuple: ({field: parsed value}, {field: matched selector or None})
+        """
+        self.extractions += 1
+        return self._finish({spec["name"]: self._evaluate_html_field(tree, spec) for spec in self.compiled})
+
+    def _finish(self, raw: Dict[str, Tuple[Any, Optional[str]]]) -> Tuple[Dict[str, Any], Dict[str, Optional[str]]]:
+        """Apply post-processors and record which selector matched per field"""
+        values = {}
+        matched = {}
+        for field in self.fields:
+            value, selector = raw.get(field, (None, None))
+
+            parser = self.parsers.get(field)
+            if parser:
+                try:
+                    value = parser(value)
+                except Exception as e:
+                    logger.debug(f"[{self.name}] Failed to parse {field}: {e}")
+                    value = None
+
+            values[field] = value
+            matched[field] = selector
+            self.selector_hits[field][selector] += 1
+
+        return values, matched
+
+    @staticmethod
+    def _evaluate_html_field(tree, spec: Dict[str, Any]) -> Tuple[Any, Optional[str]]:
+        """Python mirror of FIELD_BUNDLE_JS for a single field"""
+        regex = re.compile(spec["pattern"]) if spec.get("pattern") else None
+        attr = spec.get("attr")
+
+        def read(node) -> str:
+            text = node.get(attr) if attr else node.text_content()
+            return (text or "").strip()
+
+        def accept(value: str) -> bool:
+            return bool(value) and len(value) >= spec["min_length"] and (not regex or regex.search(value) is not None)
+
+        for selector in spec["selectors"]:
+            try:
+                nodes = tree.cssselect(selector)
+            except Exception:
+                continue  # Unsupported/invalid selector - try next fallback
+
+            value = None
+            if spec["mode"] == "first":
+                if nodes:
+                    text = read(nodes[0])
+                    if accept(text):
+                        value = text
+            elif spec["mode"] == "all":
+                if spec.get("scan_limit"):
+                    nodes = nodes[:spec["scan_limit"]]
+                values = [v for v in (read(n) for n in nodes) if accept(v)]
+                if spec.get("limit"):
+                    values = values[:spec["limit"]]
+                if values:
+                    value = values
+            elif spec["mode"] == "pairs":
+                pairs = []
+                key_sel, value_sel = spec["pair"]
+                for row in nodes:
+                    keys = row.cssselect(key_sel)
+                    vals = row.cssselect(value_sel)
+                    if keys and vals:
+                        key = keys[0].text_content().strip()
+                        text = vals[0].text_content().strip()
+                        if key and text:
+                            pairs.append([key, text])
+                if pairs:
+                    value = pairs
+
+            if value is not None:
+                return value, selector
+
+        return None, None
+
+    def selector_report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarize which fallbacks matched across all extractions
+
+        Returns:
+            dict: {field: {"hits": {selector: count}, "misses": count, "dead_selectors": [...]}}
+        """
+        report = {}
+        for field, spec in self.fields.items():
+            hits = self.selector_hits[field]
+            report[field] = {
+                "hits": {sel: hits[sel] for sel in spec["selectors"] if hits[sel]},
+                "misses": hits[None],
+                "dead_selectors": [sel for sel in spec["selectors"] if not hits[sel]],
+            }
+        return report
+
+    def log_selector_report(self):
+        """Log fallback usage and selectors that never matched"""
+        if not self.extractions:
+            return
+
+        logger.info(f"[{self.name}] Selector usage over {self.extractions} pages:")
+        for field, stats in self.selector_report().items():
+            hits = ", ".join(f"{sel} x{count}" for sel, count in stats["hits"].items()) or "none"
+            logger.info(f"  {field}: {hits} | missing: {stats['misses']}")
+            if stats["dead_selectors"] and stats["hits"]:
+                logger.debug(f"  {field}: never matched -> {stats['dead_selectors']}")
@@ -0,0 +1,190 @@
+"""
+Lightweight HTTP fetch tier for product pages
+Fetches server-rendered /dp/ASIN HTML with a pooled keep-alive client and
+parses it with lxml. Pages that fail validation (CAPTCHA, missing
+#productTitle, non-200) are left for the Playwright path.
+"""
+import random
+import time
+from typing import Dict, Any, Optional
+from loguru import logger
+
+import httpx
+import lxml.html
+
+from config.settings import AMAZON_SETTINGS, USER_AGENTS_POOL
+from scrapers.product_scraper import PRODUCT_PAGE_BUNDLE, build_product_record
+from utils.rate_limiter import rate_limiter
+
+
+# Markers of Amazon bot-detection pages in raw HTML
+CAPTCHA_MARKERS = (
+    "captchacharacters",
+    "validateCaptcha",
+    "/errors/validateCaptcha",
+    "Robot Check",
+)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HttpProductFetcher:
+    """
+    Pooled async HTTP client for product detail pages
+
+    - One httpx.AsyncClient with keep-alive, connection reuse and HTTP/2
+    - Shares the global rate limiter budget with the browser scrapers
+    - Returns the same record as ProductScraper, or None so the caller
+      falls back to the browser
+
+    Usage:
+        async with HttpProductFetcher() as fetcher:
+            data = await fetcher.fetch_product(asin)
+            if data is None:
+                data = await browser_scraper.scrape(asin)
+    """
+
+    def __init__(
+        self,
+        base_url: str = None,
+        max_connections: int = 10,
+        http2: bool = True,
+        timeout_seconds: float = 20,
+        limiter=None,
+    ):
+        self.base_url = (base_url or AMAZON_SETTINGS["base_url"]).rstrip("/")
+        self.max_connections = max_connections
+        self.http2 = http2 and _http2_available()
+        self.timeout_seconds = timeout_seconds
+        self.limiter = limiter or rate_limiter
+        self.client: Optional[httpx.AsyncClient] = None
+
+        if http2 and not self.http2:
+            logger.warning("h2 package not installed, HTTP fetch tier will use HTTP/1.1")
+
+        self.stats = {
+            "requests": 0,
+            "success": 0,
+            "fallback_captcha": 0,
+            "fallback_missing_title": 0,
+            "fallback_status": 0,
+            "errors": 0,
+            "bytes_downloaded": 0,
+            "total_fetch_seconds": 0.0,
+        }
+
+    async def start(self):
+        """Create the pooled client"""
+        if self.client:
+            return
+
+        self.client = httpx.AsyncClient(
+            http2=self.http2,
+            follow_redirects=True,
+            timeout=httpx.Timeout(self.timeout_seconds),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=30,
+            ),
+            headers={
+                "User-Agent": random.choice(USER_AGENTS_POOL),
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+                "Accept-Language": AMAZON_SETTINGS["accept_language"],
+                # No Accept-Encoding: httpx advertises only the encodings it can decode
+                # (br/zstd only when brotli/zstandard are installed)
+                "Referer": AMAZON_SETTINGS["base_url"],
+            },
+        )
+        logger.info(f"HTTP fetch tier ready (HTTP/{'2' if self.http2 else '1.1'}, {self.max_connections} connections)")
+
+    async def close(self):
+        """Close the pooled client"""
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
+    async def fetch_product(self, asin: str, caller: str = "HttpProductFetcher") -> Optional[Dict[str, Any]]:
+        """
+        Fetch and parse a product page without a browser
+
+        Args:
+            asin: Amazon Standard Identification Number
+            caller: Name for rate limiter statistics
+
+        Returns:
+            dict: Product data, or None if the page failed validation
+        """
+        if not self.client:
+            await self.start()
+
+        url = f"{self.base_url}/dp/{asin}"
+        await self.limiter.acquire(caller=caller)
+
+        self.stats["requests"] += 1
+        start = time.monotonic()
+        try:
+            response = await self.client.get(url)
+        except httpx.HTTPError as e:
+            self.stats["errors"] += 1
+            logger.debug(f"HTTP fetch failed for {asin}: {e}")
+            return None
+        finally:
+            self.stats["total_fetch_seconds"] += time.monotonic() - start
+
+        self.limiter.record_request()
+        self.stats["bytes_downloaded"] += len(response.content)
+
+        if response.status_code != 200:
+            self.stats["fallback_status"] += 1
+            logger.debug(f"HTTP {response.status_code} for {asin}, falling back to browser")
+            return None
+
+        html = response.text
+        if any(marker in html for marker in CAPTCHA_MARKERS):
+            self.stats["fallback_captcha"] += 1
+            logger.debug(f"CAPTCHA page for {asin}, falling back to browser")
+            return None
+
+        try:
+            tree = lxml.html.fromstring(html)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.debug(f"Failed to parse HTML for {asin}: {e}")
+            return None
+
+        if not tree.cssselect("#productTitle"):
+            self.stats["fallback_missing_title"] += 1
+            logger.debug(f"#productTitle missing for {asin}, falling back to browser")
+            return None
+
+        fields, _ = PRODUCT_PAGE_BUNDLE.extract_html(tree)
+        product_data = build_product_record(asin, url, fields)
+
+        self.stats["success"] += 1
+        logger.success(f"Fetched product via HTTP: {asin} - {product_data['product_name']}")
+        return product_data
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Fetch tier statistics (success vs. browser fallbacks)"""
+        requests = max(1, self.stats["requests"])
+        return {
+            **self.stats,
+            "total_fetch_seconds": round(self.stats["total_fetch_seconds"], 2),
+            "success_rate": round(self.stats["success"] / requests * 100, 1),
+            "average_fetch_seconds": round(self.stats["total_fetch_seconds"] / requests, 2),
+        }
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
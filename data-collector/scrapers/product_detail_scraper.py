@@ -8,6 +8,7 @@ from loguru import logger
 from datetime import datetime
 
 from scrapers.base_scraper import BaseScraper
+from scrapers.field_bundle import FieldBundle
 
 
 class ProductDetailScraper(BaseScraper):
@@ -59,24 +60,10 @@ class ProductDetailScraper(BaseScraper):
             "scraped_at": datetime.now().isoformat(),
         }
 
-        # Basic info
-        product_data["title"] = await self._extract_title()
-        product_data["price"] = await self._extract_price()
-        product_data["rating"] = await self._extract_rating()
-        product_data["review_count"] = await self._extract_review_count()
-
-        # Images
-        product_data["images"] = await self._extract_images()
-
-        # Product features
-        product_data["features"] = await self._extract_features()
-        product_data["about_items"] = await self._extract_about_items()
-
-        # Specifications
-        product_data["specifications"] = await self._extract_specifications()
-
-        # Product details
-        product_data["product_details"] = await self._extract_product_details()
+        # Basic info, images, features, specifications and details
+        # (single in-page evaluate for all fields)
+        fields, _ = await DETAIL_PAGE_BUNDLE.extract(self.page)
+        product_data.update(self._build_detail_fields(fields))
 
         # Reviews (sample for summarization)
         product_data["sample_reviews"] = await self._extract_sample_reviews(max_reviews=20)
@@ -85,207 +72,31 @@ class ProductDetailScraper(BaseScraper):
 
         return product_data
 
-    async def _extract_title(self) -> Optional[str]:
-        """Extract product title"""
-        try:
-            title = await self.extract_text("#productTitle")
-            return title
-        except Exception as e:
-            logger.debug(f"Failed to extract title: {e}")
-            return None
-
-    async def _extract_price(self) -> Optional[Dict[str, Any]]:
-        """Extract price information"""
-        try:
-            price_info = {}
-
-            # Try different price selectors
-            selectors = [
-                ".a-price .a-offscreen",
-                "#priceblock_ourprice",
-                "#priceblock_dealprice",
-                ".a-price-whole",
-            ]
-
-            for selector in selectors:
-                price_text = await self.extract_text(selector)
-                if price_text:
-                    # Extract numeric value
-                    match = re.search(r'\$?([\d,]+\.?\d*)', price_text)
-                    if match:
-                        price_info["price"] = float(match.group(1).replace(",", ""))
-                        price_info["currency"] = "USD"
-                        price_info["formatted"] = price_text
-                        break
-
-            return price_info if price_info else None
-
-        except Exception as e:
-            logger.debug(f"Failed to extract price: {e}")
-            return None
-
-    async def _extract_rating(self) -> Optional[float]:
-        """Extract average rating"""
-        try:
-            rating_text = await self.extract_text("#acrPopover")
-            if rating_text:
-                match = re.search(r'([\d.]+)\s*out of\s*5', rating_text)
-                if match:
-                    return float(match.group(1))
-            return None
-        except Exception as e:
-            logger.debug(f"Failed to extract rating: {e}")
-            return None
-
-    async def _extract_review_count(self) -> Optional[int]:
-        """Extract total review count"""
-        try:
-            review_text = await self.extract_text("#acrCustomerReviewText")
-            if review_text:
-                match = re.search(r'([\d,]+)', review_text)
-                if match:
-                    return int(match.group(1).replace(",", ""))
-            return None
-        except Exception as e:
-            logger.debug(f"Failed to extract review count: {e}")
-            return None
-
-    async def _extract_images(self) -> List[str]:
-        """Extract product images"""
-        try:
-            images = []
-
-            # Get image URLs
-            img_elements = await self.page.query_selector_all("#altImages img")
-            for img in img_elements[:6]:  # First 6 images
-                src = await img.get_attribute("src")
-                if src and "data:image" not in src:
-                    # Convert thumbnail to larger image
-                    large_src = re.sub(r'_[A-Z]{2}\d+_', '_AC_SL1500_', src)
-                    images.append(large_src)
-
-            return images
-
-        except Exception as e:
-            logger.debug(f"Failed to extract images: {e}")
-            return []
-
-    async def _extract_features(self) -> List[str]:
-        """Extract key product features"""
-        try:
-            features = []
-
-            # Feature bullets
-            feature_elements = await self.page.query_selector_all("#feature-bullets li")
-            for element in feature_elements:
-                text = await element.text_content()
-                if text and text.strip():
-                    features.append(text.strip())
-
-            return features
-
-        except Exception as e:
-            logger.debug(f"Failed to extract features: {e}")
-            return []
-
-    async def _extract_about_items(self) -> List[str]:
-        """Extract 'About this item' section"""
-        try:
-            items = []
-
-            selectors = [
-                "#feature-bullets ul li span",
-                ".a-unordered-list.a-vertical li",
-            ]
-
-            for selector in selectors:
-                elements = await self.page.query_selector_all(selector)
-                if elements:
-                    for element in elements:
-                        text = await element.text_content()
-                        if text and text.strip() and len(text.strip()) > 10:
-                            items.append(text.strip())
-                    if items:
-                        break
-
-            return items[:10]  # Limit to 10 items
-
-        except Exception as e:
-            logger.debug(f"Failed to extract about items: {e}")
-            return []
-
-    async def _extract_specifications(self) -> Dict[str, str]:
-        """Extract product specifications"""
-        try:
-            specs = {}
-
-            # Product information table
-            spec_elements = await self.page.query_selector_all(".prodDetTable tr, .a-keyvalue tr")
-
-            for element in spec_elements:
-                try:
-                    th = await element.query_selector("th")
-                    td = await element.query_selector("td")
-
-                    if th and td:
-                        key = await th.text_content()
-                        value = await td.text_content()
-
-                        if key and value:
-                            specs[key.strip()] = value.strip()
-                except:
-                    continue
-
-            return specs
-
-        except Exception as e:
-            logger.debug(f"Failed to extract specifications: {e}")
-            return {}
-
-    async def _extract_product_details(self) -> Dict[str, Any]:
-        """Extract additional product details"""
-        try:
-            details = {}
-
-            # Scent, size, color variants
-            variant_selectors = {
-                "scent": "#variation_scent_name",
-                "size": "#variation_size_name",
-                "color": "#variation_color_name",
-            }
-
-            for key, selector in variant_selectors.items():
-                value = await self.extract_text(f"{selector} .selection")
-                if value:
-                    details[key] = value
-
-            # Brand - Extract from "Visit the [brand name] Store" pattern
-            brand = await self.extract_text("#bylineInfo")
-            if brand:
-                # Try to extract from "Visit the [brand name] Store" pattern
-                import re
-
-                # Pattern 1: "Visit the [Brand Name] Store"
-                match = re.search(r'Visit\s+the\s+(.+?)\s+Store', brand, re.IGNORECASE)
-                if match:
-                    details["brand"] = match.group(1).strip()
-                else:
-                    # Pattern 2: "Brand: [Brand Name]" or just "[Brand Name]"
-                    # Fallback to simple cleanup if pattern not found
-                    cleaned = brand.replace("Visit the", "").replace("Store", "").replace("Brand:", "").strip()
-                    # Remove trailing special characters
-                    cleaned = re.sub(r'[›»]+\s*$', '', cleaned).strip()
-                    if cleaned and cleaned not in ["Shop the Store on Amazon", ""]:
-                        details["brand"] = cleaned
-                    else:
-                        # If still invalid, don't set brand (will be extracted from product name later)
-                        pass
-
-            return details
-
-        except Exception as e:
-            logger.debug(f"Failed to extract product details: {e}")
-            return {}
+    def _build_detail_fields(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Assemble product detail fields from bundle output"""
+        # Images: convert thumbnails to larger images, skip inline placeholders
+        images = []
+        for src in fields.get("images") or []:
+            if src and "data:image" not in src:
+                images.append(re.sub(r'_[A-Z]{2}\d+_', '_AC_SL1500_', src))
+
+        # Scent, size, color variants + brand
+        details = {}
+        for key in ("scent", "size", "color", "brand"):
+            if fields.get(key):
+                details[key] = fields[key]
+
+        return {
+            "title": fields.get("title"),
+            "price": fields.get("price"),
+            "rating": fields.get("rating"),
+            "review_count": fields.get("review_count"),
+            "images": images,
+            "features": fields.get("features") or [],
+            "about_items": fields.get("about_items") or [],
+            "specifications": dict(fields.get("specifications") or []),
+            "product_details": details,
+        }
 
     async def _extract_sample_reviews(self, max_reviews: int = 20) -> List[Dict[str, Any]]:
         """Extract sample reviews for summarization"""
@@ -352,6 +163,121 @@ class ProductDetailScraper(BaseScraper):
             return []
 
 
+def _parse_price(price_text: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Extract price information"""
+    if price_text:
+        match = re.search(r'\$?([\d,]+\.?\d*)', price_text)
+        if match:
+            return {
+                "price": float(match.group(1).replace(",", "")),
+                "currency": "USD",
+                "formatted": price_text,
+            }
+    return None
+
+
+def _parse_rating(rating_text: Optional[str]) -> Optional[float]:
+    """Extract average rating"""
+    if rating_text:
+        match = re.search(r'([\d.]+)\s*out of\s*5', rating_text)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def _parse_review_count(review_text: Optional[str]) -> Optional[int]:
+    """Extract total review count"""
+    if review_text:
+        match = re.search(r'([\d,]+)', review_text)
+        if match:
+            return int(match.group(1).replace(",", ""))
+    return None
+
+
+def _parse_brand(brand: Optional[str]) -> Optional[str]:
+    """Extract brand from "Visit the [brand name] Store" pattern"""
+    if not brand:
+        return None
+
+    # Pattern 1: "Visit the [Brand Name] Store"
+    match = re.search(r'Visit\s+the\s+(.+?)\s+Store', brand, re.IGNORECASE)
+    if match:
+        return match.group(1).strip()
+
+    # Pattern 2: "Brand: [Brand Name]" or just "[Brand Name]"
+    # Fallback to simple cleanup if pattern not found
+    cleaned = brand.replace("Visit the", "").replace("Store", "").replace("Brand:", "").strip()
+    # Remove trailing special characters
+    cleaned = re.sub(r'[›»]+\s*$', '', cleaned).strip()
+    if cleaned and cleaned not in ["Shop the Store on Amazon", ""]:
+        return cleaned
+
+    # If still invalid, don't set brand (will be extracted from product name later)
+    return None
+
+
+# Declarative field spec for product detail pages (selector fallbacks in priority order)
+DETAIL_PAGE_FIELDS = {
+    "title": {
+        "selectors": ["#productTitle"],
+    },
+    "price": {
+        "selectors": [
+            ".a-price .a-offscreen",
+            "#priceblock_ourprice",
+            "#priceblock_dealprice",
+            ".a-price-whole",
+        ],
+        "pattern": r"\$?([\d,]+\.?\d*)",
+        "parse": _parse_price,
+    },
+    "rating": {
+        "selectors": ["#acrPopover"],
+        "parse": _parse_rating,
+    },
+    "review_count": {
+        "selectors": ["#acrCustomerReviewText"],
+        "parse": _parse_review_count,
+    },
+    "images": {
+        "selectors": ["#altImages img"],
+        "mode": "all",
+        "attr": "src",
+        "scan_limit": 6,  # First 6 images
+    },
+    "features": {
+        "selectors": ["#feature-bullets li"],
+        "mode": "all",
+    },
+    "about_items": {
+        "selectors": ["#feature-bullets ul li span", ".a-unordered-list.a-vertical li"],
+        "mode": "all",
+        "min_length": 11,
+        "limit": 10,  # Limit to 10 items
+    },
+    "specifications": {
+        "selectors": [".prodDetTable tr, .a-keyvalue tr"],
+        "mode": "pairs",
+        "pair": ["th", "td"],
+    },
+    "scent": {
+        "selectors": ["#variation_scent_name .selection"],
+    },
+    "size": {
+        "selectors": ["#variation_size_name .selection"],
+    },
+    "color": {
+        "selectors": ["#variation_color_name .selection"],
+    },
+    "brand": {
+        "selectors": ["#bylineInfo"],
+        "parse": _parse_brand,
+    },
+}
+
+DETAIL_PAGE_BUNDLE = FieldBundle("ProductDetailScraper", DETAIL_PAGE_FIELDS)
+
+
 # Example usage
 async def main():
     """Test product detail scraper"""
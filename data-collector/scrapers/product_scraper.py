@@ -9,6 +9,8 @@ from loguru import logger
 from datetime import datetime
 
 from scrapers.base_scraper import BaseScraper
+from scrapers.field_bundle import FieldBundle
+from scrapers.review_scraper import ReviewScraper
 from config.settings import AMAZON_SETTINGS
 
 
@@ -26,11 +28,16 @@ class ProductScraper(BaseScraper):
     - Category breadcrumb
     - Images
     - Product description
+
+    If an http_fetcher (HttpProductFetcher) is given, each ASIN is first
+    fetched over plain HTTP; the browser is only used when that page fails
+    validation (CAPTCHA, missing #productTitle, non-200).
     """
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, pool_size: int = 1, http_fetcher=None):
+        super().__init__(pool_size=pool_size)
         self.base_url = AMAZON_SETTINGS["base_url"]
+        self.http_fetcher = http_fetcher
 
     async def _is_captcha_page(self) -> bool:
         """Check if current page is a CAPTCHA or bot detection page"""
@@ -80,12 +87,13 @@ class ProductScraper(BaseScraper):
         logger.warning("Could not detect product page structure")
         return False
 
-    async def scrape(self, asin: str) -> Dict[str, Any]:
+    async def scrape(self, asin: str, use_http: bool = True) -> Dict[str, Any]:
         """
         Scrape product details for given ASIN
 
         Args:
             asin: Amazon Standard Identification Number
+            use_http: Try the HTTP fetch tier first (if configured)
 
         Returns:
             dict: Product data
@@ -93,6 +101,13 @@ class ProductScraper(BaseScraper):
         url = f"{self.base_url}/dp/{asin}"
         logger.info(f"Scraping product: {asin}")
 
+        # Fast path: server-rendered HTML without a browser
+        if use_http and self.http_fetcher:
+            product_data = await self.http_fetcher.fetch_product(asin, caller=f"{self.worker_name}-http")
+            if product_data:
+                return product_data
+            logger.debug(f"HTTP tier rejected {asin}, using browser")
+
         # Navigate to product page (skip heavy human simulation for speed)
         success = await self.goto(url, simulate_human=False)
         if not success:
@@ -113,248 +128,212 @@ class ProductScraper(BaseScraper):
             logger.warning(f"Product page structure not found for {asin}")
             return {"error": "Invalid page structure", "asin": asin}
 
-        # Extract product data
-        product_data = {
-            "asin": asin,
-            "url": url,
-            "scraped_at": datetime.now().isoformat(),
-            "brand": await self._extract_brand(),
-            "product_name": await self._extract_product_name(),
-            "price": await self._extract_price(),
-            "rating": await self._extract_rating(),
-            "review_count": await self._extract_review_count(),
-            "breadcrumb": await self._extract_breadcrumb(),
-            "category": await self._extract_category(),
-            "images": await self._extract_images(),
-            "description": await self._extract_description(),
-            "features": await self._extract_features(),
-            "availability": await self._extract_availability(),
-        }
+        # Extract product data (single in-page evaluate for all fields)
+        fields, _ = await PRODUCT_PAGE_BUNDLE.extract(self.page)
+        product_data = build_product_record(asin, url, fields)
 
         logger.success(f"Successfully scraped product: {asin} - {product_data['product_name']}")
         return product_data
 
-    async def _extract_brand(self) -> Optional[str]:
-        """Extract brand name from 'Visit the X Store' or 'Brand: X' patterns"""
-        selectors = [
-            "#bylineInfo",
-            "a[id='bylineInfo']",
-            ".a-row .a-size-small.a-link-normal",
-        ]
-
-        for selector in selectors:
-            brand_text = await self.extract_text(selector)
-            if brand_text:
-                brand_text = brand_text.strip()
-
-                # Pattern 1: "Visit the [Brand Name] Store"
-                match = re.search(r'Visit\s+the\s+(.+?)\s+Store', brand_text, re.IGNORECASE)
-                if match:
-                    return match.group(1).strip()
+    async def scrape_with_reviews(self, asin: str, max_reviews: int = 15) -> Dict[str, Any]:
+        """
+        Product fields, review summary and visible reviews from one page load
 
-                # Pattern 2: "Brand: [Brand Name]"
-                match = re.search(r'Brand:\s*(.+)', brand_text, re.IGNORECASE)
-                if match:
-                    return match.group(1).strip()
+        Always uses the browser (reviews are loaded on scroll), then reads the
+        reviews from the same /dp/ASIN page instead of navigating again.
 
-                # Pattern 3: Just the brand name (no prefix/suffix)
-                # If no pattern matched but text exists, try cleaning common patterns
-                cleaned = brand_text
-                cleaned = re.sub(r'^Visit\s+the\s+', '', cleaned, flags=re.IGNORECASE)
-                cleaned = re.sub(r'\s+Store$', '', cleaned, flags=re.IGNORECASE)
-                cleaned = re.sub(r'^Brand:\s*', '', cleaned, flags=re.IGNORECASE)
-                cleaned = cleaned.strip()
+        Args:
+            asin: Amazon Standard Identification Number
+            max_reviews: Maximum number of reviews to collect
 
-                if cleaned and len(cleaned) > 0 and len(cleaned) < 100:
-                    return cleaned
+        Returns:
+            dict: {"product": product data, "reviews": review data or None on failure}
+        """
+        product_data = await self.scrape(asin, use_http=False)
+        if product_data.get("error"):
+            return {"product": product_data, "reviews": None}
 
-        return None
+        try:
+            reviews = await ReviewScraper.sharing_page(self).scrape_current_page(asin, max_reviews=max_reviews)
+        except Exception as e:
+            logger.warning(f"Failed to read reviews from product page {asin}: {e}")
+            reviews = None
 
-    async def _extract_product_name(self) -> Optional[str]:
-        """Extract product name/title"""
-        selectors = [
-            "#productTitle",
-            "h1.a-size-large.product-title-word-break",
-        ]
+        return {"product": product_data, "reviews": reviews}
 
-        for selector in selectors:
-            name = await self.extract_text(selector)
-            if name:
-                return name
 
+def _parse_brand(brand_text: Optional[str]) -> Optional[str]:
+    """Extract brand name from 'Visit the X Store' or 'Brand: X' patterns"""
+    if not brand_text:
         return None
 
-    async def _extract_price(self) -> Optional[Dict[str, Any]]:
-        """Extract price information"""
-        price_data = {}
-
-        # Current price
-        price_selectors = [
+    brand_text = brand_text.strip()
+
+    # Pattern 1: "Visit the [Brand Name] Store"
+    match = re.search(r'Visit\s+the\s+(.+?)\s+Store', brand_text, re.IGNORECASE)
+    if match:
+        return match.group(1).strip()
+
+    # Pattern 2: "Brand: [Brand Name]"
+    match = re.search(r'Brand:\s*(.+)', brand_text, re.IGNORECASE)
+    if match:
+        return match.group(1).strip()
+
+    # Pattern 3: Just the brand name (no prefix/suffix)
+    # If no pattern matched but text exists, try cleaning common patterns
+    cleaned = brand_text
+    cleaned = re.sub(r'^Visit\s+the\s+', '', cleaned, flags=re.IGNORECASE)
+    cleaned = re.sub(r'\s+Store$', '', cleaned, flags=re.IGNORECASE)
+    cleaned = re.sub(r'^Brand:\s*', '', cleaned, flags=re.IGNORECASE)
+    cleaned = cleaned.strip()
+
+    if cleaned and len(cleaned) < 100:
+        return cleaned
+
+    return None
+
+
+def _parse_price(price_text: Optional[str]) -> Optional[float]:
+    """Extract numeric price from '$1,234.56'"""
+    if price_text:
+        match = re.search(PRICE_PATTERN, price_text)
+        if match:
+            return float(match.group(1).replace(",", ""))
+    return None
+
+
+def _parse_rating(rating_text: Optional[str]) -> Optional[float]:
+    """Extract average rating from '4.5 out of 5 stars'"""
+    if rating_text:
+        match = re.search(RATING_PATTERN, rating_text)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def _parse_count(count_text: Optional[str]) -> Optional[int]:
+    """Extract integer count from '12,345 ratings'"""
+    if count_text:
+        match = re.search(COUNT_PATTERN, count_text)
+        if match:
+            return int(match.group(1).replace(",", ""))
+    return None
+
+
+def _high_res_image(src: str) -> str:
+    """Strip Amazon size suffix to get the high-res image URL"""
+    return re.sub(r"\._.*?_\.", ".", src)
+
+
+# Regex shared by the in-page selector check and the Python parsers
+PRICE_PATTERN = r"\$?([\d,]+\.?\d*)"
+RATING_PATTERN = r"([\d.]+)\s*out of\s*5"
+COUNT_PATTERN = r"([\d,]+)"
+
+# Declarative field spec for /dp/ASIN pages (selector fallbacks in priority order)
+PRODUCT_PAGE_FIELDS = {
+    "brand": {
+        "selectors": ["#bylineInfo", "a[id='bylineInfo']", ".a-row .a-size-small.a-link-normal"],
+        "parse": _parse_brand,
+    },
+    "product_name": {
+        "selectors": ["#productTitle", "h1.a-size-large.product-title-word-break"],
+    },
+    "current_price": {
+        "selectors": [
             ".a-price[data-a-color='price'] .a-offscreen",
             ".a-price .a-offscreen",
             "#priceblock_ourprice",
             "#priceblock_dealprice",
-        ]
-
-        for selector in price_selectors:
-            price_text = await self.extract_text(selector)
-            if price_text:
-                # Extract numeric value
-                match = re.search(r"\$?([\d,]+\.?\d*)", price_text)
-                if match:
-                    price_data["current_price"] = float(match.group(1).replace(",", ""))
-                    price_data["currency"] = "USD"
-                    break
-
-        # List price (if different from current)
-        list_price_text = await self.extract_text(".a-price.a-text-price .a-offscreen")
-        if list_price_text:
-            match = re.search(r"\$?([\d,]+\.?\d*)", list_price_text)
-            if match:
-                price_data["list_price"] = float(match.group(1).replace(",", ""))
-
-        return price_data if price_data else None
-
-    async def _extract_rating(self) -> Optional[float]:
-        """Extract average rating"""
-        selectors = [
-            "#acrPopover",
-            "span[data-hook='rating-out-of-text']",
-        ]
-
-        for selector in selectors:
-            rating_text = await self.extract_text(selector)
-            if rating_text:
-                match = re.search(r"([\d.]+)\s*out of\s*5", rating_text)
-                if match:
-                    return float(match.group(1))
-
-        return None
-
-    async def _extract_review_count(self) -> Optional[int]:
-        """Extract total review count"""
-        selectors = [
-            "#acrCustomerReviewText",
-            "span[data-hook='total-review-count']",
-        ]
-
-        for selector in selectors:
-            count_text = await self.extract_text(selector)
-            if count_text:
-                match = re.search(r"([\d,]+)", count_text)
-                if match:
-                    return int(match.group(1).replace(",", ""))
-
-        return None
-
-    async def _extract_breadcrumb(self) -> Optional[str]:
-        """Extract category breadcrumb path"""
-        breadcrumb_parts = []
-
-        # Try wayfinding breadcrumb (most common)
-        breadcrumb_elements = await self.page.query_selector_all(
-            "#wayfinding-breadcrumbs_feature_div ul li a"
-        )
-
-        if breadcrumb_elements:
-            for element in breadcrumb_elements:
-                text = await element.text_content()
-                if text:
-                    breadcrumb_parts.append(text.strip())
-
-        if breadcrumb_parts:
-            return " > ".join(breadcrumb_parts)
-
-        return None
-
-    async def _extract_category(self) -> Optional[str]:
-        """Extract main category (last item in breadcrumb)"""
-        breadcrumb = await self._extract_breadcrumb()
-        if breadcrumb:
-            parts = breadcrumb.split(" > ")
-            return parts[-1] if parts else None
-        return None
-
-    async def _extract_images(self) -> list:
-        """Extract product image URLs"""
-        images = []
-
-        # Main image
-        main_image = await self.extract_attribute("#landingImage", "src")
-        if main_image:
-            # Get high-res version
-            main_image = re.sub(r"\._.*?_\.", ".", main_image)
-            images.append(main_image)
-
-        # Thumbnail images
-        thumb_elements = await self.page.query_selector_all(
-            "#altImages ul li img"
-        )
-
-        for element in thumb_elements[:5]:  # Limit to 5 images
-            src = await element.get_attribute("src")
-            if src and src not in images:
-                src = re.sub(r"\._.*?_\.", ".", src)
-                images.append(src)
-
-        return images
-
-    async def _extract_description(self) -> Optional[str]:
-        """Extract product description"""
-        selectors = [
-            "#productDescription p",
-            "#feature-bullets ul li",
-        ]
-
-        description_parts = []
-
-        for selector in selectors:
-            elements = await self.page.query_selector_all(selector)
-            for element in elements:
-                text = await element.text_content()
-                if text:
-                    text = text.strip()
-                    if text and len(text) > 10:  # Skip very short texts
-                        description_parts.append(text)
-
-            if description_parts:
-                break
-
-        if description_parts:
-            return "\n".join(description_parts[:5])  # Limit to first 5 points
-
-        return None
-
-    async def _extract_features(self) -> list:
-        """Extract key product features/bullet points"""
-        features = []
-
-        feature_elements = await self.page.query_selector_all(
-            "#feature-bullets ul li span.a-list-item"
-        )
-
-        for element in feature_elements:
-            text = await element.text_content()
-            if text:
-                text = text.strip()
-                if text and len(text) > 10:
-                    features.append(text)
-
-        return features
-
-    async def _extract_availability(self) -> Optional[str]:
-        """Extract availability status"""
-        selectors = [
-            "#availability span",
-            "#availability",
-        ]
-
-        for selector in selectors:
-            availability = await self.extract_text(selector)
-            if availability:
-                return availability
-
-        return None
+        ],
+        "pattern": PRICE_PATTERN,
+        "parse": _parse_price,
+    },
+    "list_price": {
+        "selectors": [".a-price.a-text-price .a-offscreen"],
+        "pattern": PRICE_PATTERN,
+        "parse": _parse_price,
+    },
+    "rating": {
+        "selectors": ["#acrPopover", "span[data-hook='rating-out-of-text']"],
+        "pattern": RATING_PATTERN,
+        "parse": _parse_rating,
+    },
+    "review_count": {
+        "selectors": ["#acrCustomerReviewText", "span[data-hook='total-review-count']"],
+        "pattern": COUNT_PATTERN,
+        "parse": _parse_count,
+    },
+    "breadcrumb": {
+        "selectors": ["#wayfinding-breadcrumbs_feature_div ul li a"],
+        "mode": "all",
+    },
+    "main_image": {
+        "selectors": ["#landingImage"],
+        "attr": "src",
+    },
+    "thumbnail_images": {
+        "selectors": ["#altImages ul li img"],
+        "mode": "all",
+        "attr": "src",
+        "scan_limit": 5,  # Limit to 5 images
+    },
+    "description": {
+        "selectors": ["#productDescription p", "#feature-bullets ul li"],
+        "mode": "all",
+        "min_length": 11,  # Skip very short texts
+    },
+    "features": {
+        "selectors": ["#feature-bullets ul li span.a-list-item"],
+        "mode": "all",
+        "min_length": 11,
+    },
+    "availability": {
+        "selectors": ["#availability span", "#availability"],
+    },
+}
+
+PRODUCT_PAGE_BUNDLE = FieldBundle("ProductScraper", PRODUCT_PAGE_FIELDS)
+
+
+def build_product_record(asin: str, url: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Assemble the product record from bundle fields (browser or HTTP tier)"""
+    breadcrumb_parts = fields.get("breadcrumb") or []
+    breadcrumb = " > ".join(breadcrumb_parts) if breadcrumb_parts else None
+
+    # Price information
+    price_data = {}
+    if fields.get("current_price") is not None:
+        price_data["current_price"] = fields["current_price"]
+        price_data["currency"] = "USD"
+    if fields.get("list_price") is not None:
+        price_data["list_price"] = fields["list_price"]
+
+    # Main image + up to 5 thumbnails (high-res versions)
+    images = []
+    for src in ([fields["main_image"]] if fields.get("main_image") else []) + (fields.get("thumbnail_images") or []):
+        src = _high_res_image(src)
+        if src not in images:
+            images.append(src)
+
+    description_parts = fields.get("description") or []
+
+    return {
+        "asin": asin,
+        "url": url,
+        "scraped_at": datetime.now().isoformat(),
+        "brand": fields.get("brand"),
+        "product_name": fields.get("product_name"),
+        "price": price_data if price_data else None,
+        "rating": fields.get("rating"),
+        "review_count": fields.get("review_count"),
+        "breadcrumb": breadcrumb,
+        "category": breadcrumb_parts[-1] if breadcrumb_parts else None,
+        "images": images,
+        "description": "\n".join(description_parts[:5]) if description_parts else None,  # Limit to first 5 points
+        "features": fields.get("features") or [],
+        "availability": fields.get("availability"),
+    }
 
 
 # Example usage
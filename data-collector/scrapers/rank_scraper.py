@@ -10,6 +10,142 @@ from datetime import datetime
 from scrapers.base_scraper import BaseScraper
 
 
+# Best Sellers product card container
+PRODUCT_CARD_SELECTOR = ".zg-grid-general-faceout"
+
+# Reads one product card in the browser. Selector fallbacks mirror the
+# previous element-by-element extraction; parsing stays in Python (_parse_card).
+CARD_EXTRACTOR_JS = """
+(el) => {
+    const text = (node) => node ? (node.textContent || '').trim() : null;
+    const first = (selectors) => {
+        for (const sel of selectors) {
+            const node = el.querySelector(sel);
+            if (node) return node;
+        }
+        return null;
+    };
+
+    // Rank: .zg-bdg-text (old format) -> badge span -> any element with rank text
+    const rankEl = first(['.zg-bdg-text', 'span.zg-badge-text', "[aria-label*='#']"]);
+    const linkEl = el.querySelector('a.a-link-normal');
+    const titleEl = first(['div._cDEzb_p13n-sc-css-line-clamp-3_g3dy1', 'a.a-link-normal > div']);
+
+    return {
+        rank_text: text(rankEl),
+        href: linkEl ? linkEl.getAttribute('href') : null,
+        title: text(titleEl),
+        price_text: text(el.querySelector('.a-price .a-offscreen')),
+        rating_text: text(el.querySelector('.a-icon-alt')),
+        review_text: text(el.querySelector('span.a-size-small')),
+    };
+}
+"""
+
+# Amazon Best Sellers shows 50 products per page (Page 1 = Rank 1-50, Page 2 = Rank 51-100)
+BEST_SELLERS_PAGE_SIZE = 50
+
+# Extracts every card on the page in a single CDP round trip
+GRID_EXTRACTOR_JS = f"""
+(selector) => {{
+    const extractCard = {CARD_EXTRACTOR_JS};
+    const cards = [];
+    for (const el of document.querySelectorAll(selector)) {{
+        try {{
+            cards.push(extractCard(el));
+        }} catch (e) {{
+            // Skip malformed card
+        }}
+    }}
+    return cards;
+}}
+"""
+
+# Installs a MutationObserver that extracts only newly attached cards into an
+# ASIN-keyed ordered buffer. Cards attached before their link is rendered are
+# retried on the next drain.
+HARVESTER_INSTALL_JS = f"""
+(selector) => {{
+    if (window.__rankHarvester) {{
+        window.__rankHarvester.observer.disconnect();
+    }}
+    const extractCard = {CARD_EXTRACTOR_JS};
+    const asinOf = (card) => {{
+        const match = card.href ? card.href.match(/\\/dp\\/([A-Z0-9]{{10}})/) : null;
+        return match ? match[1] : null;
+    }};
+    const h = {{ seen: new Set(), buffer: [], unresolved: new Set() }};
+
+    const collect = (el) => {{
+        let card;
+        try {{
+            card = extractCard(el);
+        }} catch (e) {{
+            h.unresolved.add(el);
+            return;
+        }}
+        const asin = asinOf(card);
+        if (!asin) {{
+            h.unresolved.add(el);
+            return;
+        }}
+        h.unresolved.delete(el);
+        if (h.seen.has(asin)) return;
+        h.seen.add(asin);
+        h.buffer.push(card);
+    }};
+
+    const scan = (node) => {{
+        if (node.nodeType !== 1) return;
+        if (node.matches(selector)) collect(node);
+        node.querySelectorAll(selector).forEach(collect);
+    }};
+
+    h.retry = () => {{
+        for (const el of Array.from(h.unresolved)) {{
+            if (el.isConnected) collect(el);
+            else h.unresolved.delete(el);
+        }}
+    }};
+
+    h.observer = new MutationObserver((mutations) => {{
+        for (const m of mutations) m.addedNodes.forEach(scan);
+    }});
+    h.observer.observe(document.body, {{ childList: true, subtree: true }});
+
+    // Cards already in the DOM
+    document.querySelectorAll(selector).forEach(collect);
+    window.__rankHarvester = h;
+    return h.seen.size;
+}}
+"""
+
+HARVESTER_DRAIN_JS = """
+() => {
+    const h = window.__rankHarvester;
+    if (!h) return null;
+    h.retry();
+    const cards = h.buffer;
+    h.buffer = [];
+    return { cards: cards, total: h.seen.size };
+}
+"""
+
+HARVESTER_WAIT_JS = """
+(known) => !window.__rankHarvester || window.__rankHarvester.seen.size > known
+"""
+
+HARVESTER_STOP_JS = """
+() => {
+    const h = window.__rankHarvester;
+    if (h) {
+        h.observer.disconnect();
+        delete window.__rankHarvester;
+    }
+}
+"""
+
+
 class RankScraper(BaseScraper):
     """
     Scrapes Best Sellers rankings from Amazon
@@ -24,6 +160,9 @@ class RankScraper(BaseScraper):
     - Rating
     """
 
+    # Whether a MutationObserver harvester is installed on the current page
+    _harvester_active = False
+
     async def scrape(self, category_url: str, max_rank: int = 100, use_scroll: bool = True, use_hybrid: bool = True) -> List[Dict[str, Any]]:
         """
         Scrape Best Sellers for a category
@@ -70,72 +209,20 @@ class RankScraper(BaseScraper):
 
         # Wait for initial products to load (longer timeout for slow pages)
         logger.info("Waiting for products to load (up to 30 seconds)...")
-        await self.wait_for_selector(".zg-grid-general-faceout", timeout=30000)
+        await self.wait_for_selector(PRODUCT_CARD_SELECTOR, timeout=30000)
 
         # Additional wait for dynamic content to fully render
         logger.info("Waiting for dynamic content to render...")
         await self.random_delay(3, 5)
 
-        rankings = []
-        previous_count = 0
-        no_change_count = 0
-        max_scrolls = 30  # Increased from 10 to 30 for 100 products
-
-        for scroll_attempt in range(max_scrolls):
-            # Extract currently visible products
-            current_products = await self._extract_products_from_page()
-
-            # Update rankings with new products (avoid duplicates)
-            for product in current_products:
-                if product and product.get("asin"):
-                    # Check if ASIN already exists
-                    if not any(p.get("asin") == product["asin"] for p in rankings):
-                        rankings.append(product)
-
-            logger.info(f"Scroll {scroll_attempt + 1}/{max_scrolls}: Total unique products = {len(rankings)}/{max_rank}")
-
-            # Check if we've collected enough
-            if len(rankings) >= max_rank:
-                logger.success(f"✅ Reached target of {max_rank} products!")
-                break
-
-            # Check if new products were loaded
-            if len(rankings) == previous_count:
-                no_change_count += 1
-                if no_change_count >= 5:  # Increased from 3 to 5
-                    logger.warning(f"No new products loaded after 5 scroll attempts")
-                    logger.info(f"Trying more aggressive scrolling...")
-                    # Try scrolling to bottom
-                    await self._scroll_to_bottom()
-                    await self.random_delay(4, 6)
-
-                    # One more attempt
-                    current_products = await self._extract_products_from_page()
-                    for product in current_products:
-                        if product and product.get("asin"):
-                            if not any(p.get("asin") == product["asin"] for p in rankings):
-                                rankings.append(product)
-
-                    if len(rankings) == previous_count:
-                        logger.warning(f"Still no new products. Stopping at {len(rankings)} products")
-                        break
-                    else:
-                        no_change_count = 0
-            else:
-                no_change_count = 0
-
-            previous_count = len(rankings)
-
-            # Multiple scroll strategies
-            if scroll_attempt % 3 == 0:
-                # Every 3rd scroll: scroll to bottom
-                await self._scroll_to_bottom()
-            else:
-                # Regular scroll
-                await self._scroll_page()
-
-            # Wait for products to load after scroll
-            await self.random_delay(2, 4)
+        rankings = await self._harvest_with_scroll(
+            max_products=max_rank,
+            max_scrolls=30,  # Increased from 10 to 30 for 100 products
+            bottom_every=3,
+            patience=5,
+            settle_timeout=4,
+            aggressive_retry=True,
+        )
 
         # Limit to max_rank
         rankings = rankings[:max_rank]
@@ -172,8 +259,9 @@ class RankScraper(BaseScraper):
         logger.info(f"Will navigate pages AND scroll within each page for maximum coverage")
 
         all_rankings = []
+        seen_asins = set()
         page = 1
-        max_page = (max_rank + 49) // 50  # Estimate pages needed
+        max_page = (max_rank + BEST_SELLERS_PAGE_SIZE - 1) // BEST_SELLERS_PAGE_SIZE  # Estimate pages needed
         max_retries_per_page = 3  # Maximum retries for each page
         base_retry_delay = 10  # Base delay in seconds for retries
 
@@ -222,7 +310,7 @@ class RankScraper(BaseScraper):
 
                 # Wait for products to load
                 logger.info("Waiting for products to load...")
-                found = await self.wait_for_selector(".zg-grid-general-faceout", timeout=30000)
+                found = await self.wait_for_selector(PRODUCT_CARD_SELECTOR, timeout=30000)
                 if not found:
                     # Try alternative selectors
                     logger.warning(f"Primary selector not found, trying alternatives...")
@@ -244,7 +332,9 @@ class RankScraper(BaseScraper):
                 await self.random_delay(3, 5)
 
                 # Scroll within this page to load all dynamic content
-                page_products = await self._scroll_within_page(max_products=60)
+                # Stop as soon as this page's share of max_rank is buffered
+                page_target = min(BEST_SELLERS_PAGE_SIZE, max_rank - len(all_rankings))
+                page_products = await self._scroll_within_page(max_products=page_target)
 
                 if not page_products:
                     logger.warning(f"No products found on page {page} (attempt {retry + 1}/{max_retries_per_page})")
@@ -265,12 +355,11 @@ class RankScraper(BaseScraper):
                     logger.warning(f"⚠️ Page {page} failed after {max_retries_per_page} retries. Continuing with {len(all_rankings)} products.")
                     break
 
-            # Add products from this page
+            # Add products from this page (skip ASINs seen on previous pages)
             for product in page_products:
-                if product and product.get("asin"):
-                    # Check if ASIN already exists
-                    if not any(p.get("asin") == product["asin"] for p in all_rankings):
-                        all_rankings.append(product)
+                if product and product.get("asin") and product["asin"] not in seen_asins:
+                    seen_asins.add(product["asin"])
+                    all_rankings.append(product)
 
             logger.success(f"✅ Page {page}: Collected {len(page_products)} products (Total: {len(all_rankings)})")
 
@@ -318,49 +407,154 @@ class RankScraper(BaseScraper):
         """
         logger.info(f"🔄 Scrolling within page to load dynamic content...")
 
-        rankings = []
-        previous_count = 0
+        rankings = await self._harvest_with_scroll(
+            max_products=max_products,
+            max_scrolls=15,  # Enough for one page
+            bottom_every=4,
+            patience=3,
+            settle_timeout=2.5,
+        )
+
+        logger.info(f"✓ Page scroll complete: {len(rankings)} products collected")
+        return rankings
+
+    async def _harvest_with_scroll(
+        self,
+        max_products: int,
+        max_scrolls: int,
+        bottom_every: int,
+        patience: int,
+        settle_timeout: float,
+        aggressive_retry: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Scroll the current page while a MutationObserver harvests product cards
+
+        Only newly attached cards are extracted (in the browser) into an
+        ASIN-keyed buffer, which is drained once per scroll. Stops as soon as
+        max_products unique ASINs are buffered.
+
+        Args:
+            max_products: Stop once this many unique ASINs are collected
+            max_scrolls: Maximum scroll attempts
+            bottom_every: Scroll to bottom on every N-th attempt (regular scroll otherwise)
+            patience: Stop after this many scrolls without new products
+            settle_timeout: Max seconds to wait for new cards after each scroll
+            aggressive_retry: Try one scroll-to-bottom before giving up
+
+        Returns:
+            list: Products in page order
+        """
+        harvested: Dict[str, Dict[str, Any]] = {}  # ASIN -> product (insertion ordered)
+        await self._install_harvester()
+
         no_change_count = 0
-        max_scrolls = 15  # Enough for one page
 
         for scroll_attempt in range(max_scrolls):
-            # Extract currently visible products
-            current_products = await self._extract_products_from_page()
-
-            # Update rankings with new products (avoid duplicates)
-            for product in current_products:
-                if product and product.get("asin"):
-                    if not any(p.get("asin") == product["asin"] for p in rankings):
-                        rankings.append(product)
+            new_count = self._merge_products(harvested, await self._drain_harvester())
 
-            logger.debug(f"  Scroll {scroll_attempt + 1}: {len(rankings)} products")
+            logger.debug(f"  Scroll {scroll_attempt + 1}/{max_scrolls}: {len(harvested)}/{max_products} unique products")
 
-            # Check if we've collected enough for this page
-            if len(rankings) >= max_products:
-                logger.info(f"  ✓ Page limit reached: {len(rankings)} products")
+            # Check if we've collected enough
+            if len(harvested) >= max_products:
+                logger.info(f"  ✓ Target reached: {len(harvested)} products")
                 break
 
             # Check if new products were loaded
-            if len(rankings) == previous_count:
+            if new_count == 0 and scroll_attempt > 0:
                 no_change_count += 1
-                if no_change_count >= 3:
-                    logger.info(f"  ✓ No new products after 3 scrolls, page complete")
-                    break
+                if no_change_count >= patience:
+                    if not aggressive_retry:
+                        logger.info(f"  ✓ No new products after {patience} scrolls, page complete")
+                        break
+
+                    logger.warning(f"No new products loaded after {patience} scroll attempts")
+                    logger.info(f"Trying more aggressive scrolling...")
+                    await self._scroll_to_bottom()
+                    await self._wait_for_new_cards(len(harvested), timeout=settle_timeout + 2)
+
+                    if self._merge_products(harvested, await self._drain_harvester()) == 0:
+                        logger.warning(f"Still no new products. Stopping at {len(harvested)} products")
+                        break
+                    no_change_count = 0
             else:
                 no_change_count = 0
 
-            previous_count = len(rankings)
-
             # Scroll strategies
-            if scroll_attempt % 4 == 0:
+            if scroll_attempt % bottom_every == 0:
                 await self._scroll_to_bottom()
             else:
                 await self._scroll_page()
 
-            await self.random_delay(1.5, 2.5)
+            # Returns as soon as the observer buffers new cards
+            await self._wait_for_new_cards(len(harvested), timeout=settle_timeout)
+
+        # Final drain picks up cards attached after the last scroll
+        if len(harvested) < max_products:
+            self._merge_products(harvested, await self._drain_harvester())
+
+        await self._uninstall_harvester()
+        return list(harvested.values())
+
+    @staticmethod
+    def _merge_products(harvested: Dict[str, Dict[str, Any]], products: List[Dict[str, Any]]) -> int:
+        """Add products not yet in the ASIN-keyed buffer; returns number added"""
+        added = 0
+        for product in products:
+            asin = product.get("asin") if product else None
+            if asin and asin not in harvested:
+                harvested[asin] = product
+                added += 1
+        return added
+
+    async def _install_harvester(self) -> bool:
+        """Inject the MutationObserver harvester into the current page"""
+        try:
+            await self.page.evaluate(HARVESTER_INSTALL_JS, PRODUCT_CARD_SELECTOR)
+            self._harvester_active = True
+        except Exception as e:
+            logger.debug(f"Harvester install failed, falling back to full-page extraction: {e}")
+            self._harvester_active = False
+        return self._harvester_active
 
-        logger.info(f"✓ Page scroll complete: {len(rankings)} products collected")
-        return rankings
+    async def _drain_harvester(self) -> List[Dict[str, Any]]:
+        """Return cards buffered since the last drain (full extraction if no harvester)"""
+        if self._harvester_active:
+            try:
+                drained = await self.page.evaluate(HARVESTER_DRAIN_JS)
+                if drained is not None:
+                    products = [self._parse_card(raw) for raw in drained.get("cards", [])]
+                    return [p for p in products if p and p.get("asin")]
+            except Exception as e:
+                logger.debug(f"Harvester drain failed: {e}")
+            # Page navigated or script lost - fall back for the rest of this harvest
+            self._harvester_active = False
+
+        return await self._extract_products_from_page()
+
+    async def _wait_for_new_cards(self, known_count: int, timeout: float):
+        """Wait until the harvester holds more than known_count ASINs (or timeout)"""
+        if not self._harvester_active:
+            await self.random_delay(timeout * 0.6, timeout)
+            return
+
+        try:
+            await self.page.wait_for_function(
+                HARVESTER_WAIT_JS,
+                arg=known_count,
+                timeout=timeout * 1000
+            )
+        except Exception:
+            pass  # Timeout - no new cards
+
+    async def _uninstall_harvester(self):
+        """Disconnect the observer and drop its buffer"""
+        if self._harvester_active:
+            try:
+                await self.page.evaluate(HARVESTER_STOP_JS)
+            except Exception:
+                pass
+        self._harvester_active = False
 
     async def _scrape_with_pagination(self, category_url: str, max_rank: int = 100) -> List[Dict[str, Any]]:
         """
@@ -401,7 +595,7 @@ class RankScraper(BaseScraper):
 
             # Wait for product grid (longer timeout for slow pages)
             logger.info("Waiting for products to load...")
-            found = await self.wait_for_selector(".zg-grid-general-faceout", timeout=30000)
+            found = await self.wait_for_selector(PRODUCT_CARD_SELECTOR, timeout=30000)
 
             if not found:
                 logger.warning(f"Product grid not found on page {page}")
@@ -469,91 +663,81 @@ class RankScraper(BaseScraper):
             logger.warning(f"Scroll to bottom failed: {e}")
 
     async def _extract_products_from_page(self) -> List[Dict[str, Any]]:
-        """Extract all products from current Best Sellers page"""
-        products = []
+        """
+        Extract all products from current Best Sellers page
 
-        # Get all product containers
-        product_elements = await self.page.query_selector_all(
-            ".zg-grid-general-faceout"
-        )
+        Runs a single page.evaluate() that reads every product card in the
+        browser and returns the raw fields as a JSON array, instead of
+        6-8 query_selector/text_content round trips per card.
+        """
+        try:
+            raw_cards = await self.page.evaluate(GRID_EXTRACTOR_JS, PRODUCT_CARD_SELECTOR)
+        except Exception as e:
+            logger.debug(f"Failed to extract products: {e}")
+            return []
 
-        for element in product_elements:
-            try:
-                product_data = await self._extract_product_data(element)
-                if product_data and product_data.get("asin"):
-                    products.append(product_data)
-            except Exception as e:
-                logger.debug(f"Failed to extract product: {e}")
-                continue
+        products = []
+        for raw in raw_cards or []:
+            product_data = self._parse_card(raw)
+            if product_data and product_data.get("asin"):
+                products.append(product_data)
 
         return products
 
-    async def _extract_product_data(self, element) -> Optional[Dict[str, Any]]:
-        """Extract data from a single product element"""
+    def _parse_card(self, raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Convert raw card fields returned by CARD_EXTRACTOR_JS into a ranking entry
+
+        Args:
+            raw: {rank_text, href, title, price_text, rating_text, review_text}
+
+        Returns:
+            dict: Product ranking data, or None if no ASIN could be found
+        """
         try:
-            # Rank - try multiple selectors
+            # Rank
             rank = None
-            # Try selector 1: .zg-bdg-text (old format)
-            rank_element = await element.query_selector(".zg-bdg-text")
-            if not rank_element:
-                # Try selector 2: span with rank badge
-                rank_element = await element.query_selector("span.zg-badge-text")
-            if not rank_element:
-                # Try selector 3: any element with rank text
-                rank_element = await element.query_selector("[aria-label*='#']")
-
-            rank_text = await rank_element.text_content() if rank_element else None
+            rank_text = raw.get("rank_text")
             if rank_text:
                 match = re.search(r"#?(\d+)", rank_text)
                 if match:
                     rank = int(match.group(1))
 
             # ASIN (from link)
-            link_element = await element.query_selector("a.a-link-normal")
             asin = None
-            product_url = None
-            if link_element:
-                href = await link_element.get_attribute("href")
-                if href:
-                    product_url = href
-                    # Extract ASIN from URL
-                    match = re.search(r"/dp/([A-Z0-9]{10})", href)
-                    if match:
-                        asin = match.group(1)
+            product_url = raw.get("href")
+            if product_url:
+                match = re.search(r"/dp/([A-Z0-9]{10})", product_url)
+                if match:
+                    asin = match.group(1)
 
             if not asin:
                 return None
 
             # Product name
-            title_element = await element.query_selector("div._cDEzb_p13n-sc-css-line-clamp-3_g3dy1")
-            if not title_element:
-                title_element = await element.query_selector("a.a-link-normal > div")
-            product_name = await title_element.text_content() if title_element else None
+            product_name = raw.get("title")
             if product_name:
                 product_name = product_name.strip()
 
             # Price
-            price_element = await element.query_selector(".a-price .a-offscreen")
-            price_text = await price_element.text_content() if price_element else None
             price = None
+            price_text = raw.get("price_text")
             if price_text:
                 match = re.search(r"\$?([\d,]+\.?\d*)", price_text)
                 if match:
                     price = float(match.group(1).replace(",", ""))
 
             # Rating
-            rating_element = await element.query_selector(".a-icon-alt")
-            rating_text = await rating_element.text_content() if rating_element else None
             rating = None
+            rating_text = raw.get("rating_text")
             if rating_text:
                 match = re.search(r"([\d.]+)\s*out of\s*5", rating_text)
                 if match:
                     rating = float(match.group(1))
 
             # Review count
-            review_element = await element.query_selector("span.a-size-small")
-            review_text = await review_element.text_content() if review_element else None
             review_count = None
+            review_text = raw.get("review_text")
             if review_text:
                 match = re.search(r"([\d,]+)", review_text)
                 if match:
@@ -0,0 +1,174 @@
+"""
+Network resource blocking for scraper contexts
+Aborts requests the scrapers never read (images, fonts, media, ads, analytics)
+and counts what was saved per page
+"""
+import re
+import yaml
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+from loguru import logger
+
+from config.settings import CONFIG_DIR
+
+
+@lru_cache(maxsize=1)
+def _load_blocking_config() -> Dict[str, Any]:
+    """network_blocking section of scheduler_config.yaml (parsed once per process)"""
+    try:
+        with open(CONFIG_DIR / "scheduler_config.yaml", "r", encoding="utf-8") as f:
+            scheduler_config = yaml.safe_load(f) or {}
+    except Exception as e:
+        logger.warning(f"Could not load network_blocking config, resource blocking disabled: {e}")
+        return {}
+
+    return scheduler_config.get("network_blocking") or {}
+
+
+def load_blocking_profile(scraper_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the blocking profile for a scraper from scheduler_config.yaml
+
+    Looks up network_blocking.profiles.<scraper_name>, falling back to
+    profiles.default. Returns None when blocking is disabled or not configured.
+
+    Args:
+        scraper_name: Scraper class name (e.g. "ProductScraper")
+
+    Returns:
+        dict: {block_resource_types, block_url_patterns, estimated_kb_per_type} or None
+    """
+    config = _load_blocking_config()
+    if not config.get("enabled", False):
+        return None
+
+    profiles = config.get("profiles", {})
+    profile = profiles.get(scraper_name, profiles.get("default"))
+    if not profile:
+        return None
+
+    return {
+        "block_resource_types": list(profile.get("block_resource_types", [])),
+        "block_url_patterns": list(profile.get("block_url_patterns", [])),
+        "estimated_kb_per_type": dict(config.get("estimated_kb_per_type", {})),
+    }
+
+
+class ResourceBlocker:
+    """
+    Route handler that aborts requests by resource type or URL pattern
+
+    One instance per BrowserContext, so counters are per worker/page.
+    Blocked requests are never downloaded, so bytes saved are estimated
+    from per-type averages (estimated_kb_per_type).
+
+    NOTE: Playwright disables the HTTP cache for routed contexts; blocking
+    images/fonts/ads still removes far more bytes than cache misses add.
+    """
+
+    def __init__(self, profile: Dict[str, Any]):
+        self.block_types = set(profile.get("block_resource_types", []))
+        patterns = profile.get("block_url_patterns", [])
+        self.url_regex = re.compile("|".join(re.escape(p) for p in patterns)) if patterns else None
+        self.kb_per_type = profile.get("estimated_kb_per_type", {})
+
+        # Current page (reset on each navigation)
+        self.current_url: Optional[str] = None
+        self.current_blocked: Counter = Counter()
+
+        # Totals across all pages
+        self.pages = 0
+        self.total_requests = 0
+        self.total_blocked: Counter = Counter()
+
+    async def attach(self, context):
+        """Install the route handler on a BrowserContext"""
+        await context.route("**/*", self._handle_route)
+
+    async def _handle_route(self, route):
+        """Abort blocked requests, let everything else through"""
+        request = route.request
+        self.total_requests += 1
+
+        if self._should_block(request.resource_type, request.url):
+            self.current_blocked[request.resource_type] += 1
+            self.total_blocked[request.resource_type] += 1
+            try:
+                await route.abort("blockedbyclient")
+            except Exception:
+                pass  # Page closed or request already handled
+            return
+
+        try:
+            await route.continue_()
+        except Exception:
+            pass
+
+    def _should_block(self, resource_type: str, url: str) -> bool:
+        """Check resource type first, then URL patterns (never the document itself)"""
+        if resource_type == "document":
+            return False
+        if resource_type in self.block_types:
+            return True
+        return bool(self.url_regex and self.url_regex.search(url))
+
+    def _estimate_bytes(self, blocked: Counter) -> int:
+        """Estimate bytes saved from blocked request counts"""
+        default_kb = self.kb_per_type.get("other", 5)
+        return int(sum(count * self.kb_per_type.get(rtype, default_kb) * 1024 for rtype, count in blocked.items()))
+
+    def start_page(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Begin counting for a new navigation
+
+        Returns:
+            dict: Stats for the previous page (None on first page)
+        """
+        previous = self.page_stats() if self.current_url else None
+        self.current_url = url
+        self.current_blocked = Counter()
+        self.pages += 1
+        return previous
+
+    def page_stats(self) -> Dict[str, Any]:
+        """Requests blocked and estimated bytes saved on the current page"""
+        return {
+            "url": self.current_url,
+            "requests_blocked": sum(self.current_blocked.values()),
+            "estimated_bytes_saved": self._estimate_bytes(self.current_blocked),
+            "blocked_by_type": dict(self.current_blocked),
+        }
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Totals across all pages"""
+        blocked = sum(self.total_blocked.values())
+        return {
+            "pages": self.pages,
+            "requests_seen": self.total_requests,
+            "requests_blocked": blocked,
+            "estimated_bytes_saved": self._estimate_bytes(self.total_blocked),
+            "blocked_by_type": dict(self.total_blocked),
+        }
+
+    @staticmethod
+    def combine(blockers: List["ResourceBlocker"]) -> Dict[str, Any]:
+        """Aggregate statistics across several blockers (e.g. pooled workers)"""
+        pages = sum(b.pages for b in blockers)
+        seen = sum(b.total_requests for b in blockers)
+        by_type: Counter = Counter()
+        estimated = 0
+        for b in blockers:
+            by_type.update(b.total_blocked)
+            estimated += b._estimate_bytes(b.total_blocked)
+
+        blocked = sum(by_type.values())
+        return {
+            "pages": pages,
+            "requests_seen": seen,
+            "requests_blocked": blocked,
+            "estimated_bytes_saved": estimated,
+            "blocked_per_page": round(blocked / max(1, pages), 1),
+            "estimated_kb_saved_per_page": round(estimated / 1024 / max(1, pages), 1),
+            "blocked_by_type": dict(by_type),
+        }
@@ -33,10 +33,53 @@ class ReviewScraper(BaseScraper):
     - Helpful votes
     """
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, pool_size: int = 1):
+        super().__init__(pool_size=pool_size)
         self.base_url = AMAZON_SETTINGS["base_url"]
 
+    @classmethod
+    def sharing_page(cls, scraper: BaseScraper) -> "ReviewScraper":
+        """
+        Review extraction bound to another scraper's already-loaded page
+
+        No browser is launched; the returned instance reads from (and never
+        closes) the given scraper's context/page.
+
+        Args:
+            scraper: Initialized scraper currently on a /dp/ASIN page
+
+        Returns:
+            ReviewScraper: Instance sharing the scraper's page
+        """
+        reviewer = cls()
+        reviewer.playwright = scraper.playwright
+        reviewer.browser = scraper.browser
+        reviewer.context = scraper.context
+        reviewer.page = scraper.page
+        reviewer.resource_blocker = scraper.resource_blocker
+        reviewer.worker_id = scraper.worker_id
+        reviewer._owns_browser = False
+        return reviewer
+
+    async def scrape_current_page(self, asin: str, max_reviews: int = None) -> Dict[str, Any]:
+        """
+        Collect review summary and visible reviews from the page already loaded
+
+        Args:
+            asin: Product ASIN
+            max_reviews: Maximum number of reviews to collect
+
+        Returns:
+            dict: {"summary": ..., "reviews": [...], "count": int}
+        """
+        summary = await self.scrape_review_summary(asin, navigate=False)
+        reviews = await self.scrape_from_product_page(asin, max_reviews=max_reviews, navigate=False)
+        return {
+            "summary": summary,
+            "reviews": reviews,
+            "count": len(reviews),
+        }
+
     async def scrape(
         self,
         asin: str,
@@ -351,7 +394,14 @@ class ReviewScraper(BaseScraper):
                 elif "One person found this helpful" in helpful_text:
                     helpful_votes = 1
 
+            # Amazon review ID (e.g. "R2XXXXXXXXXXXX", sometimes "customer_review-R2...")
+            # - stable key for incremental review analysis
+            element_id = await element.get_attribute("id") or ""
+            id_match = re.search(r"\bR[0-9A-Z]{8,}\b", element_id.replace("-", " "))
+            review_id = id_match.group() if id_match else None
+
             return {
+                "review_id": review_id,
                 "rating": rating,
                 "title": title,
                 "text": text,
@@ -0,0 +1,150 @@
+"""
+Test script for the HTTP fetch tier
+Runs HttpProductFetcher against a local stand-in server (no Amazon traffic)
+and checks parsing plus every browser-fallback path
+"""
+import asyncio
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scrapers.http_fetcher import HttpProductFetcher
+from utils.rate_limiter import AsyncRateLimiter
+
+
+PRODUCT_HTML = """
+<html><head><title>Amazon.com: Test Lip Balm</title></head>
+<body>
+  <div id="wayfinding-breadcrumbs_feature_div"><ul>
+    <li><a>Beauty &amp; Personal Care</a></li>
+    <li><a>Lip Care</a></li>
+  </ul></div>
+  <a id="bylineInfo">Visit the LANEIGE Store</a>
+  <span id="productTitle">  LANEIGE Lip Sleeping Mask  </span>
+  <span class="a-price" data-a-color="price"><span class="a-offscreen">$24.00</span></span>
+  <span class="a-price a-text-price"><span class="a-offscreen">$30.00</span></span>
+  <span id="acrPopover">4.7 out of 5 stars</span>
+  <span id="acrCustomerReviewText">12,345 ratings</span>
+  <img id="landingImage" src="https://m.media-amazon.com/images/I/abc._AC_SX300_.jpg">
+  <div id="feature-bullets"><ul>
+    <li><span class="a-list-item">Overnight lip mask with berry fruit complex</span></li>
+    <li><span class="a-list-item">Short</span></li>
+  </ul></div>
+  <div id="availability"><span>In Stock</span></div>
+</body></html>
+"""
+
+CAPTCHA_HTML = """
+<html><head><title>Robot Check</title></head>
+<body><form action="/errors/validateCaptcha"><input name="captchacharacters"></form></body></html>
+"""
+
+NO_TITLE_HTML = "<html><body><div id='dp'>Loading...</div></body></html>"
+
+PAGES = {
+    "/dp/GOOD000001": (200, PRODUCT_HTML),
+    "/dp/GZIP000001": (200, PRODUCT_HTML),
+    "/dp/CAPTCHA001": (200, CAPTCHA_HTML),
+    "/dp/NOTITLE001": (200, NO_TITLE_HTML),
+}
+
+
+# Accept-Encoding of every request the stand-in received
+ACCEPT_ENCODINGS = []
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves canned product pages (GZIP* compressed, like Amazon), 404 for anything else"""
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        status, body = PAGES.get(self.path, (404, "<html><body>Not Found</body></html>"))
+        payload = body.encode("utf-8")
+        accept_encoding = self.headers.get("Accept-Encoding", "")
+        ACCEPT_ENCODINGS.append(accept_encoding)
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if self.path.startswith("/dp/GZIP") and "gzip" in accept_encoding:
+            payload = gzip.compress(payload)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    """Start the stand-in server on a free port"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def fetch_all(asins):
+    """Fetch ASINs through a fresh fetcher, return (results, stats)"""
+    server, base_url = start_server()
+    limiter = AsyncRateLimiter(delay_min=0.01, delay_max=0.01)
+
+    async def run():
+        async with HttpProductFetcher(base_url=base_url, http2=False, limiter=limiter) as fetcher:
+            results = [await fetcher.fetch_product(asin) for asin in asins]
+            return results, fetcher.get_statistics()
+
+    try:
+        return asyncio.run(run())
+    finally:
+        server.shutdown()
+
+
+def test_parses_product_page():
+    (product,), stats = fetch_all(["GOOD000001"])
+
+    assert product is not None
+    assert product["asin"] == "GOOD000001"
+    assert product["product_name"] == "LANEIGE Lip Sleeping Mask"
+    assert product["brand"] == "LANEIGE"
+    assert product["price"] == {"current_price": 24.0, "currency": "USD", "list_price": 30.0}
+    assert product["rating"] == 4.7
+    assert product["review_count"] == 12345
+    assert product["breadcrumb"] == "Beauty & Personal Care > Lip Care"
+    assert product["category"] == "Lip Care"
+    assert product["images"] == ["https://m.media-amazon.com/images/I/abc.jpg"]
+    assert product["features"] == ["Overnight lip mask with berry fruit complex"]
+    assert product["availability"] == "In Stock"
+    assert stats["success"] == 1
+
+
+def test_decodes_compressed_page():
+    ACCEPT_ENCODINGS.clear()
+    (product,), stats = fetch_all(["GZIP000001"])
+
+    assert product is not None
+    assert product["product_name"] == "LANEIGE Lip Sleeping Mask"
+    assert stats["success"] == 1
+
+    # Never ask for an encoding httpx could not decode (brotli is optional)
+    advertised = {encoding.strip() for encoding in ACCEPT_ENCODINGS[0].split(",")}
+    assert "gzip" in advertised
+    if "br" in advertised:
+        import importlib.util
+        assert importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi")
+
+
+def test_falls_back_on_captcha_missing_title_and_status():
+    results, stats = fetch_all(["CAPTCHA001", "NOTITLE001", "MISSING001"])
+
+    assert results == [None, None, None]
+    assert stats["fallback_captcha"] == 1
+    assert stats["fallback_missing_title"] == 1
+    assert stats["fallback_status"] == 1
+    assert stats["success"] == 0
+
+
+if __name__ == "__main__":
+    test_parses_product_page()
+    test_decodes_compressed_page()
+    test_falls_back_on_captcha_missing_title_and_status()
+    print("HTTP fetch tier tests passed")
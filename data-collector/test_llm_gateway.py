@@ -0,0 +1,165 @@
+"""
+Test script for the LLM gateway
+Sends calls through LLMGateway to a local stand-in server that answers
+with scripted status codes (no Anthropic traffic) and checks that the
+half-open probe recovers from rate limiting instead of locking the
+gateway, and that get_llm_gateway keeps one gateway per key and base URL
+"""
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import anthropic
+from loguru import logger
+
+import utils.llm_cache as llm_cache
+import utils.llm_gateway as llm_gateway
+from utils.llm_gateway import CIRCUIT_CLOSED, LLMGateway, get_llm_gateway
+
+
+MODEL = "claude-haiku-4-5-20251001"
+COOLDOWN_SECONDS = 0.05
+
+MESSAGE = {
+    "id": "msg_standin",
+    "type": "message",
+    "role": "assistant",
+    "model": MODEL,
+    "content": [{"type": "text", "text": "ok"}],
+    "stop_reason": "end_turn",
+    "stop_sequence": None,
+    "usage": {"input_tokens": 10, "output_tokens": 2},
+}
+
+ERRORS = {
+    429: {"type": "error", "error": {"type": "rate_limit_error", "message": "Rate limited"}},
+    500: {"type": "error", "error": {"type": "api_error", "message": "Internal error"}},
+}
+
+
+def make_handler(statuses: list, calls: list):
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            status = statuses.pop(0) if statuses else 200
+            calls.append(status)
+
+            payload = json.dumps(MESSAGE if status == 200 else ERRORS[status]).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            if status == 429:
+                self.send_header("retry-after", "0")
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StandInHandler
+
+
+def run_calls(statuses: list, count: int):
+    """
+    Make `count` sync calls against the scripted server, pausing past the cooldown after each
+
+    Returns:
+        (outcomes, gateway, calls): "ok" or the exception class name per call,
+        the gateway, and the status codes the server answered with
+    """
+    calls = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(list(statuses), calls))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        llm_cache._llm_cache_instance = llm_cache.LLMCallCache(db_path=Path(tmp) / "llm_cache.db")
+        try:
+            gateway = LLMGateway(
+                api_key="sk-ant-test",
+                base_url=f"http://127.0.0.1:{server.server_address[1]}",
+                max_attempts=3,
+                backoff_base_seconds=0.01,
+                failure_threshold=1,
+                cooldown_seconds=COOLDOWN_SECONDS,
+            )
+
+            outcomes = []
+            for _ in range(count):
+                try:
+                    gateway.create(
+                        "test", use_cache=False, model=MODEL, max_tokens=16,
+                        messages=[{"role": "user", "content": "ping"}]
+                    )
+                    outcomes.append("ok")
+                except Exception as e:
+                    outcomes.append(type(e).__name__)
+                time.sleep(COOLDOWN_SECONDS * 2)
+
+            return outcomes, gateway, calls
+        finally:
+            llm_cache._llm_cache_instance.close()
+            llm_cache._llm_cache_instance = None
+            server.shutdown()
+
+
+def test_probe_retries_through_rate_limit():
+    # 500 opens the circuit; the probe is rate limited once, then succeeds
+    outcomes, gateway, calls = run_calls([500, 429, 200], count=3)
+
+    print(f"Outcomes: {outcomes}, server calls: {calls}")
+    assert outcomes == ["InternalServerError", "ok", "ok"]
+    assert calls == [500, 429, 200, 200]
+    assert gateway.get_statistics()["circuit"] == CIRCUIT_CLOSED
+    assert not gateway._probe_in_flight
+
+
+def test_rate_limited_probe_does_not_lock_gateway():
+    # The probe gives up after max_attempts rate limits; the next call probes again
+    outcomes, gateway, calls = run_calls([500, 429, 429, 429, 200], count=3)
+
+    print(f"Outcomes: {outcomes}, server calls: {calls}")
+    assert outcomes == ["InternalServerError", anthropic.RateLimitError.__name__, "ok"]
+    assert calls == [500, 429, 429, 429, 200]
+    assert gateway.get_statistics()["circuit"] == CIRCUIT_CLOSED
+    assert not gateway._probe_in_flight
+
+
+
+def test_gateway_per_key_and_base_url():
+    warnings = []
+    sink = logger.add(lambda m: warnings.append(m.record["message"]), level="WARNING")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        llm_cache._llm_cache_instance = llm_cache.LLMCallCache(db_path=Path(tmp) / "llm_cache.db")
+        llm_gateway._llm_gateway_instances.clear()
+        try:
+            shared = get_llm_gateway(api_key="sk-ant-a", requests_per_minute=100)
+            assert get_llm_gateway(api_key="sk-ant-a") is shared
+            assert get_llm_gateway(api_key="sk-ant-a", requests_per_minute=100) is shared
+            assert not warnings
+
+            # Another key or endpoint has its own limits
+            assert get_llm_gateway(api_key="sk-ant-b") is not shared
+            assert get_llm_gateway(api_key="sk-ant-a", base_url="http://127.0.0.1:1") is not shared
+
+            # Different settings for an existing gateway are reported, not applied
+            assert get_llm_gateway(api_key="sk-ant-a", requests_per_minute=10) is shared
+            assert shared.limiter.requests_per_minute == 100
+            print(f"Warnings: {warnings}")
+            assert len(warnings) == 1 and "requests_per_minute" in warnings[0]
+        finally:
+            logger.remove(sink)
+            llm_gateway._llm_gateway_instances.clear()
+            llm_cache._llm_cache_instance.close()
+            llm_cache._llm_cache_instance = None
+
+
+if __name__ == "__main__":
+    test_probe_retries_through_rate_limit()
+    test_rate_limited_probe_does_not_lock_gateway()
+    test_gateway_per_key_and_base_url()
@@ -0,0 +1,218 @@
+"""
+Test script for Message Batches attribute extraction
+Runs AttributeExtractor.extract_with_message_batches against a local
+stand-in server that mimics the batch endpoints (no Anthropic traffic)
+and checks result handling, caching, batch pricing and the interactive
+fallback for errored requests
+"""
+import asyncio
+import json
+import re
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import utils.attribute_cache as attribute_cache
+import utils.budget_tracker as budget_tracker
+import utils.llm_cache as llm_cache
+import utils.llm_gateway as llm_gateway
+from analyzers.attribute_extractor import AttributeExtractor
+
+
+MODEL = "claude-haiku-4-5-20251001"
+USAGE = {"input_tokens": 1000, "output_tokens": 200}
+
+ATTRIBUTES = {
+    "ingredients": {"key_actives": ["Hyaluronic Acid"], "formula_type": "Cream", "texture": "Rich"},
+    "benefits": {"primary_benefit": "Hydration", "target_concerns": [], "timeframe": "Unknown", "clinical_claims": []},
+    "certifications": {"clean_beauty": [], "ethical": [], "sustainability": [], "origin": "K-Beauty"},
+    "demographics": {"skin_type": ["Dry"], "age_group": "Unknown", "gender_target": "Unisex"},
+    "usage": {"time_of_day": "Night", "routine_step": "Moisturizer", "application_area": "Face"},
+}
+
+
+def message(text: str) -> dict:
+    return {
+        "id": "msg_standin",
+        "type": "message",
+        "role": "assistant",
+        "model": MODEL,
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": USAGE,
+    }
+
+
+class BatchStandIn:
+    """In-memory state of the stand-in Message Batches API"""
+
+    def __init__(self):
+        self.batches = {}
+        self.polls = {}
+        self.interactive_calls = 0
+        self.base_url = None
+
+    def batch_json(self, batch_id: str) -> dict:
+        requests = self.batches[batch_id]
+        # Report "in_progress" on the first status check, then "ended"
+        ended = self.polls[batch_id] > 1
+        errored = sum(1 for r in requests if r["custom_id"].startswith("ERR"))
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else len(requests),
+                "succeeded": len(requests) - errored if ended else 0,
+                "errored": errored if ended else 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": "2026-01-01T00:00:00Z",
+            "expires_at": "2026-01-02T00:00:00Z",
+            "ended_at": "2026-01-01T00:05:00Z" if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{self.base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def results_jsonl(self, batch_id: str) -> str:
+        lines = []
+        for request in self.batches[batch_id]:
+            if request["custom_id"].startswith("ERR"):
+                result = {"type": "errored", "error": {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}}}
+            else:
+                result = {"type": "succeeded", "message": message(json.dumps(ATTRIBUTES))}
+            lines.append(json.dumps({"custom_id": request["custom_id"], "result": result}))
+        return "\n".join(lines) + "\n"
+
+
+def make_handler(state: BatchStandIn):
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def _send(self, status: int, body: str, content_type: str = "application/json"):
+            payload = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+            if self.path == "/v1/messages/batches":
+                batch_id = f"msgbatch_{len(state.batches) + 1:04d}"
+                state.batches[batch_id] = body["requests"]
+                state.polls[batch_id] = 0
+                self._send(200, json.dumps(state.batch_json(batch_id)))
+            elif self.path == "/v1/messages":
+                state.interactive_calls += 1
+                self._send(200, json.dumps(message(json.dumps(ATTRIBUTES))))
+            else:
+                self._send(404, json.dumps({"type": "error", "error": {"type": "not_found_error", "message": self.path}}))
+
+        def do_GET(self):
+            match = re.fullmatch(r"/v1/messages/batches/(\w+)(/results)?", self.path)
+            if not match or match.group(1) not in state.batches:
+                self._send(404, json.dumps({"type": "error", "error": {"type": "not_found_error", "message": self.path}}))
+                return
+
+            batch_id = match.group(1)
+            if match.group(2):
+                self._send(200, state.results_jsonl(batch_id), "application/binary")
+            else:
+                state.polls[batch_id] += 1
+                self._send(200, json.dumps(state.batch_json(batch_id)))
+
+        def log_message(self, format, *args):
+            pass
+
+    return StandInHandler
+
+
+def run_batches(products):
+    """Extract products through a stand-in server with a temporary cache and budget file (plus the extractor's rule stats)"""
+    state = BatchStandIn()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the real cache and usage file untouched
+        attribute_cache._attribute_cache_instance = attribute_cache.AttributeCacheManager(Path(tmp) / "attributes")
+        tracker = budget_tracker.APIBudgetTracker(monthly_limit=150.0)
+        tracker.usage_file = Path(tmp) / "api_usage.json"
+        tracker.usage_data = {}
+        budget_tracker._budget_tracker_instance = tracker
+        # Fresh gateway so its clients point at the stand-in server
+        llm_cache._llm_cache_instance = llm_cache.LLMCallCache(db_path=Path(tmp) / "llm_cache.db")
+        llm_gateway._llm_gateway_instances.clear()
+
+        try:
+            extractor = AttributeExtractor(api_key="sk-ant-test", model=MODEL, base_url=state.base_url)
+            results = asyncio.run(extractor.extract_with_message_batches(products, poll_interval_seconds=0.01))
+            cached = extractor.cache_manager.get_many_matching({p["asin"]: extractor.content_key(p) for p in products})
+            return results, cached, tracker, state, dict(extractor.rule_stats)
+        finally:
+            attribute_cache._attribute_cache_instance.close()
+            attribute_cache._attribute_cache_instance = None
+            budget_tracker._budget_tracker_instance = None
+            llm_cache._llm_cache_instance.close()
+            llm_cache._llm_cache_instance = None
+            llm_gateway._llm_gateway_instances.clear()
+            server.shutdown()
+
+
+PRODUCTS = [
+    {"asin": "B000000001", "name": "Water Sleeping Mask", "category": "Face Masks", "price": "$25.00", "description": "Overnight mask"},
+    {"asin": "B000000002", "name": "Cream Skin Toner", "category": "Toners", "price": "$9.50", "description": "Milky toner"},
+    {"asin": "ERR0000003", "name": "Lip Glowy Balm", "category": "Lip Care", "price": "$18.00", "description": "Tinted balm"},
+]
+
+
+def test_batch_results_are_cached_and_priced():
+    results, cached, tracker, state, _ = run_batches(PRODUCTS)
+
+    assert list(results) == [p["asin"] for p in PRODUCTS]
+    assert results["B000000001"]["benefits"]["primary_benefit"] == "Hydration"
+    assert results["B000000001"]["price_tier"] == "mid_range"
+    assert results["B000000002"]["price_tier"] == "budget"
+    assert not any(attrs.get("extraction_failed") for attrs in results.values())
+
+    # Polled until ended, one batch for the run
+    assert len(state.batches) == 1
+    assert state.polls["msgbatch_0001"] >= 2
+
+    # Every product is now in the attribute cache
+    assert set(cached) == {p["asin"] for p in PRODUCTS}
+
+    # Two batch results at 50% pricing, one interactive retry at full price
+    full_cost = (USAGE["input_tokens"] * 1.0 + USAGE["output_tokens"] * 5.0) / 1_000_000
+    stats = tracker.get_monthly_stats()
+    month = tracker.usage_data[tracker.get_current_month_key()]
+    batch_costs = [r["cost"] for r in month["requests"] if r["batch"]]
+    interactive_costs = [r["cost"] for r in month["requests"] if not r["batch"]]
+
+    assert stats["total_requests"] == 3
+    assert batch_costs == [full_cost * 0.5, full_cost * 0.5]
+    assert interactive_costs == [full_cost]
+
+
+def test_errored_requests_fall_back_to_interactive():
+    results, _, _, state, rule_stats = run_batches(PRODUCTS)
+
+    assert state.interactive_calls == 1
+    # The interactive retry skips cache and rule routing (each product escalated once)
+    assert rule_stats["resolved"] + rule_stats["escalated"] == len(PRODUCTS)
+    assert results["ERR0000003"]["benefits"]["primary_benefit"] == "Hydration"
+    assert results["ERR0000003"]["price_tier"] == "affordable"
+
+
+if __name__ == "__main__":
+    test_batch_results_are_cached_and_priced()
+    test_errored_requests_fall_back_to_interactive()
+    print("Message Batches tests passed")
@@ -0,0 +1,60 @@
+"""
+Test script for variant grouping
+Checks that size/pack variants of a product share a group while
+different products of the same line (Cream vs Lotion, Water Gel vs
+Gel Cream) stay apart
+"""
+from utils.variant_grouper import VariantGrouper
+
+
+FORM_TERMS = ["Gel", "Cream", "Lotion", "Gel-Cream Hybrid", "Water/Essence", "Lightweight", "Rich/Heavy"]
+
+
+def product(asin: str, name: str) -> dict:
+    return {"asin": asin, "name": name, "description": ""}
+
+
+def grouped_asins(products: list) -> list:
+    grouper = VariantGrouper(similarity_threshold=0.8, product_form_terms=FORM_TERMS)
+    return sorted(sorted(p["asin"] for p in group) for group in grouper.group(products))
+
+
+def test_size_and_pack_variants_are_grouped():
+    products = [
+        product("B01", "CeraVe Moisturizing Cream | Body and Face Moisturizer for Dry Skin | 19 Ounce"),
+        product("B02", "CeraVe Moisturizing Cream | Body and Face Moisturizer for Dry Skin | 16 Ounce"),
+        product("B03", "CeraVe Hydrating Facial Cleanser 16 oz"),
+        product("B04", "CeraVe Hydrating Facial Cleanser 16 oz, Pack of 2"),
+        product("B05", "L'Oreal Paris True Match Super-Blendable Liquid Foundation Makeup, Warm W3 Nude Beige, 1 fl oz"),
+        product("B06", "L'Oreal Paris True Match Super-Blendable Liquid Foundation Makeup, Warm W5 Nude Beige, 1 fl oz"),
+    ]
+
+    assert grouped_asins(products) == [["B01", "B02"], ["B03", "B04"], ["B05", "B06"]]
+
+
+def test_different_forms_are_not_grouped():
+    products = [
+        product("B11", "CeraVe Moisturizing Cream | Body and Face Moisturizer for Dry Skin | 19 Ounce"),
+        product("B12", "CeraVe Moisturizing Lotion | Body and Face Moisturizer for Dry Skin | 19 Ounce"),
+        product("B13", "Neutrogena Hydro Boost Hyaluronic Acid Hydrating Water Gel Daily Face Moisturizer 1.7 fl oz"),
+        product("B14", "Neutrogena Hydro Boost Hyaluronic Acid Hydrating Gel Cream Daily Face Moisturizer 1.7 fl oz"),
+    ]
+
+    assert grouped_asins(products) == [["B11"], ["B12"], ["B13"], ["B14"]]
+
+
+def test_differing_non_variant_tokens_are_not_grouped():
+    # Same line and 0.8+ similar, but "Sensitive" names a different formulation
+    grouper = VariantGrouper(similarity_threshold=0.8)
+    products = [
+        product("B21", "La Roche-Posay Toleriane Double Repair Face Moisturizer UV SPF 30 Daily Hydration 3.4 fl oz"),
+        product("B22", "La Roche-Posay Toleriane Double Repair Face Moisturizer UV SPF 30 Daily Hydration Sensitive 3.4 fl oz"),
+    ]
+
+    assert len(grouper.group(products)) == 2
+
+
+if __name__ == "__main__":
+    test_size_and_pack_variants_are_grouped()
+    test_different_forms_are_not_grouped()
+    test_differing_non_variant_tokens_are_not_grouped()
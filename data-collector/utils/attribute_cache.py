@@ -3,48 +3,132 @@ Attribute Cache Manager
 Caches extracted product attributes to avoid redundant Claude API calls
 """
 import json
-import hashlib
+import atexit
+import sqlite3
+import time
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+from datetime import datetime
+from typing import Dict, Optional, List, Iterable
 from loguru import logger
 
 from config.settings import DATA_DIR
 
 
+# SQLite limits bound parameters per statement; chunk IN (...) lookups
+_SQL_CHUNK = 500
+
+
 class AttributeCacheManager:
     """
     Manage cached product attributes with TTL expiration
 
     Caches attributes for 7 days by default to balance freshness and cost savings.
     Uses ASIN as primary key.
+
+    Storage is a single SQLite database (attribute_cache.db, WAL mode) with
+    an index on the numeric expires_at, instead of one JSON file per ASIN.
+    The legacy per-ASIN tree (<cache_dir>/<shard>/<ASIN>.json) is imported
+    once on first open; see import_legacy_files().
+
+    Entries written with a content_key (hash of the extraction inputs, model
+    and schema version) are content-addressed: get_many_matching() returns
+    them for as long as the key still matches, regardless of age. Each hit
+    pushes expires_at out by retention_days, so only entries that stop
+    being requested (delisted products, old keys) eventually expire.
     """
 
-    def __init__(self, cache_dir: Optional[Path] = None, ttl_days: int = 7):
+    def __init__(self, cache_dir: Optional[Path] = None, ttl_days: int = 7, retention_days: int = 90):
         """
         Initialize attribute cache manager
 
         Args:
             cache_dir: Directory for cache files (default: DATA_DIR/attribute_cache)
-            ttl_days: Cache time-to-live in days (default: 7)
+            ttl_days: Cache time-to-live in days for ASIN-keyed entries (default: 7)
+            retention_days: Days an unused content-addressed entry is kept (default: 90)
         """
         self.cache_dir = cache_dir or (DATA_DIR / "attribute_cache")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_file = self.cache_dir / "attribute_cache.db"
 
         self.ttl_days = ttl_days
         self.ttl_seconds = ttl_days * 24 * 60 * 60
+        self.retention_seconds = retention_days * 24 * 60 * 60
 
         # In-memory cache for current session
         self._memory_cache: Dict[str, Dict] = {}
 
-        logger.info(f"Attribute cache initialized: {self.cache_dir} (TTL: {ttl_days} days)")
+        self.conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS attributes ("
+            " asin TEXT PRIMARY KEY,"
+            " attributes TEXT NOT NULL,"
+            " metadata TEXT NOT NULL,"
+            " cached_at TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " content_key TEXT)"
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(attributes)")}
+        if "content_key" not in columns:
+            self.conn.execute("ALTER TABLE attributes ADD COLUMN content_key TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_attributes_expires_at ON attributes (expires_at)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+        atexit.register(self.close)
+
+        if not self._get_meta("legacy_imported"):
+            self.import_legacy_files()
+
+        logger.info(f"Attribute cache initialized: {self.db_file} (TTL: {ttl_days} days)")
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _entry(self, asin: str, attributes: Dict, metadata: Optional[Dict], content_key: Optional[str]) -> Dict:
+        """Build a cache entry (ttl_days, or retention_days if content-addressed)"""
+        now = datetime.now()
+        lifetime = self.retention_seconds if content_key else self.ttl_seconds
+        return {
+            "asin": asin,
+            "attributes": attributes,
+            "cached_at": now.isoformat(),
+            "expires_at": now.timestamp() + lifetime,
+            "metadata": metadata or {},
+            "content_key": content_key,
+        }
+
+    @staticmethod
+    def _row_to_entry(row) -> Dict:
+        asin, attributes, metadata, cached_at, expires_at, content_key = row
+        return {
+            "asin": asin,
+            "attributes": json.loads(attributes),
+            "cached_at": cached_at,
+            "expires_at": expires_at,
+            "metadata": json.loads(metadata),
+            "content_key": content_key,
+        }
 
-    def _get_cache_file_path(self, asin: str) -> Path:
-        """Get cache file path for an ASIN"""
-        # Use first 2 characters of ASIN for subdirectory (simple sharding)
-        subdir = self.cache_dir / asin[:2].lower()
-        subdir.mkdir(exist_ok=True)
-        return subdir / f"{asin}.json"
+    def _write(self, entries: Iterable[Dict]):
+        """Insert/replace entries in one transaction"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO attributes (asin, attributes, metadata, cached_at, expires_at, content_key) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        e["asin"],
+                        json.dumps(e["attributes"], ensure_ascii=False),
+                        json.dumps(e["metadata"], ensure_ascii=False),
+                        e["cached_at"],
+                        e["expires_at"],
+                        e["content_key"],
+                    )
+                    for e in entries
+                ],
+            )
 
     def get(self, asin: str) -> Optional[Dict]:
         """
@@ -56,40 +140,107 @@ class AttributeCacheManager:
         Returns:
             Dict with attributes or None if not cached/expired
         """
+        return self.get_many([asin]).get(asin)
+
+    def get_many(self, asins: List[str]) -> Dict[str, Dict]:
+        """
+        Get cached attributes for several ASINs with one query per 500 keys
+
+        Args:
+            asins: Product ASINs
+
+        Returns:
+            Dict mapping ASIN to attributes (missing/expired ASINs omitted)
+        """
+        now = time.time()
+        return {
+            asin: entry["attributes"]
+            for asin, entry in self._lookup(asins).items()
+            if self._is_valid(entry, now)
+        }
+
+    def get_many_matching(self, content_keys: Dict[str, str]) -> Dict[str, Dict]:
+        """
+        Get content-addressed attributes whose stored key still matches
+
+        Age is ignored: an entry is returned as long as the product's
+        extraction inputs (and model/schema) are unchanged. Hits have their
+        retention window extended in one UPDATE. Entries written before
+        content keys existed are still served until their TTL runs out.
+
+        Args:
+            content_keys: Dict mapping ASIN to its current content key
+
+        Returns:
+            Dict mapping ASIN to attributes (changed/missing ASINs omitted)
+        """
+        now = time.time()
+        results = {}
+        touched = []
+        for asin, entry in self._lookup(list(content_keys)).items():
+            stored_key = entry.get("content_key")
+            if stored_key is None:
+                if self._is_valid(entry, now):
+                    results[asin] = entry["attributes"]
+            elif stored_key == content_keys[asin]:
+                results[asin] = entry["attributes"]
+                touched.append(asin)
+
+        if touched:
+            self._touch(touched)
+        return results
+
+    def _lookup(self, asins: List[str]) -> Dict[str, Dict]:
+        """Fetch entries (memory first, then one query per 500 keys), without validity checks"""
+        entries = {}
+        missing = []
+
         # Check memory cache first
-        if asin in self._memory_cache:
-            cached = self._memory_cache[asin]
-            if self._is_valid(cached):
+        for asin in dict.fromkeys(asins):
+            cached = self._memory_cache.get(asin)
+            if cached:
                 logger.debug(f"Memory cache hit: {asin}")
-                return cached["attributes"]
+                entries[asin] = cached
+            else:
+                missing.append(asin)
 
         # Check disk cache
-        cache_file = self._get_cache_file_path(asin)
-
-        if not cache_file.exists():
-            return None
-
-        try:
-            with open(cache_file, "r", encoding="utf-8") as f:
-                cached = json.load(f)
+        for i in range(0, len(missing), _SQL_CHUNK):
+            chunk = missing[i:i + _SQL_CHUNK]
+            try:
+                rows = self.conn.execute(
+                    "SELECT asin, attributes, metadata, cached_at, expires_at, content_key FROM attributes "
+                    f"WHERE asin IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+            except Exception as e:
+                logger.warning(f"Failed to read attribute cache: {e}")
+                continue
 
-            # Validate cache entry
-            if self._is_valid(cached):
+            for row in rows:
+                entry = self._row_to_entry(row)
                 # Load into memory cache
-                self._memory_cache[asin] = cached
-                logger.debug(f"Disk cache hit: {asin}")
-                return cached["attributes"]
-            else:
-                # Expired - delete file
-                logger.debug(f"Cache expired: {asin}")
-                cache_file.unlink(missing_ok=True)
-                return None
+                self._memory_cache[entry["asin"]] = entry
+                entries[entry["asin"]] = entry
+                logger.debug(f"Disk cache hit: {entry['asin']}")
+
+        return entries
 
+    def _touch(self, asins: List[str]):
+        """Extend the retention window of content-addressed entries that were just used"""
+        expires_at = time.time() + self.retention_seconds
+        for asin in asins:
+            self._memory_cache[asin]["expires_at"] = expires_at
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE attributes SET expires_at = ? WHERE asin = ?",
+                    [(expires_at, asin) for asin in asins],
+                )
         except Exception as e:
-            logger.warning(f"Failed to read cache for {asin}: {e}")
-            return None
+            logger.warning(f"Failed to extend attribute cache retention: {e}")
 
-    def set(self, asin: str, attributes: Dict, metadata: Optional[Dict] = None):
+    def set(self, asin: str, attributes: Dict, metadata: Optional[Dict] = None, content_key: Optional[str] = None):
         """
         Cache attributes for an ASIN
 
@@ -97,40 +248,52 @@ class AttributeCacheManager:
             asin: Product ASIN
             attributes: Extracted attributes dict
             metadata: Optional metadata (model, extraction_time, etc.)
+            content_key: Optional hash of the extraction inputs (content-addressed entry)
         """
-        cache_entry = {
-            "asin": asin,
-            "attributes": attributes,
-            "cached_at": datetime.now().isoformat(),
-            "expires_at": (datetime.now() + timedelta(days=self.ttl_days)).isoformat(),
-            "metadata": metadata or {}
-        }
+        self.set_many(
+            {asin: attributes},
+            {asin: metadata} if metadata else None,
+            {asin: content_key} if content_key else None,
+        )
+
+    def set_many(
+        self,
+        attributes_by_asin: Dict[str, Dict],
+        metadata_by_asin: Optional[Dict[str, Dict]] = None,
+        content_keys: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Cache attributes for several ASINs in one transaction
+
+        Args:
+            attributes_by_asin: Dict mapping ASIN to attributes
+            metadata_by_asin: Optional dict mapping ASIN to metadata
+            content_keys: Optional dict mapping ASIN to content key
+        """
+        metadata_by_asin = metadata_by_asin or {}
+        content_keys = content_keys or {}
+        entries = [
+            self._entry(asin, attributes, metadata_by_asin.get(asin), content_keys.get(asin))
+            for asin, attributes in attributes_by_asin.items()
+        ]
 
         # Save to memory cache
-        self._memory_cache[asin] = cache_entry
+        for entry in entries:
+            self._memory_cache[entry["asin"]] = entry
 
         # Save to disk cache
-        cache_file = self._get_cache_file_path(asin)
-
         try:
-            with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(cache_entry, f, indent=2, ensure_ascii=False)
-
-            logger.debug(f"Cached attributes for {asin}")
-
+            self._write(entries)
+            logger.debug(f"Cached attributes for {len(entries)} products")
         except Exception as e:
-            logger.error(f"Failed to cache attributes for {asin}: {e}")
+            logger.error(f"Failed to cache attributes for {list(attributes_by_asin)[:5]}: {e}")
 
-    def _is_valid(self, cache_entry: Dict) -> bool:
+    def _is_valid(self, cache_entry: Dict, now: Optional[float] = None) -> bool:
         """Check if cache entry is still valid"""
-        if "expires_at" not in cache_entry:
-            return False
-
-        try:
-            expires_at = datetime.fromisoformat(cache_entry["expires_at"])
-            return datetime.now() < expires_at
-        except Exception:
+        expires_at = cache_entry.get("expires_at")
+        if expires_at is None:
             return False
+        return (now or time.time()) < expires_at
 
     def invalidate(self, asin: str):
         """
@@ -140,92 +303,175 @@ class AttributeCacheManager:
             asin: Product ASIN
         """
         # Remove from memory cache
-        if asin in self._memory_cache:
-            del self._memory_cache[asin]
+        self._memory_cache.pop(asin, None)
 
         # Remove from disk cache
-        cache_file = self._get_cache_file_path(asin)
-        cache_file.unlink(missing_ok=True)
+        with self.conn:
+            self.conn.execute("DELETE FROM attributes WHERE asin = ?", (asin,))
 
         logger.info(f"Invalidated cache for {asin}")
 
     def clear_expired(self) -> int:
         """
-        Clear all expired cache entries
+        Clear all expired cache entries (index range delete)
 
         Returns:
             int: Number of entries cleared
         """
-        cleared = 0
+        now = time.time()
 
         # Clear from memory cache
-        expired_asins = [
-            asin for asin, entry in self._memory_cache.items()
-            if not self._is_valid(entry)
-        ]
-
-        for asin in expired_asins:
+        for asin in [asin for asin, entry in self._memory_cache.items() if not self._is_valid(entry, now)]:
             del self._memory_cache[asin]
-            cleared += 1
 
         # Clear from disk cache
-        for cache_file in self.cache_dir.rglob("*.json"):
-            try:
-                with open(cache_file, "r", encoding="utf-8") as f:
-                    entry = json.load(f)
-
-                if not self._is_valid(entry):
-                    cache_file.unlink()
-                    cleared += 1
-
-            except Exception as e:
-                logger.warning(f"Error checking {cache_file}: {e}")
+        with self.conn:
+            cleared = self.conn.execute("DELETE FROM attributes WHERE expires_at <= ?", (now,)).rowcount
 
         if cleared > 0:
             logger.info(f"Cleared {cleared} expired cache entries")
 
         return cleared
 
+    def compact(self) -> Dict:
+        """
+        Drop expired entries and reclaim free space in the database file
+
+        Returns:
+            dict: {"cleared": int, "size_before_mb": float, "size_after_mb": float}
+        """
+        size_before = self._size_bytes()
+        cleared = self.clear_expired()
+
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.conn.execute("VACUUM")
+
+        size_after = self._size_bytes()
+        logger.info(
+            f"Compacted attribute cache: {size_before / (1024 * 1024):.2f} MB -> "
+            f"{size_after / (1024 * 1024):.2f} MB ({cleared} expired entries removed)"
+        )
+        return {
+            "cleared": cleared,
+            "size_before_mb": size_before / (1024 * 1024),
+            "size_after_mb": size_after / (1024 * 1024),
+        }
+
     def clear_all(self):
         """Clear entire cache (use with caution!)"""
         # Clear memory cache
         self._memory_cache.clear()
 
         # Clear disk cache
-        for cache_file in self.cache_dir.rglob("*.json"):
-            cache_file.unlink()
+        with self.conn:
+            self.conn.execute("DELETE FROM attributes")
 
         logger.warning("Cleared entire attribute cache")
 
-    def get_stats(self) -> Dict:
-        """Get cache statistics"""
-        total_entries = 0
-        valid_entries = 0
-        expired_entries = 0
-        total_size_bytes = 0
+    def import_legacy_files(self, remove_files: bool = False) -> int:
+        """
+        Import the legacy one-file-per-ASIN tree into the database
+
+        Entries already in the database are kept (they are newer). Expired
+        legacy entries are skipped.
 
-        for cache_file in self.cache_dir.rglob("*.json"):
-            total_entries += 1
-            total_size_bytes += cache_file.stat().st_size
+        Args:
+            remove_files: Delete legacy files whose entry is in the database
+                (unreadable and expired files are kept)
 
+        Returns:
+            int: Number of entries imported
+        """
+        now = time.time()
+        entries = []
+        legacy_files = list(self.cache_dir.glob("*/*.json"))
+
+        for cache_file in legacy_files:
             try:
                 with open(cache_file, "r", encoding="utf-8") as f:
-                    entry = json.load(f)
-
-                if self._is_valid(entry):
-                    valid_entries += 1
-                else:
-                    expired_entries += 1
+                    legacy = json.load(f)
+
+                expires_at = datetime.fromisoformat(legacy["expires_at"]).timestamp()
+                if expires_at <= now:
+                    continue
+
+                entries.append((cache_file, (
+                    legacy["asin"],
+                    json.dumps(legacy["attributes"], ensure_ascii=False),
+                    json.dumps(legacy.get("metadata") or {}, ensure_ascii=False),
+                    legacy.get("cached_at") or datetime.now().isoformat(),
+                    expires_at,
+                )))
+            except Exception as e:
+                logger.warning(f"Skipping unreadable legacy cache file {cache_file}: {e}")
+
+        with self.conn:
+            imported = self.conn.executemany(
+                "INSERT OR IGNORE INTO attributes (asin, attributes, metadata, cached_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [row for _, row in entries],
+            ).rowcount
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_imported', ?)",
+                              (datetime.now().isoformat(),))
+
+        if legacy_files:
+            logger.info(f"Imported {imported} of {len(legacy_files)} legacy attribute cache files")
+
+        if remove_files and entries:
+            # Only files whose entry is now in the database (imported now or earlier)
+            stored = set(self._lookup_stored_asins([row[0] for _, row in entries]))
+            removed = 0
+            for cache_file, row in entries:
+                if row[0] in stored:
+                    cache_file.unlink(missing_ok=True)
+                    removed += 1
+            logger.info(f"Removed {removed} imported legacy cache files")
+
+        return imported
+
+    def _lookup_stored_asins(self, asins: List[str]) -> List[str]:
+        """ASINs that have a database row, one query per 500 keys"""
+        stored = []
+        for i in range(0, len(asins), _SQL_CHUNK):
+            chunk = asins[i:i + _SQL_CHUNK]
+            stored.extend(
+                asin for (asin,) in self.conn.execute(
+                    f"SELECT asin FROM attributes WHERE asin IN ({','.join('?' * len(chunk))})", chunk
+                )
+            )
+        return stored
+
+    def _size_bytes(self) -> int:
+        """Database size including the WAL file"""
+        size = 0
+        for path in (self.db_file, self.db_file.with_name(self.db_file.name + "-wal")):
+            if path.exists():
+                size += path.stat().st_size
+        return size
+
+    def close(self):
+        """Close the database"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
 
-            except Exception:
-                expired_entries += 1
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        total_entries = self.conn.execute("SELECT COUNT(*) FROM attributes").fetchone()[0]
+        content_addressed = self.conn.execute(
+            "SELECT COUNT(*) FROM attributes WHERE content_key IS NOT NULL"
+        ).fetchone()[0]
+        expired_entries = self.conn.execute(
+            "SELECT COUNT(*) FROM attributes WHERE expires_at <= ?", (time.time(),)
+        ).fetchone()[0]
 
         return {
             "total_entries": total_entries,
-            "valid_entries": valid_entries,
+            "valid_entries": total_entries - expired_entries,
             "expired_entries": expired_entries,
+            "content_addressed_entries": content_addressed,
             "memory_cache_size": len(self._memory_cache),
-            "total_size_mb": total_size_bytes / (1024 * 1024),
+            "total_size_mb": self._size_bytes() / (1024 * 1024),
             "cache_ttl_days": self.ttl_days
         }
 
@@ -239,6 +485,7 @@ class AttributeCacheManager:
         logger.info(f"Total Entries: {stats['total_entries']:,}")
         logger.info(f"Valid Entries: {stats['valid_entries']:,}")
         logger.info(f"Expired Entries: {stats['expired_entries']:,}")
+        logger.info(f"Content-Addressed Entries: {stats['content_addressed_entries']:,}")
         logger.info(f"Memory Cache Size: {stats['memory_cache_size']:,}")
         logger.info(f"Total Disk Size: {stats['total_size_mb']:.2f} MB")
         logger.info(f"Cache TTL: {stats['cache_ttl_days']} days")
@@ -249,11 +496,38 @@ class AttributeCacheManager:
 _attribute_cache_instance = None
 
 
-def get_attribute_cache(ttl_days: int = 7) -> AttributeCacheManager:
+def get_attribute_cache(ttl_days: int = 7, retention_days: int = 90) -> AttributeCacheManager:
     """Get or create attribute cache singleton instance"""
     global _attribute_cache_instance
 
     if _attribute_cache_instance is None:
-        _attribute_cache_instance = AttributeCacheManager(ttl_days=ttl_days)
+        _attribute_cache_instance = AttributeCacheManager(ttl_days=ttl_days, retention_days=retention_days)
 
     return _attribute_cache_instance
+
+
+def main():
+    """
+    Maintenance entry point: import legacy files, compact, show stats
+
+    Usage:
+        python -m utils.attribute_cache --import-legacy --compact
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Attribute cache maintenance")
+    parser.add_argument("--import-legacy", action="store_true", help="Re-import the per-ASIN JSON tree")
+    parser.add_argument("--remove-legacy", action="store_true", help="Delete legacy JSON files after import")
+    parser.add_argument("--compact", action="store_true", help="Drop expired entries and VACUUM")
+    args = parser.parse_args()
+
+    cache = get_attribute_cache()
+    if args.import_legacy:
+        cache.import_legacy_files(remove_files=args.remove_legacy)
+    if args.compact:
+        cache.compact()
+    cache.print_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ Tracks API usage and costs to stay within monthly budget
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 from loguru import logger
 
 from config.settings import DATA_DIR
@@ -18,8 +18,19 @@ class APIBudgetTracker:
     Pricing (Claude 3.5 Sonnet as of 2025):
     - Input: $3 per 1M tokens
     - Output: $15 per 1M tokens
+
+    Message Batches API requests are billed at BATCH_DISCOUNT of these rates.
+    Prompt caching: cache writes cost CACHE_WRITE_MULTIPLIER and cache reads
+    CACHE_READ_MULTIPLIER of the input price.
     """
 
+    # Batch requests cost 50% of standard input/output pricing
+    BATCH_DISCOUNT = 0.5
+
+    # Prompt caching (5-minute ephemeral cache) relative to the input price
+    CACHE_WRITE_MULTIPLIER = 1.25
+    CACHE_READ_MULTIPLIER = 0.1
+
     # Pricing per million tokens
     PRICING = {
         "claude-haiku-4-5-20251001": {
@@ -80,16 +91,24 @@ class APIBudgetTracker:
         input_tokens: int,
         output_tokens: int,
         model: str = "claude-haiku-4-5-20251001",
-        task_type: str = "attribute_extraction"
+        task_type: str = "attribute_extraction",
+        batch: bool = False,
+        cache_creation_input_tokens: int = 0,
+        cache_read_input_tokens: int = 0,
+        latency_ms: Optional[float] = None
     ) -> Dict:
         """
         Record API usage and calculate cost
 
         Args:
-            input_tokens: Number of input tokens used
+            input_tokens: Number of uncached input tokens used
             output_tokens: Number of output tokens used
             model: Model identifier
             task_type: Type of task (for tracking purposes)
+            batch: Whether the request went through the Message Batches API (batch pricing)
+            cache_creation_input_tokens: Input tokens written to the prompt cache
+            cache_read_input_tokens: Input tokens read from the prompt cache
+            latency_ms: Request latency, to compare cache-read vs cold calls
 
         Returns:
             Dict with cost breakdown and current totals
@@ -104,7 +123,19 @@ class APIBudgetTracker:
         # Calculate costs
         input_cost = (input_tokens / 1_000_000) * pricing["input"]
         output_cost = (output_tokens / 1_000_000) * pricing["output"]
-        total_cost = input_cost + output_cost
+        cache_write_cost = (cache_creation_input_tokens / 1_000_000) * pricing["input"] * self.CACHE_WRITE_MULTIPLIER
+        cache_read_cost = (cache_read_input_tokens / 1_000_000) * pricing["input"] * self.CACHE_READ_MULTIPLIER
+        total_cost = input_cost + output_cost + cache_write_cost + cache_read_cost
+
+        # Saving vs. sending the cached prefix as plain input (negative on a cache write)
+        uncached_cost = (
+            (cache_creation_input_tokens + cache_read_input_tokens) / 1_000_000
+        ) * pricing["input"]
+        cache_savings = uncached_cost - cache_write_cost - cache_read_cost
+
+        if batch:
+            total_cost *= self.BATCH_DISCOUNT
+            cache_savings *= self.BATCH_DISCOUNT
 
         # Get current month
         month_key = self.get_current_month_key()
@@ -128,6 +159,9 @@ class APIBudgetTracker:
         month_data["total_requests"] += 1
         month_data["total_input_tokens"] += input_tokens
         month_data["total_output_tokens"] += output_tokens
+        month_data["total_cache_write_tokens"] = month_data.get("total_cache_write_tokens", 0) + cache_creation_input_tokens
+        month_data["total_cache_read_tokens"] = month_data.get("total_cache_read_tokens", 0) + cache_read_input_tokens
+        month_data["cache_savings"] = month_data.get("cache_savings", 0.0) + cache_savings
 
         # Track by task type
         if task_type not in month_data["by_task_type"]:
@@ -143,6 +177,15 @@ class APIBudgetTracker:
         task_stats["requests"] += 1
         task_stats["input_tokens"] += input_tokens
         task_stats["output_tokens"] += output_tokens
+        task_stats["cache_write_tokens"] = task_stats.get("cache_write_tokens", 0) + cache_creation_input_tokens
+        task_stats["cache_read_tokens"] = task_stats.get("cache_read_tokens", 0) + cache_read_input_tokens
+        task_stats["cache_savings"] = task_stats.get("cache_savings", 0.0) + cache_savings
+
+        # Latency of calls that read the prompt cache vs. calls that did not
+        if latency_ms is not None:
+            bucket = "cached" if cache_read_input_tokens else "cold"
+            task_stats[f"{bucket}_calls"] = task_stats.get(f"{bucket}_calls", 0) + 1
+            task_stats[f"{bucket}_latency_ms"] = task_stats.get(f"{bucket}_latency_ms", 0.0) + latency_ms
 
         # Track by model
         if model not in month_data["by_model"]:
@@ -162,7 +205,10 @@ class APIBudgetTracker:
             "task_type": task_type,
             "input_tokens": input_tokens,
             "output_tokens": output_tokens,
-            "cost": total_cost
+            "cache_write_tokens": cache_creation_input_tokens,
+            "cache_read_tokens": cache_read_input_tokens,
+            "cost": total_cost,
+            "batch": batch
         })
 
         # Save to file
@@ -174,6 +220,7 @@ class APIBudgetTracker:
         # Return summary
         return {
             "request_cost": total_cost,
+            "cache_savings": cache_savings,
             "month_total": month_data["total_cost"],
             "budget_remaining": self.monthly_limit - month_data["total_cost"],
             "budget_used_percent": (month_data["total_cost"] / self.monthly_limit) * 100
@@ -258,6 +305,9 @@ class APIBudgetTracker:
             "total_requests": month_data["total_requests"],
             "total_input_tokens": month_data["total_input_tokens"],
             "total_output_tokens": month_data["total_output_tokens"],
+            "total_cache_write_tokens": month_data.get("total_cache_write_tokens", 0),
+            "total_cache_read_tokens": month_data.get("total_cache_read_tokens", 0),
+            "cache_savings": month_data.get("cache_savings", 0.0),
             "budget_limit": self.monthly_limit,
             "budget_remaining": self.monthly_limit - month_data["total_cost"],
             "budget_used_percent": (month_data["total_cost"] / self.monthly_limit) * 100,
@@ -265,6 +315,30 @@ class APIBudgetTracker:
             "by_model": month_data.get("by_model", {})
         }
 
+    def get_task_averages(self, task_type: str, month: Optional[str] = None) -> Dict[str, Optional[float]]:
+        """
+        Average cost and latency of one request of a task type
+
+        Args:
+            task_type: Task type (e.g. "attribute_extraction")
+            month: Month key (YYYY-MM) or None for current month
+
+        Returns:
+            Dict with cost and latency_ms (None if no requests / no latency recorded)
+        """
+        month_data = self.usage_data.get(month or self.get_current_month_key(), {})
+        task_stats = month_data.get("by_task_type", {}).get(task_type)
+        if not task_stats or not task_stats["requests"]:
+            return {"cost": None, "latency_ms": None}
+
+        timed_calls = task_stats.get("cached_calls", 0) + task_stats.get("cold_calls", 0)
+        timed_latency = task_stats.get("cached_latency_ms", 0.0) + task_stats.get("cold_latency_ms", 0.0)
+
+        return {
+            "cost": task_stats["cost"] / task_stats["requests"],
+            "latency_ms": timed_latency / timed_calls if timed_calls else None,
+        }
+
     def print_monthly_report(self, month: Optional[str] = None):
         """Print detailed monthly usage report"""
         stats = self.get_monthly_stats(month)
@@ -279,6 +353,12 @@ class APIBudgetTracker:
         logger.info(f"Total Requests: {stats['total_requests']:,}")
         logger.info(f"Total Input Tokens: {stats['total_input_tokens']:,}")
         logger.info(f"Total Output Tokens: {stats['total_output_tokens']:,}")
+        if stats.get("total_cache_write_tokens") or stats.get("total_cache_read_tokens"):
+            logger.info(
+                f"Prompt Cache: {stats['total_cache_read_tokens']:,} read / "
+                f"{stats['total_cache_write_tokens']:,} written tokens, "
+                f"saved ${stats['cache_savings']:.2f}"
+            )
 
         if "by_task_type" in stats and stats["by_task_type"]:
             logger.info("\nBy Task Type:")
@@ -287,6 +367,9 @@ class APIBudgetTracker:
                     f"  - {task}: ${task_stats['cost']:.2f} "
                     f"({task_stats['requests']} requests)"
                 )
+                cache_line = self._format_cache_savings(task_stats)
+                if cache_line:
+                    logger.info(f"      {cache_line}")
 
         if "by_model" in stats and stats["by_model"]:
             logger.info("\nBy Model:")
@@ -298,6 +381,30 @@ class APIBudgetTracker:
 
         logger.info("=" * 60)
 
+    @staticmethod
+    def _format_cache_savings(task_stats: Dict[str, Any]) -> Optional[str]:
+        """Prompt cache cost and latency savings for one task type (None if unused)"""
+        if not task_stats.get("cache_read_tokens") and not task_stats.get("cache_write_tokens"):
+            return None
+
+        line = (
+            f"prompt cache: {task_stats.get('cache_read_tokens', 0):,} read / "
+            f"{task_stats.get('cache_write_tokens', 0):,} written tokens, "
+            f"saved ${task_stats.get('cache_savings', 0.0):.2f}"
+        )
+
+        cached_calls = task_stats.get("cached_calls", 0)
+        cold_calls = task_stats.get("cold_calls", 0)
+        if cached_calls and cold_calls:
+            cached_avg = task_stats["cached_latency_ms"] / cached_calls
+            cold_avg = task_stats["cold_latency_ms"] / cold_calls
+            line += (
+                f", latency {cached_avg:.0f}ms cached vs {cold_avg:.0f}ms cold "
+                f"(~{(cold_avg - cached_avg) * cached_calls / 1000:.0f}s saved)"
+            )
+
+        return line
+
     def reset_month(self, month: Optional[str] = None):
         """
         Reset usage data for a specific month (use with caution!)
@@ -327,3 +434,16 @@ def get_budget_tracker(monthly_limit: float = 150.0) -> APIBudgetTracker:
         _budget_tracker_instance = APIBudgetTracker(monthly_limit)
 
     return _budget_tracker_instance
+
+
+def cache_usage(usage: Any) -> Dict[str, int]:
+    """
+    Prompt-cache token counts from a Claude response's usage, as record_usage() kwargs
+
+    Usage:
+        tracker.record_usage(usage.input_tokens, usage.output_tokens, **cache_usage(usage))
+    """
+    return {
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+    }
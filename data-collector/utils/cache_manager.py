@@ -2,29 +2,41 @@
 Cache Manager for Product Data
 Caches scraped product data to avoid redundant API calls
 """
+import os
 import json
+import atexit
+import bisect
+import sqlite3
+import time
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 from loguru import logger
 
 
-class CacheManager:
-    """Manages caching of scraped product data"""
+def _expires_at(cached_at: str, ttl_seconds: float) -> float:
+    """Numeric expiry (epoch seconds) for a legacy entry that only has an ISO cached_at"""
+    return datetime.fromisoformat(cached_at).timestamp() + ttl_seconds
 
-    def __init__(self, cache_dir: Path, cache_ttl_hours: int = 24):
-        """
-        Initialize cache manager
 
-        Args:
-            cache_dir: Directory to store cache files
-            cache_ttl_hours: Cache time-to-live in hours (default: 24h)
-        """
-        self.cache_dir = cache_dir
-        self.cache_dir.mkdir(exist_ok=True, parents=True)
+class JsonCacheBackend:
+    """
+    Legacy backend: the whole cache in one products_cache.json
+
+    Every set() rewrites the full file (O(n) per write), so this is only
+    kept for small caches and for comparison in benchmark_cache.py.
+
+    An in-memory list of (expires_at, key) sorted by expiry is kept next to
+    the data, so sweeps and expired counts never touch unexpired entries.
+    """
+
+    name = "json"
+
+    def __init__(self, cache_dir: Path, ttl_seconds: float):
         self.cache_file = cache_dir / "products_cache.json"
-        self.cache_ttl = timedelta(hours=cache_ttl_hours)
+        self.ttl_seconds = ttl_seconds
         self.cache_data = self._load_cache()
+        self._build_expiry_index()
 
     def _load_cache(self) -> Dict:
         """Load cache from file"""
@@ -40,15 +52,274 @@ class CacheManager:
             logger.warning(f"Failed to load cache: {e}")
             return {}
 
+    def _build_expiry_index(self):
+        """Sorted (expires_at, key) index; entries written before expires_at existed are backfilled once"""
+        backfilled = 0
+        for entry in self.cache_data.values():
+            if "expires_at" not in entry:
+                entry["expires_at"] = _expires_at(entry["cached_at"], self.ttl_seconds)
+                backfilled += 1
+
+        self._expiry_index: List[Tuple[float, str]] = sorted(
+            (entry["expires_at"], key) for key, entry in self.cache_data.items()
+        )
+
+        if backfilled:
+            self._save_cache()
+            logger.debug(f"Backfilled expires_at for {backfilled} cache entries")
+
     def _save_cache(self):
-        """Save cache to file"""
+        """Save cache to file (temp file + rename so a crash never leaves a half-written cache)"""
+        tmp_file = self.cache_file.with_suffix(".json.tmp")
         try:
-            with open(self.cache_file, "w", encoding="utf-8") as f:
+            with open(tmp_file, "w", encoding="utf-8") as f:
                 json.dump(self.cache_data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_file, self.cache_file)
             logger.debug(f"Saved cache with {len(self.cache_data)} entries")
         except Exception as e:
             logger.error(f"Failed to save cache: {e}")
 
+    def _unindex(self, key: str):
+        """Drop a key's current position from the expiry index"""
+        entry = self.cache_data.get(key)
+        if entry is None:
+            return
+        pos = bisect.bisect_left(self._expiry_index, (entry["expires_at"], key))
+        if pos < len(self._expiry_index) and self._expiry_index[pos] == (entry["expires_at"], key):
+            del self._expiry_index[pos]
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.cache_data.get(key)
+
+    def set(self, key: str, entry: Dict):
+        self._unindex(key)
+        self.cache_data[key] = entry
+        bisect.insort(self._expiry_index, (entry["expires_at"], key))
+        self._save_cache()
+
+    def delete_expired(self, now: float) -> int:
+        """Remove entries with expires_at <= now (only the expired prefix is visited)"""
+        cut = bisect.bisect_right(self._expiry_index, (now, chr(0x10FFFF)))
+        if not cut:
+            return 0
+        for _, key in self._expiry_index[:cut]:
+            self.cache_data.pop(key, None)
+        del self._expiry_index[:cut]
+        self._save_cache()
+        return cut
+
+    def count(self) -> int:
+        return len(self.cache_data)
+
+    def count_expired(self, now: float) -> int:
+        return bisect.bisect_right(self._expiry_index, (now, chr(0x10FFFF)))
+
+    def clear(self):
+        self.cache_data = {}
+        self._expiry_index = []
+        self._save_cache()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class SqliteCacheBackend:
+    """
+    SQLite (WAL mode) backend: one row per key
+
+    Writes are O(1) and grouped into transactions of commit_every rows
+    (or commit_interval_seconds, whichever comes first). A crash loses at
+    most the uncommitted batch, never the rest of the cache.
+
+    expires_at is an indexed REAL column, so sweeps and expired counts are
+    index range scans over expired rows only.
+    """
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl_seconds: float,
+        commit_every: int = 50,
+        commit_interval_seconds: float = 5.0,
+    ):
+        self.db_file = cache_dir / "products_cache.db"
+        self.ttl_seconds = ttl_seconds
+        self.commit_every = max(1, commit_every)
+        self.commit_interval_seconds = commit_interval_seconds
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+        self.conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " cached_at TEXT NOT NULL,"
+            " expires_at REAL)"
+        )
+        self._backfill_expiry()
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache (expires_at)")
+        self.conn.commit()
+
+        self._migrate_json(cache_dir / "products_cache.json")
+
+        # Commit whatever is still pending when the process exits normally
+        atexit.register(self.close)
+
+    def _backfill_expiry(self):
+        """Add/fill expires_at for databases created before the expiry column existed"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(cache)")}
+        if "expires_at" not in columns:
+            self.conn.execute("ALTER TABLE cache ADD COLUMN expires_at REAL")
+
+        rows = self.conn.execute("SELECT key, cached_at FROM cache WHERE expires_at IS NULL").fetchall()
+        if rows:
+            self.conn.executemany(
+                "UPDATE cache SET expires_at = ? WHERE key = ?",
+                [(_expires_at(cached_at, self.ttl_seconds), key) for key, cached_at in rows],
+            )
+            logger.debug(f"Backfilled expires_at for {len(rows)} cache entries")
+
+    def _migrate_json(self, json_file: Path):
+        """One-time import of the legacy products_cache.json"""
+        if not json_file.exists():
+            return
+
+        try:
+            with open(json_file, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read legacy cache for migration ({json_file}): {e}")
+            return
+
+        rows = [
+            (
+                key,
+                json.dumps(entry["data"], ensure_ascii=False),
+                entry["cached_at"],
+                entry.get("expires_at") or _expires_at(entry["cached_at"], self.ttl_seconds),
+            )
+            for key, entry in legacy.items()
+            if isinstance(entry, dict) and "data" in entry and "cached_at" in entry
+        ]
+        with self.conn:
+            # Entries already in the database are newer than the JSON file
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO cache (key, data, cached_at, expires_at) VALUES (?, ?, ?, ?)", rows
+            )
+
+        migrated_file = json_file.with_suffix(".json.migrated")
+        os.replace(json_file, migrated_file)
+        logger.info(f"Migrated {len(rows)} cache entries from {json_file.name} to SQLite (original kept as {migrated_file.name})")
+
+    def _maybe_commit(self):
+        """Commit once the batch is full or old enough"""
+        self._pending += 1
+        if (
+            self._pending >= self.commit_every
+            or time.monotonic() - self._last_commit >= self.commit_interval_seconds
+        ):
+            self.flush()
+
+    def get(self, key: str) -> Optional[Dict]:
+        row = self.conn.execute("SELECT data, cached_at, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        return {"data": json.loads(row[0]), "cached_at": row[1], "expires_at": row[2]}
+
+    def set(self, key: str, entry: Dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cache (key, data, cached_at, expires_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(entry["data"], ensure_ascii=False), entry["cached_at"], entry["expires_at"]),
+        )
+        self._maybe_commit()
+
+    def delete_expired(self, now: float) -> int:
+        """Remove entries with expires_at <= now (index range delete)"""
+        deleted = self.conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,)).rowcount
+        self.flush()
+        return deleted
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def count_expired(self, now: float) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM cache WHERE expires_at <= ?", (now,)).fetchone()[0]
+
+    def clear(self):
+        self.conn.execute("DELETE FROM cache")
+        self.flush()
+
+    def flush(self):
+        """Commit pending writes"""
+        if self.conn is None:
+            return
+        self.conn.commit()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def close(self):
+        """Commit pending writes and close the database"""
+        if self.conn is None:
+            return
+        self.flush()
+        self.conn.close()
+        self.conn = None
+
+
+CACHE_BACKENDS = {
+    JsonCacheBackend.name: JsonCacheBackend,
+    SqliteCacheBackend.name: SqliteCacheBackend,
+}
+
+
+class CacheManager:
+    """
+    Manages caching of scraped product data
+
+    Each entry stores a numeric expires_at (epoch seconds, cached time + TTL
+    at write time) next to the ISO cached_at, so expiry checks never parse
+    timestamps.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        cache_ttl_hours: int = 24,
+        backend: str = "sqlite",
+        commit_every: int = 50,
+    ):
+        """
+        Initialize cache manager
+
+        Args:
+            cache_dir: Directory to store cache files
+            cache_ttl_hours: Cache time-to-live in hours (default: 24h)
+            backend: Storage backend ("sqlite" or "json")
+            commit_every: Writes per transaction (sqlite backend)
+        """
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(exist_ok=True, parents=True)
+        self.cache_ttl = timedelta(hours=cache_ttl_hours)
+        ttl_seconds = self.cache_ttl.total_seconds()
+
+        if backend not in CACHE_BACKENDS:
+            raise ValueError(f"Unknown cache backend: {backend} (available: {list(CACHE_BACKENDS)})")
+
+        if backend == SqliteCacheBackend.name:
+            self.backend = SqliteCacheBackend(cache_dir, ttl_seconds, commit_every=commit_every)
+        else:
+            self.backend = JsonCacheBackend(cache_dir, ttl_seconds)
+
+        logger.debug(f"Cache backend: {self.backend.name} ({self.backend.count()} entries)")
+
     def get(self, asin: str) -> Optional[Dict]:
         """
         Get cached product data if available and not expired
@@ -59,18 +330,18 @@ class CacheManager:
         Returns:
             Cached product data or None if not available/expired
         """
-        if asin not in self.cache_data:
+        cached_entry = self.backend.get(asin)
+        if cached_entry is None:
             return None
 
-        cached_entry = self.cache_data[asin]
-        cached_at = datetime.fromisoformat(cached_entry["cached_at"])
-
         # Check if cache is still valid
-        if datetime.now() - cached_at > self.cache_ttl:
+        now = time.time()
+        if now >= cached_entry["expires_at"]:
             logger.debug(f"Cache expired for {asin}")
             return None
 
-        logger.debug(f"Cache hit for {asin} (cached {(datetime.now() - cached_at).seconds // 3600}h ago)")
+        age_hours = int((now - (cached_entry["expires_at"] - self.cache_ttl.total_seconds())) // 3600)
+        logger.debug(f"Cache hit for {asin} (cached {age_hours}h ago)")
         return cached_entry["data"]
 
     def set(self, asin: str, data: Dict):
@@ -81,52 +352,42 @@ class CacheManager:
             asin: Product ASIN
             data: Product data to cache
         """
-        self.cache_data[asin] = {
+        now = datetime.now()
+        self.backend.set(asin, {
             "data": data,
-            "cached_at": datetime.now().isoformat()
-        }
-        self._save_cache()
+            "cached_at": now.isoformat(),
+            "expires_at": now.timestamp() + self.cache_ttl.total_seconds(),
+        })
         logger.debug(f"Cached data for {asin}")
 
     def clear_expired(self):
-        """Remove expired entries from cache"""
-        now = datetime.now()
-        expired_asins = []
-
-        for asin, entry in self.cache_data.items():
-            cached_at = datetime.fromisoformat(entry["cached_at"])
-            if now - cached_at > self.cache_ttl:
-                expired_asins.append(asin)
-
-        for asin in expired_asins:
-            del self.cache_data[asin]
-
-        if expired_asins:
-            self._save_cache()
-            logger.info(f"Cleared {len(expired_asins)} expired cache entries")
+        """Remove expired entries from cache (visits expired entries only)"""
+        removed = self.backend.delete_expired(time.time())
+        if removed:
+            logger.info(f"Cleared {removed} expired cache entries")
 
     def clear_all(self):
         """Clear all cache entries"""
-        self.cache_data = {}
-        self._save_cache()
+        self.backend.clear()
         logger.info("Cleared all cache entries")
 
-    def get_stats(self) -> Dict:
-        """Get cache statistics"""
-        now = datetime.now()
-        valid_count = 0
-        expired_count = 0
+    def flush(self):
+        """Persist pending writes (batched backends)"""
+        self.backend.flush()
 
-        for entry in self.cache_data.values():
-            cached_at = datetime.fromisoformat(entry["cached_at"])
-            if now - cached_at <= self.cache_ttl:
-                valid_count += 1
-            else:
-                expired_count += 1
+    def close(self):
+        """Flush and release the backend"""
+        self.backend.close()
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics (from the expiry index, no per-entry parsing)"""
+        total_count = self.backend.count()
+        expired_count = self.backend.count_expired(time.time())
 
         return {
-            "total_entries": len(self.cache_data),
-            "valid_entries": valid_count,
+            "backend": self.backend.name,
+            "total_entries": total_count,
+            "valid_entries": total_count - expired_count,
             "expired_entries": expired_count,
             "cache_ttl_hours": self.cache_ttl.total_seconds() / 3600
         }
@@ -0,0 +1,156 @@
+"""
+Collection Journal
+Append-only JSONL log of collected products, rankings and reviews so a
+crashed run can be resumed without re-scraping completed work
+"""
+import os
+import json
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any
+from loguru import logger
+
+
+# Journal record kind -> collected_data section
+JOURNAL_SECTIONS = {
+    "product": "products",
+    "ranking": "ranks",
+    "review": "reviews",
+}
+
+
+class CollectionJournal:
+    """
+    Append-only per-item journal for the collection pipeline
+
+    Each collected item is written as one JSON line the moment it is
+    available:
+        {"kind": "product", "key": "B0...", "data": {...}, "written_at": "..."}
+
+    replay() rebuilds collected_data sections from the journal (last write
+    per key wins). A line cut short by a crash is skipped, so at most the
+    item in flight is lost.
+    """
+
+    def __init__(self, journal_dir: Path, enabled: bool = True, fsync: bool = True):
+        """
+        Initialize collection journal
+
+        Args:
+            journal_dir: Directory to store the journal file
+            enabled: If False, append() is a no-op
+            fsync: fsync after every record (survives OS crashes, not just process crashes)
+        """
+        self.journal_dir = journal_dir
+        self.journal_dir.mkdir(exist_ok=True, parents=True)
+        self.journal_file = journal_dir / "collection_journal.jsonl"
+        self.enabled = enabled
+        self.fsync = fsync
+        self.records_written = 0
+        self._tail_checked = False
+
+    def _terminate_partial_line(self, f):
+        """Make sure a line left half-written by a crash does not swallow the next record"""
+        if self._tail_checked:
+            return
+        self._tail_checked = True
+        if self.journal_file.stat().st_size == 0:
+            return
+        with open(self.journal_file, "rb") as tail:
+            tail.seek(-1, os.SEEK_END)
+            if tail.read(1) != b"\n":
+                f.write("\n")
+
+    def start_new(self):
+        """Start a fresh journal for a new run (discards the previous one)"""
+        if not self.enabled:
+            return
+
+        with open(self.journal_file, "w", encoding="utf-8"):
+            pass
+        self.records_written = 0
+        self._tail_checked = True
+        logger.info(f"Started new collection journal: {self.journal_file}")
+
+    def append(self, kind: str, key: str, data: Any):
+        """
+        Append one collected item
+
+        Args:
+            kind: "product", "ranking" or "review"
+            key: ASIN (product/review) or category name (ranking)
+            data: Collected data for the item
+        """
+        if not self.enabled:
+            return
+
+        if kind not in JOURNAL_SECTIONS:
+            raise ValueError(f"Unknown journal record kind: {kind}")
+
+        record = {
+            "kind": kind,
+            "key": key,
+            "data": data,
+            "written_at": datetime.now().isoformat(),
+        }
+
+        try:
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                self._terminate_partial_line(f)
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self.records_written += 1
+        except Exception as e:
+            logger.error(f"Failed to write journal record {kind}/{key}: {e}")
+
+    def replay(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Rebuild collected_data sections from the journal
+
+        Returns:
+            dict: {"products": {...}, "ranks": {...}, "reviews": {...}}
+        """
+        sections = {section: {} for section in JOURNAL_SECTIONS.values()}
+        if not self.journal_file.exists():
+            return sections
+
+        skipped = 0
+        with open(self.journal_file, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    sections[JOURNAL_SECTIONS[record["kind"]]][record["key"]] = record["data"]
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    skipped += 1  # Truncated by a crash mid-write
+
+        if skipped:
+            logger.warning(f"Skipped {skipped} unreadable journal lines")
+
+        return sections
+
+    def restore_into(self, collected_data: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Merge journaled items into collected_data (journal entries win)
+
+        Args:
+            collected_data: Pipeline collected_data dict
+
+        Returns:
+            dict: Number of restored items per section
+        """
+        sections = self.replay()
+        counts = {}
+        for section, items in sections.items():
+            collected_data.setdefault(section, {}).update(items)
+            counts[section] = len(items)
+
+        logger.info(
+            f"Resumed from journal: {counts['products']} products, "
+            f"{counts['ranks']} rankings, {counts['reviews']} review sets"
+        )
+        return counts
@@ -0,0 +1,376 @@
+"""
+LLM Call Cache
+Memoizes Claude messages.create() calls so re-running analysis on unchanged
+data does not pay for the same completions again
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from loguru import logger
+
+from config.settings import DATA_DIR
+
+
+# Cache modes
+MODE_READWRITE = "readwrite"  # Serve hits, call the API on misses and store the result
+MODE_REPLAY = "replay"        # Serve hits only; misses raise LLMCacheMiss (zero API calls)
+MODE_OFF = "off"              # Bypass the cache entirely
+MODES = (MODE_READWRITE, MODE_REPLAY, MODE_OFF)
+
+# Request arguments that do not change the completion
+_UNKEYED_ARGS = {"timeout", "extra_headers"}
+
+
+class LLMCacheMiss(Exception):
+    """Raised in replay mode when a call is not in the cache"""
+
+
+def _to_namespace(value: Any) -> Any:
+    """Turn a stored response dict back into attribute-style objects"""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_to_namespace(v) for v in value]
+    return value
+
+
+class LLMCallCache:
+    """
+    Shared cache for Claude calls across the pipeline
+
+    Keyed by sha256 of (model, prompt/messages, sampling params), stored in
+    a single SQLite database. Entries are evicted least-recently-used once
+    the cache exceeds max_entries or max_size_mb. Hits and misses are
+    counted per task type (m1_key_strengths, review_analysis, ...).
+
+    Cached responses expose the same fields callers read from the SDK
+    response (content[i].text, usage, stop_reason). Their usage reports
+    0 tokens (including prompt-cache tokens) since nothing was billed; the
+    original usage is kept in cached_usage.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        mode: str = MODE_READWRITE,
+        max_entries: int = 5000,
+        max_size_mb: float = 200.0,
+    ):
+        """
+        Initialize LLM call cache
+
+        Args:
+            db_path: SQLite file (default: DATA_DIR/llm_cache/llm_cache.db)
+            mode: readwrite, replay or off
+            max_entries: Maximum number of cached calls
+            max_size_mb: Maximum total size of cached responses
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown LLM cache mode: {mode} (expected one of {MODES})")
+
+        self.db_path = Path(db_path) if db_path else DATA_DIR / "llm_cache" / "llm_cache.db"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self.max_entries = max_entries
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS calls ("
+            " key TEXT PRIMARY KEY,"
+            " task TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " size_bytes INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_calls_last_used ON calls (last_used)")
+        self.conn.commit()
+
+        self._entries, self._size_bytes = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM calls"
+        ).fetchone()
+
+        self.evictions = 0
+        self.task_stats: Dict[str, Dict[str, int]] = {}
+
+        logger.info(
+            f"LLM call cache initialized: {self._entries} entries, mode={mode} "
+            f"(limit {max_entries} entries / {max_size_mb:.0f} MB)"
+        )
+
+    @staticmethod
+    def make_key(request: Dict[str, Any]) -> str:
+        """
+        Cache key for a messages.create() request
+
+        Args:
+            request: Keyword arguments of the call (model, messages, system, temperature, ...)
+
+        Returns:
+            str: sha256 hex digest
+        """
+        keyed = {k: v for k, v in request.items() if k not in _UNKEYED_ARGS}
+        payload = json.dumps(keyed, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _task(self, task: str) -> Dict[str, int]:
+        if task not in self.task_stats:
+            self.task_stats[task] = {
+                "hits": 0,
+                "misses": 0,
+                "replay_misses": 0,
+                "saved_input_tokens": 0,
+                "saved_output_tokens": 0,
+            }
+        return self.task_stats[task]
+
+    def create(self, client, task: str, **request) -> Any:
+        """
+        Memoized client.messages.create()
+
+        Args:
+            client: anthropic.Anthropic client
+            task: Task type for statistics (e.g. "review_analysis")
+            **request: Arguments passed through to messages.create()
+
+        Returns:
+            SDK response on a miss, cached response object on a hit
+
+        Raises:
+            LLMCacheMiss: In replay mode when the call is not cached
+        """
+        return self.create_with(client.messages.create, task, **request)
+
+    def create_with(self, call: Callable[..., Any], task: str, **request) -> Any:
+        """
+        Memoized call of any messages.create()-compatible function
+
+        Args:
+            call: Function taking the request arguments (e.g. LLMGateway's admitted call)
+            task: Task type for statistics (e.g. "review_analysis")
+            **request: Arguments passed through to call
+
+        Returns:
+            Response from call on a miss, cached response object on a hit
+
+        Raises:
+            LLMCacheMiss: In replay mode when the call is not cached
+        """
+        if self.mode == MODE_OFF:
+            return call(**request)
+
+        key, cached = self._lookup(task, request)
+        if cached is not None:
+            return cached
+
+        response = call(**request)
+        self.put(key, task, request.get("model", ""), response)
+        return response
+
+    async def acreate_with(self, call: Callable[..., Awaitable[Any]], task: str, **request) -> Any:
+        """
+        Memoized call of an async messages.create()-compatible function
+
+        Args and Returns as create_with(), with call awaited on a miss
+        """
+        if self.mode == MODE_OFF:
+            return await call(**request)
+
+        key, cached = self._lookup(task, request)
+        if cached is not None:
+            return cached
+
+        response = await call(**request)
+        self.put(key, task, request.get("model", ""), response)
+        return response
+
+    def _lookup(self, task: str, request: Dict[str, Any]) -> Tuple[str, Optional[Any]]:
+        """
+        Cache key and cached response (None on a miss), with hit/miss statistics
+
+        Raises:
+            LLMCacheMiss: In replay mode when the call is not cached
+        """
+        key = self.make_key(request)
+        stats = self._task(task)
+
+        cached = self.get(key)
+        if cached is not None:
+            stats["hits"] += 1
+            stats["saved_input_tokens"] += cached.cached_usage.input_tokens
+            stats["saved_output_tokens"] += cached.cached_usage.output_tokens
+            logger.debug(f"LLM cache hit ({task}): {key[:12]}")
+            return key, cached
+
+        if self.mode == MODE_REPLAY:
+            stats["replay_misses"] += 1
+            raise LLMCacheMiss(f"No cached response for {task} call {key[:12]} (replay mode)")
+
+        stats["misses"] += 1
+        return key, None
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached response and mark it as recently used
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Response object or None if not cached
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT response FROM calls WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE calls SET last_used = ? WHERE key = ?", (time.time(), key))
+
+        stored = json.loads(row[0])
+        usage = stored.get("usage") or {}
+        response = _to_namespace(stored)
+        response.cached_usage = _to_namespace({
+            "input_tokens": usage.get("input_tokens", 0),
+            "output_tokens": usage.get("output_tokens", 0),
+        })
+        response.usage = _to_namespace({
+            **usage,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        })
+        response.from_cache = True
+        return response
+
+    def put(self, key: str, task: str, model: str, response: Any):
+        """
+        Store a response and evict least-recently-used entries if over the limits
+
+        Args:
+            key: Cache key from make_key()
+            task: Task type
+            model: Model identifier
+            response: SDK Message (or a dict with content/usage)
+        """
+        stored = response.model_dump() if hasattr(response, "model_dump") else response
+        payload = json.dumps(stored, ensure_ascii=False, default=str)
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+
+        try:
+            with self._lock, self.conn:
+                previous = self.conn.execute(
+                    "SELECT size_bytes FROM calls WHERE key = ?", (key,)
+                ).fetchone()
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO calls (key, task, model, response, size_bytes, created_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, task, model, payload, size, now, now),
+                )
+                if previous:
+                    self._size_bytes -= previous[0]
+                else:
+                    self._entries += 1
+                self._size_bytes += size
+                self._evict()
+        except Exception as e:
+            logger.warning(f"Failed to store LLM response in cache: {e}")
+
+    def _evict(self):
+        """Delete least-recently-used entries until within max_entries/max_size (caller holds the lock)"""
+        while self._entries > self.max_entries or self._size_bytes > self.max_size_bytes:
+            excess = max(1, self._entries - self.max_entries)
+            rows = self.conn.execute(
+                "SELECT key, size_bytes FROM calls ORDER BY last_used LIMIT ?", (min(excess, 500),)
+            ).fetchall()
+            if not rows:
+                break
+
+            self.conn.executemany("DELETE FROM calls WHERE key = ?", [(k,) for k, _ in rows])
+            self._entries -= len(rows)
+            self._size_bytes -= sum(size for _, size in rows)
+            self.evictions += len(rows)
+
+    def clear(self):
+        """Delete all cached calls"""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM calls")
+            self._entries, self._size_bytes = 0, 0
+        logger.info("Cleared LLM call cache")
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self.conn.close()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Entry counts and per-task hit rates"""
+        by_task = {}
+        for task, stats in self.task_stats.items():
+            lookups = stats["hits"] + stats["misses"] + stats["replay_misses"]
+            by_task[task] = {
+                **stats,
+                "hit_rate": round(stats["hits"] / lookups * 100, 1) if lookups else 0.0,
+            }
+
+        hits = sum(s["hits"] for s in self.task_stats.values())
+        lookups = sum(s["hits"] + s["misses"] + s["replay_misses"] for s in self.task_stats.values())
+
+        return {
+            "mode": self.mode,
+            "entries": self._entries,
+            "size_mb": round(self._size_bytes / (1024 * 1024), 2),
+            "evictions": self.evictions,
+            "hits": hits,
+            "lookups": lookups,
+            "hit_rate": round(hits / lookups * 100, 1) if lookups else 0.0,
+            "by_task": by_task,
+        }
+
+    def log_statistics(self):
+        """Log overall and per-task hit rates"""
+        stats = self.get_statistics()
+        if not stats["lookups"]:
+            return
+
+        logger.info(
+            f"🧠 LLM call cache ({stats['mode']}): {stats['hits']}/{stats['lookups']} hits "
+            f"({stats['hit_rate']}%), {stats['entries']} entries, {stats['size_mb']} MB, "
+            f"{stats['evictions']} evicted"
+        )
+        for task, task_stats in stats["by_task"].items():
+            logger.info(
+                f"  - {task}: {task_stats['hits']} hits / {task_stats['misses']} API calls"
+                + (f" / {task_stats['replay_misses']} replay misses" if task_stats["replay_misses"] else "")
+                + f" ({task_stats['hit_rate']}%, saved "
+                f"{task_stats['saved_input_tokens']:,}+{task_stats['saved_output_tokens']:,} tokens)"
+            )
+
+
+# Singleton instance
+_llm_cache_instance = None
+
+
+def get_llm_cache(
+    mode: str = MODE_READWRITE,
+    max_entries: int = 5000,
+    max_size_mb: float = 200.0,
+) -> LLMCallCache:
+    """Get or create LLM call cache singleton instance (arguments apply on first call)"""
+    global _llm_cache_instance
+
+    if _llm_cache_instance is None:
+        _llm_cache_instance = LLMCallCache(mode=mode, max_entries=max_entries, max_size_mb=max_size_mb)
+
+    return _llm_cache_instance
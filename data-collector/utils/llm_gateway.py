@@ -0,0 +1,669 @@
+"""
+LLM Gateway
+Single in-process entry point for Claude calls: every consumer of an API
+key shares one RPM/TPM budget, one backoff after rate limits and one
+circuit breaker
+"""
+import asyncio
+import inspect
+import itertools
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import anthropic
+from loguru import logger
+
+from config.settings import ANTHROPIC_API_KEY
+from utils.llm_cache import get_llm_cache
+from utils.rate_limiter import TokenRateLimiter
+
+
+# Priority classes (lower is served first)
+PRIORITY_HIGH = 0    # Short report calls on the critical path (market signal, M1/M2 text)
+PRIORITY_NORMAL = 1  # Review analysis, ideation
+PRIORITY_BULK = 2    # Attribute extraction
+PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_NORMAL: "normal", PRIORITY_BULK: "bulk"}
+
+# Circuit breaker states
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+# Longest a waiter sleeps before re-checking admission
+_MAX_ADMISSION_POLL = 1.0
+
+
+class LLMUnavailableError(Exception):
+    """Raised when the circuit breaker is open (Claude API treated as unavailable)"""
+
+
+class _Waiter:
+    """A caller waiting for admission (sync callers use an Event, async callers a Future)"""
+
+    __slots__ = ("priority", "seq", "tokens", "needs_slot", "granted", "event", "future", "loop")
+
+    def __init__(self, priority: int, seq: int, tokens: int, needs_slot: bool):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.needs_slot = needs_slot
+        self.granted = False
+        self.event: Optional[threading.Event] = None
+        self.future: Optional[asyncio.Future] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def grant(self):
+        self.granted = True
+        if self.event is not None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(True)
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """Seconds until an RFC 3339 rate-limit reset timestamp"""
+    if not value:
+        return None
+    try:
+        reset = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max(0.0, (reset - datetime.now(timezone.utc)).total_seconds())
+
+
+def _header_float(headers: Any, name: str) -> Optional[float]:
+    try:
+        value = headers.get(name)
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMGateway:
+    """
+    Shared admission control for all Claude calls
+
+    - Priority classes: waiting calls are admitted highest priority first
+      (FIFO within a class), so bulk extraction cannot starve short report
+      calls.
+    - Token-aware admission: each call reserves one request and its
+      estimated tokens from a TokenRateLimiter sized to the account's
+      RPM/TPM; the estimate is reconciled with the real usage, and the
+      buckets are lowered to the anthropic-ratelimit-*-remaining headers.
+    - Shared backoff: a 429/529 pauses admission for every caller for the
+      retry-after period (exponential backoff with jitter if absent),
+      instead of each caller sleeping a fixed 60s.
+    - Circuit breaker: after failure_threshold consecutive connection/5xx
+      failures the gateway rejects calls with LLMUnavailableError for
+      cooldown_seconds, then lets one probe call through.
+
+    Sync callers (M1/M2, review analysis, ideation, market signal) use
+    create(), which also goes through the LLM call cache; async callers
+    (attribute extraction) use acreate(). The in-flight limit applies to
+    async calls only: a sync call blocks its thread (often the event loop
+    thread), so it must never wait on async calls to finish.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        requests_per_minute: int = 50,
+        tokens_per_minute: int = 40000,
+        max_concurrent_requests: int = 8,
+        max_attempts: int = 4,
+        backoff_base_seconds: float = 1.0,
+        max_backoff_seconds: float = 60.0,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 120.0,
+        request_timeout_seconds: float = 60.0,
+    ):
+        """
+        Initialize LLM gateway
+
+        Args:
+            api_key: Anthropic API key (default: settings)
+            base_url: API base URL override (default: Anthropic API)
+            requests_per_minute: Account request limit shared by all callers
+            tokens_per_minute: Account token limit shared by all callers
+            max_concurrent_requests: Maximum async calls in flight
+            max_attempts: Attempts per call (rate limits, overload, 5xx, connection errors)
+            backoff_base_seconds: First retry delay when no retry-after header is sent
+            max_backoff_seconds: Upper bound of a retry delay
+            failure_threshold: Consecutive failures that open the circuit
+            cooldown_seconds: How long the circuit stays open before a probe call
+            request_timeout_seconds: Default HTTP timeout per call
+        """
+        api_key = api_key or ANTHROPIC_API_KEY
+
+        # Retries are done here (with shared backoff), not inside the SDK
+        self.sync_client = anthropic.Anthropic(
+            api_key=api_key, base_url=base_url, timeout=request_timeout_seconds, max_retries=0
+        )
+        self.async_client = anthropic.AsyncAnthropic(
+            api_key=api_key, base_url=base_url, timeout=request_timeout_seconds, max_retries=0
+        )
+        self.llm_cache = get_llm_cache()
+
+        self.limiter = TokenRateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_concurrent_requests = max_concurrent_requests
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base_seconds = backoff_base_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._waiters: List[_Waiter] = []
+        self._in_flight = 0
+        self._paused_until = 0.0
+
+        self._circuit = CIRCUIT_CLOSED
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._probe_in_flight = False
+
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "overloaded": 0,
+            "failures": 0,
+            "circuit_opens": 0,
+            "rejected": 0,
+            "backoff_seconds": 0.0,
+            "by_priority": {
+                name: {"requests": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+                for name in PRIORITY_NAMES.values()
+            },
+        }
+
+        logger.info(
+            f"LLM gateway initialized: {requests_per_minute} RPM / {tokens_per_minute} TPM, "
+            f"{max_concurrent_requests} concurrent, circuit opens after {failure_threshold} failures"
+        )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @property
+    def available(self) -> bool:
+        """False while the circuit breaker is open"""
+        return not (self._circuit == CIRCUIT_OPEN and time.monotonic() < self._open_until)
+
+    def create(
+        self,
+        task: str,
+        priority: int = PRIORITY_NORMAL,
+        use_cache: bool = True,
+        estimated_output_tokens: Optional[int] = None,
+        **request
+    ) -> Any:
+        """
+        messages.create() through the gateway (blocking)
+
+        Args:
+            task: Task type (statistics and LLM call cache)
+            priority: PRIORITY_HIGH / PRIORITY_NORMAL / PRIORITY_BULK
+            use_cache: Serve/store the response through the LLM call cache
+            estimated_output_tokens: Output tokens to reserve (default: min(max_tokens, 1024))
+            **request: messages.create() arguments
+
+        Returns:
+            SDK Message (or cached response)
+
+        Raises:
+            LLMUnavailableError: Circuit breaker open
+            anthropic.APIError: Non-retryable error, or retries exhausted
+        """
+        def call(**req):
+            return self._call_sync(task, priority, estimated_output_tokens, req)
+
+        if use_cache:
+            return self.llm_cache.create_with(call, task, **request)
+        return call(**request)
+
+    async def acreate(
+        self,
+        task: str,
+        priority: int = PRIORITY_BULK,
+        use_cache: bool = False,
+        estimated_output_tokens: Optional[int] = None,
+        **request
+    ) -> Any:
+        """
+        messages.create() through the gateway (async)
+
+        Args and Raises as create(); not cached unless use_cache is set
+        (attribute extraction has its own content-addressed cache)
+        """
+        async def call(**req):
+            return await self._call_async(task, priority, estimated_output_tokens, req)
+
+        if use_cache:
+            return await self.llm_cache.acreate_with(call, task, **request)
+        return await call(**request)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Gateway counters, circuit state and pacing"""
+        with self._lock:
+            return {
+                **{k: v for k, v in self.stats.items() if k != "by_priority"},
+                "backoff_seconds": round(self.stats["backoff_seconds"], 1),
+                "circuit": self._circuit,
+                "by_priority": {
+                    name: {
+                        "requests": s["requests"],
+                        "avg_wait_seconds": round(s["wait_seconds"] / s["requests"], 2) if s["requests"] else 0.0,
+                        "max_wait_seconds": round(s["max_wait_seconds"], 2),
+                    }
+                    for name, s in self.stats["by_priority"].items()
+                },
+            }
+
+    def log_statistics(self):
+        """Log request, retry, backoff and admission wait statistics"""
+        stats = self.get_statistics()
+        if not stats["requests"] and not stats["rejected"]:
+            return
+
+        logger.info(
+            f"🚦 LLM gateway: {stats['requests']} requests, {stats['retries']} retries "
+            f"({stats['rate_limited']} rate limited, {stats['overloaded']} overloaded, "
+            f"{stats['failures']} failed), {stats['backoff_seconds']}s shared backoff, "
+            f"circuit {stats['circuit']} ({stats['circuit_opens']} opens, {stats['rejected']} rejected)"
+        )
+        for name, s in stats["by_priority"].items():
+            if s["requests"]:
+                logger.info(
+                    f"  - {name}: {s['requests']} requests, admission wait "
+                    f"avg {s['avg_wait_seconds']}s / max {s['max_wait_seconds']}s"
+                )
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    async def _call_async(
+        self,
+        task: str,
+        priority: int,
+        estimated_output_tokens: Optional[int],
+        request: Dict[str, Any]
+    ) -> Any:
+        tokens = self._estimate_tokens(request, estimated_output_tokens)
+
+        owns_probe = False
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                owns_probe = self._check_circuit(owns_probe)
+                await self._admit_async(tokens, priority)
+
+                try:
+                    raw = await self.async_client.messages.with_raw_response.create(**request)
+                except Exception as e:
+                    delay = self._on_error(e, task, attempt, tokens)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                    continue
+                finally:
+                    self._release_slot()
+
+                message = self._on_success(raw, tokens)
+                owns_probe = False
+                return message
+        finally:
+            if owns_probe:
+                self._release_probe()
+
+    def _call_sync(
+        self,
+        task: str,
+        priority: int,
+        estimated_output_tokens: Optional[int],
+        request: Dict[str, Any]
+    ) -> Any:
+        tokens = self._estimate_tokens(request, estimated_output_tokens)
+
+        owns_probe = False
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                owns_probe = self._check_circuit(owns_probe)
+                self._admit_sync(tokens, priority)
+
+                try:
+                    raw = self.sync_client.messages.with_raw_response.create(**request)
+                except Exception as e:
+                    delay = self._on_error(e, task, attempt, tokens)
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+                    continue
+
+                message = self._on_success(raw, tokens)
+                owns_probe = False
+                return message
+        finally:
+            if owns_probe:
+                self._release_probe()
+
+    @staticmethod
+    def _estimate_tokens(request: Dict[str, Any], estimated_output_tokens: Optional[int]) -> int:
+        """Rough input estimate (~4 chars/token) plus the expected output"""
+        prompt_chars = len(json.dumps(
+            [request.get("system"), request.get("messages"), request.get("tools")],
+            ensure_ascii=False, default=str
+        ))
+        output = estimated_output_tokens or min(request.get("max_tokens", 1024), 1024)
+        return prompt_chars // 4 + output
+
+    def _on_success(self, raw: Any, reserved_tokens: int) -> Any:
+        """Parse the response, reconcile tokens, apply rate-limit headers and close the circuit"""
+        message = raw.parse()
+        usage = message.usage
+        actual = (
+            usage.input_tokens + usage.output_tokens
+            + (getattr(usage, "cache_creation_input_tokens", 0) or 0)
+        )
+
+        with self._lock:
+            self.limiter.reconcile(reserved_tokens, actual)
+            self._apply_headers(raw.headers)
+
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            if self._circuit != CIRCUIT_CLOSED:
+                logger.info("✓ Claude API reachable again, closing circuit breaker")
+                self._circuit = CIRCUIT_CLOSED
+
+        return message
+
+    def _apply_headers(self, headers: Any):
+        """Lower the buckets to the server's view; pause until reset when exhausted (lock held)"""
+        requests_remaining = _header_float(headers, "anthropic-ratelimit-requests-remaining")
+        tokens_remaining = _header_float(headers, "anthropic-ratelimit-tokens-remaining")
+        if tokens_remaining is None:
+            input_remaining = _header_float(headers, "anthropic-ratelimit-input-tokens-remaining")
+            output_remaining = _header_float(headers, "anthropic-ratelimit-output-tokens-remaining")
+            if input_remaining is not None and output_remaining is not None:
+                tokens_remaining = input_remaining + output_remaining
+
+        self.limiter.limit_to(requests_remaining, tokens_remaining)
+
+        if requests_remaining == 0:
+            reset = _parse_reset(headers.get("anthropic-ratelimit-requests-reset"))
+            if reset:
+                self._pause(reset)
+
+    def _on_error(self, error: Exception, task: str, attempt: int, reserved_tokens: int) -> Optional[float]:
+        """
+        Classify a failed call
+
+        Returns:
+            Seconds the caller should sleep before retrying (0 when the
+            shared pause covers it), or None to give up and re-raise
+        """
+        status = getattr(error, "status_code", None)
+        rate_limited = isinstance(error, anthropic.RateLimitError)
+        overloaded = status == 529
+        transient = isinstance(error, anthropic.APIConnectionError) or (status is not None and status >= 500)
+
+        with self._lock:
+            # The API did not count a rejected request against the token budget
+            self.limiter.reconcile(reserved_tokens, 0)
+
+            if not (rate_limited or transient):
+                return None
+
+            delay = self._retry_delay(error, attempt)
+
+            if rate_limited or overloaded:
+                # Everyone backs off, not just this caller
+                self.stats["rate_limited" if rate_limited else "overloaded"] += 1
+                self._pause(delay)
+                caller_delay = 0.0
+            else:
+                self.stats["failures"] += 1
+                self._record_failure()
+                caller_delay = delay
+
+            exhausted = attempt >= self.max_attempts or self._circuit == CIRCUIT_OPEN
+            if not exhausted:
+                self.stats["retries"] += 1
+
+        kind = "rate limited" if rate_limited else "overloaded" if overloaded else type(error).__name__
+        if exhausted:
+            logger.warning(f"{task}: {kind}, giving up after {attempt} attempts")
+            return None
+
+        logger.warning(f"{task}: {kind}, retrying in {delay:.1f}s (attempt {attempt}/{self.max_attempts})")
+        return caller_delay
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """retry-after header if present, else exponential backoff with jitter"""
+        response = getattr(error, "response", None)
+        headers = response.headers if response is not None else {}
+
+        retry_after = _header_float(headers, "retry-after")
+        if retry_after is None:
+            retry_after = _parse_reset(headers.get("anthropic-ratelimit-requests-reset"))
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff_seconds)
+
+        backoff = self.backoff_base_seconds * 2 ** (attempt - 1)
+        return min(backoff * random.uniform(0.5, 1.0) + backoff * 0.5, self.max_backoff_seconds)
+
+    def _pause(self, seconds: float):
+        """Hold admission for all callers (lock held)"""
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            self.stats["backoff_seconds"] += until - max(self._paused_until, time.monotonic())
+            self._paused_until = until
+
+    # ------------------------------------------------------------------
+    # Circuit breaker
+    # ------------------------------------------------------------------
+
+    def _check_circuit(self, owns_probe: bool = False) -> bool:
+        """
+        Raise LLMUnavailableError while open; let a single probe through after the cooldown
+
+        Args:
+            owns_probe: The caller is the probe and is retrying it
+
+        Returns:
+            bool: True if the caller now holds the half-open probe
+        """
+        with self._lock:
+            if self._circuit == CIRCUIT_CLOSED:
+                return False
+
+            if self._circuit == CIRCUIT_OPEN and time.monotonic() >= self._open_until:
+                self._circuit = CIRCUIT_HALF_OPEN
+
+            if self._circuit == CIRCUIT_HALF_OPEN and (owns_probe or not self._probe_in_flight):
+                self._probe_in_flight = True
+                return True
+
+            self.stats["rejected"] += 1
+            raise LLMUnavailableError("Claude API unavailable (circuit breaker open)")
+
+    def _release_probe(self):
+        """Let the next caller probe when the probe call ended without closing the circuit"""
+        with self._lock:
+            if self._circuit == CIRCUIT_HALF_OPEN:
+                self._probe_in_flight = False
+
+    def _record_failure(self):
+        """Count a consecutive failure; open the circuit at the threshold (lock held)"""
+        self._consecutive_failures += 1
+
+        if self._circuit == CIRCUIT_HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self._circuit != CIRCUIT_OPEN:
+                logger.warning(
+                    f"⚠ {self._consecutive_failures} consecutive Claude API failures - "
+                    f"opening circuit breaker for {self.cooldown_seconds:.0f}s (rule-based fallbacks meanwhile)"
+                )
+                self.stats["circuit_opens"] += 1
+            self._circuit = CIRCUIT_OPEN
+            self._open_until = time.monotonic() + self.cooldown_seconds
+            self._probe_in_flight = False
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    def _dispatch(self) -> float:
+        """
+        Admit waiters in priority order while budget allows (lock held)
+
+        A waiter that only lacks an in-flight slot is skipped; one that lacks
+        rate budget stops the scan so lower classes cannot take its tokens.
+
+        Returns:
+            float: Seconds until admission is worth re-checking
+        """
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        for waiter in sorted(self._waiters, key=lambda w: (w.priority, w.seq)):
+            if waiter.needs_slot and self._in_flight >= self.max_concurrent_requests:
+                continue
+
+            wait = self.limiter.try_acquire(waiter.tokens)
+            if wait > 0:
+                return wait
+
+            if waiter.needs_slot:
+                self._in_flight += 1
+            self._waiters.remove(waiter)
+            waiter.grant()
+
+        return _MAX_ADMISSION_POLL
+
+    def _enqueue(self, tokens: int, priority: int, needs_slot: bool) -> _Waiter:
+        return _Waiter(priority, next(self._seq), tokens, needs_slot)
+
+    def _record_admission(self, priority: int, waited: float):
+        stats = self.stats["by_priority"][PRIORITY_NAMES.get(priority, "normal")]
+        stats["requests"] += 1
+        stats["wait_seconds"] += waited
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+        self.stats["requests"] += 1
+
+    def _admit_sync(self, tokens: int, priority: int):
+        """Block the calling thread until admitted"""
+        start = time.monotonic()
+        waiter = self._enqueue(tokens, priority, needs_slot=False)
+        waiter.event = threading.Event()
+
+        with self._lock:
+            self._waiters.append(waiter)
+            wait = self._dispatch()
+
+        while True:
+            with self._lock:
+                if waiter.granted:
+                    self._record_admission(priority, time.monotonic() - start)
+                    return
+            waiter.event.wait(timeout=min(max(wait, 0.01), _MAX_ADMISSION_POLL))
+            with self._lock:
+                if not waiter.granted:
+                    wait = self._dispatch()
+
+    async def _admit_async(self, tokens: int, priority: int):
+        """Wait (without blocking the event loop) until admitted; holds an in-flight slot afterwards"""
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        waiter = self._enqueue(tokens, priority, needs_slot=True)
+        waiter.loop = loop
+        waiter.future = loop.create_future()
+
+        with self._lock:
+            self._waiters.append(waiter)
+            wait = self._dispatch()
+
+        try:
+            while True:
+                with self._lock:
+                    if waiter.granted:
+                        self._record_admission(priority, time.monotonic() - start)
+                        return
+                await asyncio.wait({waiter.future}, timeout=min(max(wait, 0.01), _MAX_ADMISSION_POLL))
+                with self._lock:
+                    if not waiter.granted:
+                        wait = self._dispatch()
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    self._in_flight -= 1
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            raise
+
+    def _release_slot(self):
+        """Free an async in-flight slot and admit the next waiter"""
+        with self._lock:
+            self._in_flight -= 1
+            self._dispatch()
+
+
+def _gateway_defaults() -> Dict[str, Any]:
+    """LLMGateway pacing/retry defaults (everything but api_key and base_url)"""
+    return {
+        name: param.default
+        for name, param in inspect.signature(LLMGateway.__init__).parameters.items()
+        if param.default is not inspect.Parameter.empty and name not in ("api_key", "base_url")
+    }
+
+
+# Gateway instances, one per (api_key, base_url): each key has its own rate limits
+_llm_gateway_instances: Dict[Tuple[Optional[str], Optional[str]], LLMGateway] = {}
+_llm_gateway_settings: Dict[Tuple[Optional[str], Optional[str]], Dict[str, Any]] = {}
+
+
+def get_llm_gateway(api_key: Optional[str] = None, base_url: Optional[str] = None, **settings) -> LLMGateway:
+    """
+    Get or create the LLM gateway for an API key and base URL
+
+    Callers with the same key and base URL share one gateway. Pacing and
+    retry settings (see LLMGateway) apply when that gateway is created; a
+    later call asking for different settings gets the existing gateway and
+    a warning.
+
+    Args:
+        api_key: Anthropic API key (default: settings)
+        base_url: API base URL override (default: Anthropic API)
+        **settings: LLMGateway pacing/retry arguments
+
+    Returns:
+        LLMGateway: Shared gateway for the key and base URL
+    """
+    key = (api_key or ANTHROPIC_API_KEY, base_url)
+
+    if key not in _llm_gateway_instances:
+        _llm_gateway_instances[key] = LLMGateway(api_key=key[0], base_url=base_url, **settings)
+        _llm_gateway_settings[key] = {**_gateway_defaults(), **settings}
+        return _llm_gateway_instances[key]
+
+    existing = _llm_gateway_settings[key]
+    for name, value in settings.items():
+        if existing.get(name) != value:
+            logger.warning(
+                f"LLM gateway already created with {name}={existing.get(name)}, ignoring {name}={value}"
+            )
+
+    return _llm_gateway_instances[key]
@@ -4,9 +4,11 @@ Enhanced with human-like behavior patterns for bot detection evasion
 """
 import time
 import random
+import asyncio
 from functools import wraps
 from collections import deque
 from datetime import datetime, timedelta
+from typing import Dict, Optional
 from loguru import logger
 
 from config.settings import RATE_LIMIT, SCRAPER_SETTINGS
@@ -125,23 +127,20 @@ class RateLimiter:
 
         return True
 
-    def wait_if_needed(self):
+    def _human_delay(self) -> float:
         """
-        Block until we can make a request with human-like timing patterns
+        Compute the next human-like pause (seconds)
         - Uses Gaussian distribution for more natural delays
         - Applies time-of-day multiplier (slower during off-peak)
         - Randomly inserts long pauses (coffee breaks)
         """
-        while not self.can_make_request():
-            logger.warning("Rate limit reached, waiting...")
-            time.sleep(5)  # Check every 5 seconds
+        total = 0.0
 
         # Check for long pause (coffee break simulation)
         if self._should_take_long_pause():
             pause_duration = self._get_long_pause_duration()
             logger.info(f"☕ Taking a coffee break: {pause_duration/60:.1f} minutes")
-            time.sleep(pause_duration)
-            self.total_delay_time += pause_duration
+            total += pause_duration
 
         # Use Gaussian distribution for more human-like delays
         delay = self._gaussian_delay()
@@ -157,6 +156,20 @@ class RateLimiter:
         delay += jitter
 
         logger.debug(f"Waiting {delay:.2f}s before request (peak hours: {self._is_peak_hours()})")
+        return total + delay
+
+    def wait_if_needed(self):
+        """
+        Block until we can make a request with human-like timing patterns
+
+        NOTE: Blocks the calling thread. Coroutines must use
+        AsyncRateLimiter.acquire() instead so the event loop keeps running.
+        """
+        while not self.can_make_request():
+            logger.warning("Rate limit reached, waiting...")
+            time.sleep(5)  # Check every 5 seconds
+
+        delay = self._human_delay()
         time.sleep(delay)
         self.total_delay_time += delay
 
@@ -165,6 +178,7 @@ class RateLimiter:
         now = datetime.now()
         self.minute_requests.append(now)
         self.hour_requests.append(now)
+        self._clean_old_requests()
 
         # Update counters
         self.session_request_count += 1
@@ -208,8 +222,227 @@ class RateLimiter:
         return wrapper
 
 
-# Global rate limiter instance
-rate_limiter = RateLimiter()
+class AsyncRateLimiter(RateLimiter):
+    """
+    asyncio-native token-bucket rate limiter
+
+    Shared by many concurrent scraper workers without blocking the event loop:
+    - Two token buckets enforce the same per-minute and per-hour budgets
+    - Waiting for a token and the human-like pause both use asyncio.sleep()
+    - Wait time is tracked per caller (e.g. "ProductScraper-3")
+
+    Usage:
+        waited = await limiter.acquire(caller="ProductScraper-0")
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Buckets start full (allows an initial burst up to the budget)
+        self._minute_tokens = float(self.requests_per_minute)
+        self._hour_tokens = float(self.requests_per_hour)
+        self._last_refill = time.monotonic()
+
+        # asyncio.Lock is bound to the loop it is first used on, so keep one per loop
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+        # Per-caller statistics
+        self.caller_stats: Dict[str, Dict[str, float]] = {}
+
+    def _get_lock(self) -> asyncio.Lock:
+        """Return a lock bound to the currently running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self):
+        """Refill both buckets according to elapsed time"""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+
+        self._minute_tokens = min(
+            float(self.requests_per_minute),
+            self._minute_tokens + elapsed * self.requests_per_minute / 60
+        )
+        self._hour_tokens = min(
+            float(self.requests_per_hour),
+            self._hour_tokens + elapsed * self.requests_per_hour / 3600
+        )
+
+    def _seconds_until_token(self) -> float:
+        """Time until both buckets hold at least one token"""
+        minute_wait = max(0.0, 1 - self._minute_tokens) * 60 / self.requests_per_minute
+        hour_wait = max(0.0, 1 - self._hour_tokens) * 3600 / self.requests_per_hour
+        return max(minute_wait, hour_wait)
+
+    async def acquire(self, caller: str = "default", human_delay: bool = True) -> float:
+        """
+        Wait (without blocking the event loop) until a request may be made
+
+        Args:
+            caller: Name used for per-caller wait statistics
+            human_delay: Whether to add the human-like pause after the token is granted
+
+        Returns:
+            float: Total seconds this caller waited
+        """
+        start = time.monotonic()
+
+        # Token grant is serialized so waiting callers are served in order
+        async with self._get_lock():
+            while True:
+                self._refill()
+                if self._minute_tokens >= 1 and self._hour_tokens >= 1:
+                    self._minute_tokens -= 1
+                    self._hour_tokens -= 1
+                    break
+
+                wait = self._seconds_until_token()
+                logger.debug(f"Rate limit reached for {caller}, waiting {wait:.2f}s for a token...")
+                await asyncio.sleep(wait)
+
+        throttle_wait = time.monotonic() - start
+
+        # Human-like pause is per caller, so other workers keep going meanwhile
+        pause = self._human_delay() if human_delay else 0.0
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+        total_wait = throttle_wait + pause
+        self.total_delay_time += total_wait
+
+        stats = self.caller_stats.setdefault(caller, {
+            "requests": 0,
+            "total_wait_seconds": 0.0,
+            "throttle_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        })
+        stats["requests"] += 1
+        stats["total_wait_seconds"] += total_wait
+        stats["throttle_wait_seconds"] += throttle_wait
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], total_wait)
+
+        return total_wait
+
+    def get_statistics(self) -> dict:
+        """Get rate limiter statistics including per-caller wait times"""
+        stats = super().get_statistics()
+        stats["available_tokens"] = {
+            "minute": round(self._minute_tokens, 2),
+            "hour": round(self._hour_tokens, 2),
+        }
+        stats["callers"] = {
+            caller: {
+                "requests": int(data["requests"]),
+                "total_wait_seconds": round(data["total_wait_seconds"], 2),
+                "throttle_wait_seconds": round(data["throttle_wait_seconds"], 2),
+                "average_wait_seconds": round(data["total_wait_seconds"] / max(1, data["requests"]), 2),
+                "max_wait_seconds": round(data["max_wait_seconds"], 2),
+            }
+            for caller, data in self.caller_stats.items()
+        }
+        return stats
+
+
+class TokenRateLimiter:
+    """
+    Token-bucket budget for API requests and tokens per minute
+
+    Used to pace Claude calls: each call takes one request token and an
+    estimated number of API tokens up front. Once the response arrives the
+    estimate is reconciled against the real usage, so the bucket tracks
+    what the API actually counted. The limiter never waits itself; the
+    caller decides who goes next and how to wait (see LLMGateway).
+
+    Usage:
+        with lock:
+            wait = limiter.try_acquire(estimated_tokens=1500)
+        # wait > 0: nothing was taken, retry after `wait` seconds
+        ... call API ...
+        limiter.reconcile(estimated_tokens=1500, actual_tokens=1320)
+    """
+
+    def __init__(self, requests_per_minute: int = 50, tokens_per_minute: int = 40000):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+        # Buckets start full (allows an initial burst up to the budget)
+        self._request_tokens = float(requests_per_minute)
+        self._api_tokens = float(tokens_per_minute)
+        self._last_refill = time.monotonic()
+
+    def _refill(self):
+        """Refill both buckets according to elapsed time"""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+
+        self._request_tokens = min(
+            float(self.requests_per_minute),
+            self._request_tokens + elapsed * self.requests_per_minute / 60
+        )
+        self._api_tokens = min(
+            float(self.tokens_per_minute),
+            self._api_tokens + elapsed * self.tokens_per_minute / 60
+        )
+
+    def try_acquire(self, estimated_tokens: int = 0) -> float:
+        """
+        Take budget for one request if available, without waiting
+
+        Not serialized; callers sharing the limiter across threads must
+        hold their own lock (see LLMGateway).
+
+        Args:
+            estimated_tokens: Expected input + output tokens of the request
+
+        Returns:
+            float: 0 if granted, otherwise seconds until the request would fit
+        """
+        needed = float(min(estimated_tokens, self.tokens_per_minute))
+        self._refill()
+
+        if self._request_tokens >= 1 and self._api_tokens >= needed:
+            self._request_tokens -= 1
+            self._api_tokens -= needed
+            return 0.0
+
+        request_wait = max(0.0, 1 - self._request_tokens) * 60 / self.requests_per_minute
+        token_wait = max(0.0, needed - self._api_tokens) * 60 / self.tokens_per_minute
+        return max(request_wait, token_wait)
+
+    def limit_to(self, requests_remaining: Optional[float] = None, tokens_remaining: Optional[float] = None):
+        """
+        Lower the buckets to what the API reports as remaining (never raises them)
+
+        Args:
+            requests_remaining: Server-reported requests left in the window
+            tokens_remaining: Server-reported tokens left in the window
+        """
+        self._refill()
+        if requests_remaining is not None:
+            self._request_tokens = min(self._request_tokens, float(requests_remaining))
+        if tokens_remaining is not None:
+            self._api_tokens = min(self._api_tokens, float(tokens_remaining))
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int):
+        """
+        Correct the token bucket once the real usage is known
+
+        Args:
+            estimated_tokens: Tokens reserved in try_acquire()
+            actual_tokens: Input + output tokens reported by the API
+        """
+        reserved = min(estimated_tokens, self.tokens_per_minute)
+        self._api_tokens = min(float(self.tokens_per_minute), self._api_tokens + reserved - actual_tokens)
+
+
+# Global rate limiter instance (shared by all scrapers and workers)
+rate_limiter = AsyncRateLimiter()
 
 
 def rate_limited(func):
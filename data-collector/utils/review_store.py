@@ -0,0 +1,267 @@
+"""
+Review Analysis Store
+Remembers which reviews of each ASIN were already analyzed (by review ID or
+content hash), the newest analyzed review date (watermark) and the merged
+usage contexts, so repeated runs only send new reviews to Claude
+"""
+import atexit
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from loguru import logger
+
+from config.settings import DATA_DIR
+
+
+# Two contexts with at least this key phrase overlap (Jaccard) are the same context
+PHRASE_OVERLAP_THRESHOLD = 0.5
+
+# Merged list fields keep at most this many values
+MAX_MERGED_VALUES = 8
+
+# Recomputed from the full review set on every run, never stored
+_UNSTORED_FIELDS = ("sample_reviews",)
+
+
+def review_key(review: Dict[str, Any]) -> str:
+    """
+    Stable identity of a review
+
+    The Amazon review ID when the scraper captured one, otherwise a hash of
+    reviewer, title and text (whitespace/case-normalized).
+    """
+    review_id = review.get("review_id")
+    if review_id:
+        return f"id:{review_id}"
+
+    payload = "\x1f".join(
+        " ".join(str(review.get(field) or "").split()).lower()
+        for field in ("reviewer_name", "title", "text")
+    )
+    return "sha1:" + hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _norm(value: Any) -> str:
+    return " ".join(str(value or "").split()).lower()
+
+
+def _union(first: Iterable[str], second: Iterable[str]) -> List[str]:
+    """Order-preserving union (case-insensitive), capped at MAX_MERGED_VALUES"""
+    merged, seen = [], set()
+    for value in list(first or []) + list(second or []):
+        if _norm(value) not in seen:
+            seen.add(_norm(value))
+            merged.append(value)
+    return merged[:MAX_MERGED_VALUES]
+
+
+def merge_usage_contexts(existing: List[Dict], new: List[Dict]) -> List[Dict]:
+    """
+    Fold usage contexts found in new reviews into the stored ones
+
+    A new context matches a stored one with the same name, otherwise the
+    stored context with the largest key phrase overlap (at least
+    PHRASE_OVERLAP_THRESHOLD). Matches add up frequencies, take the
+    frequency-weighted sentiment and union the phrase/concern/product
+    lists; unmatched contexts are appended.
+
+    Args:
+        existing: Stored contexts (aggregated over all earlier reviews)
+        new: Contexts from the newly analyzed reviews
+
+    Returns:
+        list: Merged contexts, most frequent first
+    """
+    merged = [
+        {k: v for k, v in context.items() if k not in _UNSTORED_FIELDS}
+        for context in existing
+    ]
+
+    for context in new:
+        context = {k: v for k, v in context.items() if k not in _UNSTORED_FIELDS}
+        phrases = {_norm(p) for p in context.get("key_phrases", [])}
+
+        match = next((m for m in merged if _norm(m.get("context")) == _norm(context.get("context"))), None)
+        if match is None and phrases:
+            best = 0.0
+            for candidate in merged:
+                candidate_phrases = {_norm(p) for p in candidate.get("key_phrases", [])}
+                overlap = len(phrases & candidate_phrases) / len(phrases | candidate_phrases) if candidate_phrases else 0.0
+                if overlap >= PHRASE_OVERLAP_THRESHOLD and overlap > best:
+                    match, best = candidate, overlap
+
+        if match is None:
+            merged.append(context)
+            continue
+
+        old_freq = match.get("frequency") or 0
+        new_freq = context.get("frequency") or 0
+        total = old_freq + new_freq
+        if total:
+            match["sentiment_score"] = round(
+                ((match.get("sentiment_score") or 0) * old_freq + (context.get("sentiment_score") or 0) * new_freq) / total,
+                2
+            )
+        match["frequency"] = total
+
+        for field in ("key_phrases", "skin_concerns", "companion_products"):
+            if match.get(field) or context.get(field):
+                match[field] = _union(match.get(field, []), context.get(field, []))
+
+        for field in ("time_of_use", "season"):
+            if not match.get(field) and context.get(field):
+                match[field] = context[field]
+
+    return sorted(merged, key=lambda c: c.get("frequency") or 0, reverse=True)
+
+
+class ReviewAnalysisStore:
+    """
+    Per-ASIN incremental review analysis state (SQLite, WAL mode)
+
+    analyses: one row per ASIN - merged usage contexts, number of analyzed
+        reviews, watermark (newest analyzed review_date) and the analysis
+        fingerprint (model + prompt + schema; a change starts the ASIN over)
+    analyzed_reviews: the review keys already folded into the ASIN's contexts
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Initialize review analysis store
+
+        Args:
+            db_path: SQLite file (default: DATA_DIR/review_analysis/review_analysis.db)
+        """
+        self.db_path = Path(db_path) if db_path else DATA_DIR / "review_analysis" / "review_analysis.db"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " asin TEXT PRIMARY KEY,"
+            " fingerprint TEXT NOT NULL,"
+            " usage_contexts TEXT NOT NULL,"
+            " review_count INTEGER NOT NULL,"
+            " watermark TEXT,"
+            " updated_at TEXT NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyzed_reviews ("
+            " asin TEXT NOT NULL,"
+            " review_key TEXT NOT NULL,"
+            " review_date TEXT,"
+            " PRIMARY KEY (asin, review_key))"
+        )
+        self.conn.commit()
+        atexit.register(self.close)
+
+        count = self.conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        logger.info(f"Review analysis store initialized: {count} products")
+
+    def get(self, asin: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Stored analysis of an ASIN
+
+        Args:
+            asin: Product ASIN
+            fingerprint: Current analysis fingerprint
+
+        Returns:
+            dict with usage_contexts, review_count, watermark and seen (set of
+            review keys), or None if never analyzed or analyzed with another
+            fingerprint
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT fingerprint, usage_contexts, review_count, watermark FROM analyses WHERE asin = ?",
+                (asin,)
+            ).fetchone()
+            if row is None or row[0] != fingerprint:
+                return None
+
+            seen: Set[str] = {
+                key for (key,) in self.conn.execute(
+                    "SELECT review_key FROM analyzed_reviews WHERE asin = ?", (asin,)
+                )
+            }
+
+        return {
+            "usage_contexts": json.loads(row[1]),
+            "review_count": row[2],
+            "watermark": row[3],
+            "seen": seen,
+        }
+
+    def save(
+        self,
+        asin: str,
+        fingerprint: str,
+        usage_contexts: List[Dict],
+        analyzed_reviews: List[Dict],
+        replace: bool = False
+    ):
+        """
+        Store merged contexts and mark reviews as analyzed
+
+        Args:
+            asin: Product ASIN
+            fingerprint: Analysis fingerprint the contexts were produced with
+            usage_contexts: Merged usage contexts (sample reviews are dropped)
+            analyzed_reviews: Reviews folded into usage_contexts by this call
+            replace: Forget previously analyzed reviews (fingerprint changed)
+        """
+        contexts = [
+            {k: v for k, v in context.items() if k not in _UNSTORED_FIELDS}
+            for context in usage_contexts
+        ]
+
+        with self._lock, self.conn:
+            if replace:
+                self.conn.execute("DELETE FROM analyzed_reviews WHERE asin = ?", (asin,))
+
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO analyzed_reviews (asin, review_key, review_date) VALUES (?, ?, ?)",
+                [(asin, review_key(review), review.get("review_date")) for review in analyzed_reviews]
+            )
+            review_count, watermark = self.conn.execute(
+                "SELECT COUNT(*), MAX(review_date) FROM analyzed_reviews WHERE asin = ?", (asin,)
+            ).fetchone()
+
+            self.conn.execute(
+                "INSERT OR REPLACE INTO analyses"
+                " (asin, fingerprint, usage_contexts, review_count, watermark, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    asin, fingerprint, json.dumps(contexts, ensure_ascii=False),
+                    review_count, watermark, datetime.now().isoformat()
+                )
+            )
+
+    def close(self):
+        """Close the database connection"""
+        try:
+            self.conn.close()
+        except sqlite3.Error:
+            pass
+
+
+# Singleton instance
+_review_store_instance = None
+
+
+def get_review_store() -> ReviewAnalysisStore:
+    """Get or create review analysis store singleton instance"""
+    global _review_store_instance
+
+    if _review_store_instance is None:
+        _review_store_instance = ReviewAnalysisStore()
+
+    return _review_store_instance
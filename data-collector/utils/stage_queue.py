@@ -0,0 +1,104 @@
+"""
+Monitored stage queue
+Bounded asyncio.Queue that records depth and backpressure metrics for
+streaming pipeline stages
+"""
+import asyncio
+import time
+from typing import Dict, Any
+from loguru import logger
+
+
+class MonitoredQueue(asyncio.Queue):
+    """
+    Bounded queue between two pipeline stages
+
+    put() blocks while the queue is full, which slows the producer down to
+    the consumer's pace (backpressure). items_in/items_out leave out the
+    None end-of-stream markers. Time spent blocked on either side is
+    recorded so the slower stage is easy to spot:
+    - producer_wait_seconds high -> consumers are the bottleneck
+    - consumer_wait_seconds high -> producers are the bottleneck
+    """
+
+    def __init__(self, name: str, maxsize: int = 0):
+        super().__init__(maxsize=maxsize)
+        self.name = name
+
+        self.items_in = 0
+        self.items_out = 0
+        self.max_depth = 0
+        self.producer_wait_seconds = 0.0
+        self.consumer_wait_seconds = 0.0
+        self.backpressure_events = 0
+
+        # Time-weighted depth (depth x seconds) for average depth
+        self._depth_area = 0.0
+        self._last_change = time.monotonic()
+        self._started = self._last_change
+
+    def _record_depth(self):
+        """Accumulate time spent at the current depth"""
+        now = time.monotonic()
+        self._depth_area += self.qsize() * (now - self._last_change)
+        self._last_change = now
+
+    async def put(self, item):
+        """Put an item, waiting (backpressure) while the queue is full"""
+        if self.full():
+            self.backpressure_events += 1
+
+        start = time.monotonic()
+        await super().put(item)
+        self.producer_wait_seconds += time.monotonic() - start
+
+    def put_nowait(self, item):
+        self._record_depth()
+        super().put_nowait(item)
+        # None is the end-of-stream marker, not an item
+        if item is not None:
+            self.items_in += 1
+        self.max_depth = max(self.max_depth, self.qsize())
+
+    async def get(self):
+        """Get an item, waiting while the queue is empty"""
+        start = time.monotonic()
+        item = await super().get()
+        self.consumer_wait_seconds += time.monotonic() - start
+        return item
+
+    def get_nowait(self):
+        self._record_depth()
+        item = super().get_nowait()
+        if item is not None:
+            self.items_out += 1
+        return item
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Depth and wait metrics for this queue"""
+        self._record_depth()
+        elapsed = max(1e-9, time.monotonic() - self._started)
+        return {
+            "name": self.name,
+            "maxsize": self.maxsize,
+            "depth": self.qsize(),
+            "max_depth": self.max_depth,
+            "average_depth": round(self._depth_area / elapsed, 2),
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "backpressure_events": self.backpressure_events,
+            "producer_wait_seconds": round(self.producer_wait_seconds, 2),
+            "consumer_wait_seconds": round(self.consumer_wait_seconds, 2),
+        }
+
+    def log_statistics(self):
+        """Log a one-line summary of this queue"""
+        stats = self.get_statistics()
+        logger.info(
+            f"  📬 {stats['name']}: {stats['items_in']} in / {stats['items_out']} out, "
+            f"depth now {stats['depth']}/{stats['maxsize'] or '∞'} "
+            f"(avg {stats['average_depth']}, max {stats['max_depth']}), "
+            f"backpressure {stats['backpressure_events']}x "
+            f"(producers waited {stats['producer_wait_seconds']}s, "
+            f"consumers waited {stats['consumer_wait_seconds']}s)"
+        )
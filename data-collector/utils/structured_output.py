@@ -0,0 +1,258 @@
+"""
+Structured Output
+Tool-use helpers so Claude returns schema-shaped JSON objects (tool input)
+instead of free text that has to be searched for JSON, plus a pipeline-wide
+counter of parse failures per task and mode
+"""
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from loguru import logger
+
+
+# Parse modes tracked by ParseStats
+MODE_TOOL = "tool"  # Tool-use input validated against a JSON schema
+MODE_TEXT = "text"  # JSON searched for in free text
+
+_JSON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+}
+
+
+def build_attributes_schema(
+    attribute_categories: Dict[str, Dict],
+    fields: Dict[str, Dict[str, str]]
+) -> Dict[str, Any]:
+    """
+    JSON schema for extracted product attributes
+
+    Field shapes come from `fields`; the vocabulary of each field in
+    attribute_schema.yaml is listed in its description as preferred values
+    (not an enum - the prompt allows "Unknown" and close matches).
+
+    Args:
+        attribute_categories: attribute_categories section of attribute_schema.yaml
+        fields: {section: {field: "string" | "array"}}
+
+    Returns:
+        dict: JSON schema (type object)
+    """
+    properties = {}
+
+    for section, section_fields in fields.items():
+        vocabulary = attribute_categories.get(section) or {}
+        section_properties = {}
+
+        for field, field_type in section_fields.items():
+            values = vocabulary.get(field) if isinstance(vocabulary, dict) else None
+            description = f"Preferred values: {', '.join(values)}" if isinstance(values, list) else ""
+
+            if field_type == "array":
+                section_properties[field] = {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": description or "Empty array if none",
+                }
+            else:
+                section_properties[field] = {
+                    "type": "string",
+                    "description": description or '"Unknown" if not determinable',
+                }
+
+        properties[section] = {
+            "type": "object",
+            "properties": section_properties,
+            "required": list(section_fields),
+        }
+
+    return {"type": "object", "properties": properties, "required": list(fields)}
+
+
+def tool_params(name: str, description: str, input_schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    messages.create() arguments forcing Claude to answer through one tool
+
+    Args:
+        name: Tool name
+        description: What the tool records
+        input_schema: JSON schema of the tool input (type object)
+
+    Returns:
+        dict: tools and tool_choice arguments
+    """
+    return {
+        "tools": [{"name": name, "description": description, "input_schema": input_schema}],
+        "tool_choice": {"type": "tool", "name": name},
+    }
+
+
+def _plain(value: Any) -> Any:
+    """Convert LLM-cache namespaces back to plain dicts/lists"""
+    if isinstance(value, SimpleNamespace):
+        return {k: _plain(v) for k, v in vars(value).items()}
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+def tool_input(message: Any, name: str) -> Optional[Dict[str, Any]]:
+    """
+    Input of the named tool_use block in a response
+
+    Args:
+        message: SDK Message or cached response
+        name: Tool name
+
+    Returns:
+        dict or None if the response has no such tool call
+    """
+    for block in getattr(message, "content", None) or []:
+        if getattr(block, "type", None) == "tool_use" and getattr(block, "name", None) == name:
+            return _plain(block.input)
+    return None
+
+
+def response_text(message: Any) -> str:
+    """Concatenated text blocks of a response"""
+    return "".join(
+        block.text for block in getattr(message, "content", None) or []
+        if getattr(block, "type", "text") == "text" and hasattr(block, "text")
+    )
+
+
+def validate(instance: Any, schema: Dict[str, Any], path: str = "$") -> List[str]:
+    """
+    Validate a value against the JSON schema subset used here
+    (type, properties, required, items, enum)
+
+    Args:
+        instance: Value to check
+        schema: JSON schema
+        path: Location prefix for error messages
+
+    Returns:
+        list: Error messages (empty if valid)
+    """
+    expected = schema.get("type")
+    if expected:
+        python_type = _JSON_TYPES[expected]
+        # bool is an int subclass; reject it for numeric fields
+        if not isinstance(instance, python_type) or (isinstance(instance, bool) and expected != "boolean"):
+            if not (expected == "integer" and isinstance(instance, float) and instance.is_integer()):
+                return [f"{path}: expected {expected}, got {type(instance).__name__}"]
+
+    if "enum" in schema and instance not in schema["enum"]:
+        return [f"{path}: {instance!r} not in {schema['enum']}"]
+
+    errors = []
+
+    if isinstance(instance, dict):
+        for key in schema.get("required", []):
+            if key not in instance:
+                errors.append(f"{path}.{key}: missing")
+        for key, sub_schema in schema.get("properties", {}).items():
+            if key in instance:
+                errors.extend(validate(instance[key], sub_schema, f"{path}.{key}"))
+
+    if isinstance(instance, list) and "items" in schema:
+        for i, item in enumerate(instance):
+            errors.extend(validate(item, schema["items"], f"{path}[{i}]"))
+
+    return errors
+
+
+class ParseStats:
+    """
+    Counts parsed responses and parse failures per task and mode
+
+    Comparing the text and tool rows of a task shows how many failures
+    (fallbacks / retries) structured output removed.
+    """
+
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, Dict[str, int]]] = {}
+
+    def record(self, task: str, mode: str, ok: bool):
+        """
+        Record one parse attempt
+
+        Args:
+            task: Task type (e.g. "attribute_extraction")
+            mode: MODE_TOOL or MODE_TEXT
+            ok: Whether a valid object was obtained
+        """
+        counts = self.stats.setdefault(task, {}).setdefault(mode, {"parsed": 0, "failures": 0})
+        counts["parsed" if ok else "failures"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Copy of the current counters (pass to get_statistics(since=...) later)"""
+        return {task: {mode: dict(counts) for mode, counts in modes.items()} for task, modes in self.stats.items()}
+
+    def get_statistics(self, since: Optional[Dict] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Per task and mode: parsed, failures and failure rate
+
+        Args:
+            since: Earlier snapshot() (default: since start of the process)
+
+        Returns:
+            dict: {task: {mode: counts}}, modes without attempts in the window omitted
+        """
+        since = since or {}
+        stats = {}
+
+        for task, modes in self.stats.items():
+            for mode, counts in modes.items():
+                before = since.get(task, {}).get(mode, {})
+                parsed = counts["parsed"] - before.get("parsed", 0)
+                failures = counts["failures"] - before.get("failures", 0)
+                if not parsed + failures:
+                    continue
+
+                stats.setdefault(task, {})[mode] = {
+                    "parsed": parsed,
+                    "failures": failures,
+                    "failure_rate": round(failures / (parsed + failures) * 100, 1),
+                }
+
+        return stats
+
+    def log_statistics(self, since: Optional[Dict] = None):
+        """
+        Log parse failure counts
+
+        Args:
+            since: Earlier snapshot() (default: since start of the process)
+        """
+        stats = self.get_statistics(since)
+        if not stats:
+            return
+
+        logger.info("🧾 Response parsing:")
+        for task, modes in stats.items():
+            summary = ", ".join(
+                f"{mode} {counts['failures']}/{counts['parsed'] + counts['failures']} failed "
+                f"({counts['failure_rate']}%)"
+                for mode, counts in modes.items()
+            )
+            logger.info(f"  - {task}: {summary}")
+
+
+# Singleton instance
+_parse_stats_instance = None
+
+
+def get_parse_stats() -> ParseStats:
+    """Get or create the parse statistics singleton"""
+    global _parse_stats_instance
+
+    if _parse_stats_instance is None:
+        _parse_stats_instance = ParseStats()
+
+    return _parse_stats_instance
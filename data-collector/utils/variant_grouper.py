@@ -0,0 +1,202 @@
+"""
+Variant Grouper
+Clusters size/shade/pack variants of the same product (separate ASINs in
+Best Sellers lists) by brand and token-set similarity of their titles
+"""
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List
+
+from utils.brand_extractor import extract_brand_from_name
+
+
+# Tokens are always indexed below this many postings per brand
+MIN_INDEXED_POSTINGS = 50
+
+# Size / quantity tokens that distinguish variants, not products
+SIZE_PATTERN = re.compile(
+    r"\b\d+(?:\.\d+)?\s*(?:fl\.?\s*oz|oz|ounces?|ml|l|g|grams?|mg|lbs?|ct|count|pcs|pieces|sheets|pk)\b"
+    r"|\bpack\s+of\s+\d+\b|\b\d+\s*-?\s*(?:pack|pk)\b|\bset\s+of\s+\d+\b",
+    re.IGNORECASE,
+)
+
+# Bumped whenever grouping gets stricter, so copies cached under looser rules are re-extracted
+GROUPING_VERSION = 2
+
+# Shade / color words: titles of two variants may differ only in these, sizes and pack words
+SHADE_TOKENS = {
+    "shade", "color", "colour", "tone", "tint", "tinted", "untinted",
+    "fair", "light", "medium", "tan", "dark", "deep", "rich", "warm", "cool", "neutral", "olive",
+    "porcelain", "ivory", "beige", "nude", "sand", "buff", "natural", "honey", "golden", "caramel",
+    "almond", "chestnut", "mocha", "espresso", "cocoa", "ebony", "bronze", "gold", "silver",
+    "red", "pink", "coral", "rose", "berry", "plum", "mauve", "peach", "brown", "black", "white",
+    "clear", "blue", "green", "purple", "orange", "yellow", "cherry", "wine", "taupe",
+}
+
+# Pack / container words
+PACK_TOKENS = {
+    "refill", "jumbo", "twin", "duo", "trio", "bundle", "set", "kit", "count", "ct", "bottle",
+    "tube", "jar", "pump", "packs", "unit", "units", "piece", "pieces", "large", "small",
+}
+
+# Product forms and textures: a differing one means a different product (Cream vs Lotion)
+PRODUCT_FORM_TOKENS = {
+    "cream", "lotion", "gel", "serum", "oil", "balm", "foam", "mousse", "powder", "stick",
+    "mist", "spray", "water", "essence", "ampoule", "toner", "cleanser", "wash", "mask",
+    "butter", "milk", "emulsion", "fluid", "ointment", "salve", "scrub", "peel", "pads",
+    "patch", "patches", "sheet", "wipes", "soap", "bar", "liquid", "drops", "jelly",
+    "lightweight", "heavy", "silky", "watery", "thick", "whipped", "cooling", "velvety", "creamy",
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['+][a-z0-9]+)*")
+
+STOPWORDS = {
+    "a", "an", "and", "the", "of", "for", "with", "in", "to", "by", "on", "or",
+    "fl", "oz", "ml", "size", "travel", "mini", "full", "value", "new", "pack",
+}
+
+
+def title_tokens(title: str) -> FrozenSet[str]:
+    """
+    Normalized token set of a product title
+
+    Lowercased, size/quantity phrases removed, stopwords dropped.
+    """
+    text = SIZE_PATTERN.sub(" ", title or "").lower()
+    return frozenset(t for t in TOKEN_PATTERN.findall(text) if t not in STOPWORDS)
+
+
+def is_variant_token(token: str) -> bool:
+    """True for tokens that tell variants apart: shade codes/numbers, shade and pack words"""
+    return any(c.isdigit() for c in token) or token in SHADE_TOKENS or token in PACK_TOKENS
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Token-set (Jaccard) similarity"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class VariantGrouper:
+    """
+    Group product variants without any network calls
+
+    Products are compared only with others of the same brand that share
+    at least one selective title token (inverted index over tokens; in
+    large brands, tokens found in more than max_token_share of the
+    brand's products are not used to find candidates). A pair is merged
+    (union-find, so a chain of close variants ends up in one group) when
+    its titles are at least similarity_threshold similar and every token
+    they do not share is a size, shade or pack token. A differing product
+    form or texture ("Cream" vs "Lotion", "Gel" vs "Gel Cream") never
+    merges.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.8,
+        max_token_share: float = 0.5,
+        product_form_terms: Iterable[str] = ()
+    ):
+        """
+        Args:
+            similarity_threshold: Minimum Jaccard similarity of two titles
+            max_token_share: In large brands, ignore tokens present in more than this share of the brand's products
+            product_form_terms: Extra form/texture vocabulary (e.g. formula_type and texture values)
+        """
+        self.similarity_threshold = similarity_threshold
+        self.max_token_share = max_token_share
+        self.product_form_tokens = PRODUCT_FORM_TOKENS | {
+            token for term in product_form_terms for token in TOKEN_PATTERN.findall(term.lower())
+            if token not in STOPWORDS
+        }
+
+    def is_variant_pair(self, a: FrozenSet[str], b: FrozenSet[str]) -> bool:
+        """
+        Whether two title token sets describe variants of one product
+
+        Args:
+            a: Title tokens of the first product
+            b: Title tokens of the second product
+
+        Returns:
+            bool: Similar enough, and the tokens they do not share are all size/shade/pack tokens
+        """
+        if jaccard(a, b) < self.similarity_threshold:
+            return False
+        return all(
+            token not in self.product_form_tokens and is_variant_token(token)
+            for token in a ^ b
+        )
+
+    @staticmethod
+    def _brand(product: Dict) -> str:
+        brand = product.get("brand")
+        if not brand or brand == "Unknown":
+            brand = extract_brand_from_name(product.get("name") or "")
+        return " ".join(str(brand or "").lower().split())
+
+    def group(self, products: List[Dict]) -> List[List[Dict]]:
+        """
+        Cluster products into variant groups
+
+        Args:
+            products: Product dicts with name and (optionally) brand
+
+        Returns:
+            list: Groups in input order of their first member; each group
+            starts with its representative (the member with the most text)
+        """
+        tokens = [title_tokens(p.get("name") or "") for p in products]
+        parent = list(range(len(products)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        by_brand: Dict[str, List[int]] = defaultdict(list)
+        for i, product in enumerate(products):
+            brand = self._brand(product)
+            # Without a brand there is nothing to block on; never merge
+            if brand and brand != "unknown" and tokens[i]:
+                by_brand[brand].append(i)
+
+        for members in by_brand.values():
+            if len(members) < 2:
+                continue
+
+            index: Dict[str, List[int]] = defaultdict(list)
+            for i in members:
+                for token in tokens[i]:
+                    index[token].append(i)
+
+            max_postings = max(MIN_INDEXED_POSTINGS, int(len(members) * self.max_token_share))
+
+            for i in members:
+                candidates = set()
+                for token in tokens[i]:
+                    postings = index[token]
+                    if len(postings) <= max_postings:
+                        candidates.update(j for j in postings if j > i)
+
+                for j in candidates:
+                    if find(i) != find(j) and self.is_variant_pair(tokens[i], tokens[j]):
+                        parent[find(j)] = find(i)
+
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(products)):
+            groups.setdefault(find(i), []).append(i)
+
+        result = []
+        for indices in groups.values():
+            members = [products[i] for i in indices]
+            representative = max(
+                members,
+                key=lambda p: len(p.get("description") or "") + len(p.get("name") or "")
+            )
+            result.append([representative] + [p for p in members if p is not representative])
+
+        return result